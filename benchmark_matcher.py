@@ -0,0 +1,273 @@
+# Ficheiro: benchmark_matcher.py
+#
+# MICRO-BENCHMARK DO MATCHER.
+# Objetivo: medir se uma mudança no TextMatcher ajuda ou atrapalha.
+# Gera aulas sintéticas a partir do catálogo real (materias_assuntos_tec.json),
+# roda todos os caminhos do matcher em vários tamanhos de lote e números de threads
+# e grava throughput, latência p50/p95 e o pico de RSS do processo em JSON comparável entre commits.
+# O pico de RSS é o máximo acumulado do processo (após carregar o matcher e ao fim da grade),
+# não um valor por configuração: compare-o entre commits, não entre linhas da grade.
+#
+# Uso:
+#   python benchmark_matcher.py                       # roda e grava em benchmarks/
+#   python benchmark_matcher.py --rapido              # grade reduzida (smoke test)
+#   python benchmark_matcher.py --comparar A.json B.json
+#
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable
+
+# Adiciona o diretório atual ao path
+sys.path.append(os.getcwd())
+
+from data.data_loader import DataLoader
+from src.evaluation import percentil
+
+SAIDA_DIR = "benchmarks"
+LOTES_PADRAO = [1, 8, 32]
+THREADS_PADRAO = [1, 2, 4]
+CONSULTAS_POR_CARGA = 64
+SEMENTE = 42
+
+
+# --- Memória ---
+def pico_rss_mb() -> float:
+    """
+    Pico de memória residente do processo desde o início (MB), Unix via resource, Windows via psapi.
+    Só cresce: medido depois de várias configurações, reflete a pior delas até ali.
+    """
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta em KB, macOS em bytes
+        return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+    except ImportError:
+        pass
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        contadores = PROCESS_MEMORY_COUNTERS()
+        contadores.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+        processo = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(processo, ctypes.byref(contadores), contadores.cb):
+            return contadores.PeakWorkingSetSize / (1024 * 1024)
+    except Exception:
+        pass
+    return -1.0
+
+
+# --- Cargas sintéticas ---
+def gerar_cargas(loader: DataLoader, n: int, seed: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Três perfis de aula, todos a partir de assuntos reais:
+      titulos: "Aula 03: <assunto>"
+      ementas: 3 a 6 assuntos da mesma matéria separados por ';'
+      longos:  ementas grandes (>50 palavras), que forçam a quebra em chunks
+    Cada carga guarda a matéria de origem de cada consulta (para os caminhos filtrados).
+    """
+    rnd = random.Random(seed)
+    materias = [m for m in loader.materias if len(loader.assuntos_por_materia.get(m, [])) >= 6]
+
+    def gerar(perfil):
+        consultas, origens = [], []
+        for i in range(n):
+            materia = rnd.choice(materias)
+            assuntos = loader.assuntos_por_materia[materia]
+            if perfil == "titulos":
+                texto = rnd.choice(assuntos)
+            elif perfil == "ementas":
+                texto = "; ".join(rnd.sample(assuntos, rnd.randint(3, 6)))
+            else:
+                partes = []
+                while len(" ".join(partes).split()) < 120:
+                    partes.append(rnd.choice(assuntos))
+                texto = "; ".join(partes)
+            consultas.append(f"Aula {i % 40 + 1:02d}: {texto}")
+            origens.append(materia)
+        return {"consultas": consultas, "materias": origens}
+
+    return {perfil: gerar(perfil) for perfil in ("titulos", "ementas", "longos")}
+
+
+# --- Caminhos do matcher ---
+def caminhos_matcher(matcher, loader: DataLoader, seed: int) -> Dict[str, Callable[[List[str], List[str]], Any]]:
+    rnd = random.Random(seed)
+    materias_validas = [m for m in loader.materias if loader.assuntos_por_materia.get(m)]
+
+    def multi(consultas, origens):
+        # Matéria de origem + 2 outras: simula a multisseleção da GUI
+        alvo = [origens[0]] + rnd.sample(materias_validas, 2)
+        return matcher.find_best_matches_filtered_batch(consultas, target_materia=alvo)
+
+    return {
+        "filtrado_uma": lambda consultas, origens: matcher.find_best_matches_filtered_batch(consultas, target_materia=origens[0]),
+        "filtrado_multi": multi,
+        "hierarquico": lambda consultas, origens: matcher.find_best_matches_hierarquico_batch(consultas),
+        # threshold_materia > 1 nunca é atingido: todas as consultas caem no fallback global
+        "fallback": lambda consultas, origens: matcher.find_best_matches_hierarquico_batch(consultas, threshold_materia=1.01),
+    }
+
+
+def medir(funcao, carga: Dict[str, List[str]], lote: int, threads: int) -> Dict[str, Any]:
+    """Divide as consultas em lotes, distribui entre 'threads' e mede cada chamada."""
+    consultas, origens = carga["consultas"], carga["materias"]
+    lotes = [(consultas[i:i + lote], origens[i:i + lote]) for i in range(0, len(consultas), lote)]
+    funcao(*lotes[0]) # Aquecimento (caches, alocação do tensor concatenado)
+
+    def chamar(args):
+        t0 = time.perf_counter()
+        funcao(*args)
+        return (time.perf_counter() - t0) * 1000
+
+    inicio = time.perf_counter()
+    if threads == 1:
+        latencias = [chamar(l) for l in lotes]
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencias = list(pool.map(chamar, lotes))
+    total_s = time.perf_counter() - inicio
+
+    return {
+        "consultas": len(consultas),
+        "throughput_qps": round(len(consultas) / total_s, 2),
+        "p50_ms": round(percentil(latencias, 50), 2),
+        "p95_ms": round(percentil(latencias, 95), 2),
+        "p50_ms_por_consulta": round(percentil(latencias, 50) / lote, 2),
+    }
+
+
+def commit_atual() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    from src.matching import TextMatcher
+
+    print("=" * 80)
+    print("⏱️ BENCHMARK DO MATCHER")
+    print("=" * 80)
+
+    loader = DataLoader(lambda x: None)
+    t0 = time.perf_counter()
+    matcher = TextMatcher(
+        log_callback=lambda x: None,
+        lista_materias=loader.materias,
+        dict_assuntos_por_materia=loader.assuntos_por_materia,
+        lista_completa_fallback=loader.lista_completa_fallback,
+        questoes_por_materia=loader.questoes_por_materia
+    )
+    carga_s = time.perf_counter() - t0
+    rss_carga = pico_rss_mb()
+    print(f"Matcher carregado em {carga_s:.1f}s ({matcher.device}). RSS pico após a carga: {rss_carga:.0f} MB")
+
+    lotes = [1, 8] if args.rapido else args.lotes
+    threads = [1, 2] if args.rapido else args.threads
+    n = 16 if args.rapido else args.consultas
+    cargas = gerar_cargas(loader, n, args.seed)
+    caminhos = caminhos_matcher(matcher, loader, args.seed)
+
+    resultados = []
+    for nome_caminho, funcao in caminhos.items():
+        for perfil, carga in cargas.items():
+            for lote in lotes:
+                for th in threads:
+                    r = medir(funcao, carga, lote, th)
+                    r.update({"caminho": nome_caminho, "carga": perfil, "lote": lote, "threads": th})
+                    resultados.append(r)
+                    print(f"{nome_caminho:<15} {perfil:<8} lote={lote:<3} threads={th}  "
+                          f"{r['throughput_qps']:>8.1f} q/s  p50={r['p50_ms']:>8.1f}ms  p95={r['p95_ms']:>8.1f}ms")
+
+    return {
+        "meta": {
+            "commit": commit_atual(),
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "modelo": matcher.model_name,
+            "device": matcher.device,
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "seed": args.seed,
+            "consultas_por_carga": n,
+        },
+        "carga_matcher_s": round(carga_s, 2),
+        "pico_rss_carga_mb": round(rss_carga, 1),
+        "pico_rss_acumulado_mb": round(pico_rss_mb(), 1), # Máximo do processo na grade inteira
+        "resultados": resultados,
+    }
+
+
+def comparar(caminho_a: str, caminho_b: str):
+    """Imprime a variação de throughput e p95 de B em relação a A, configuração a configuração."""
+    with open(caminho_a, encoding="utf-8") as f:
+        a = json.load(f)
+    with open(caminho_b, encoding="utf-8") as f:
+        b = json.load(f)
+
+    def chave(r): return (r["caminho"], r["carga"], r["lote"], r["threads"])
+    base = {chave(r): r for r in a["resultados"]}
+
+    print(f"A: {a['meta'].get('commit') or caminho_a}   B: {b['meta'].get('commit') or caminho_b}")
+    print(f"{'CONFIGURAÇÃO':<45} | {'Δ THROUGHPUT':>12} | {'Δ P95':>10}")
+    print("-" * 75)
+    for r in b["resultados"]:
+        ra = base.get(chave(r))
+        if not ra:
+            continue
+        d_qps = (r["throughput_qps"] / ra["throughput_qps"] - 1) * 100 if ra["throughput_qps"] else 0
+        d_p95 = (r["p95_ms"] / ra["p95_ms"] - 1) * 100 if ra["p95_ms"] else 0
+        nome = f"{r['caminho']}/{r['carga']} lote={r['lote']} th={r['threads']}"
+        print(f"{nome:<45} | {d_qps:>+11.1f}% | {d_p95:>+9.1f}%")
+    print("-" * 75)
+    # JSONs antigos só têm 'pico_rss_mb' (o mesmo máximo acumulado)
+    def rss(r): return r.get("pico_rss_acumulado_mb", r.get("pico_rss_mb"))
+    print(f"Pico RSS acumulado: {rss(a)} MB -> {rss(b)} MB | Carga: {a['carga_matcher_s']}s -> {b['carga_matcher_s']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark do TextMatcher com cargas sintéticas do catálogo.")
+    parser.add_argument("--lotes", type=int, nargs="+", default=LOTES_PADRAO, help="Tamanhos de lote.")
+    parser.add_argument("--threads", type=int, nargs="+", default=THREADS_PADRAO, help="Números de threads.")
+    parser.add_argument("--consultas", type=int, default=CONSULTAS_POR_CARGA, help="Consultas por carga sintética.")
+    parser.add_argument("--seed", type=int, default=SEMENTE)
+    parser.add_argument("--rapido", action="store_true", help="Grade reduzida (smoke test).")
+    parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: benchmarks/<data>_<commit>.json).")
+    parser.add_argument("--comparar", nargs=2, metavar=("A", "B"), help="Compara dois JSONs de benchmark e sai.")
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    relatorio = run_benchmark(args)
+    saida = args.saida or os.path.join(
+        SAIDA_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{relatorio['meta']['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(saida) or ".", exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Resultado salvo em {saida} (pico RSS acumulado {relatorio['pico_rss_acumulado_mb']} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import os
 import sys  # <-- Importe o 'sys'
 import json
 import traceback
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Optional
 
 def resource_path(relative_path: str) -> str:
     """
@@ -32,12 +32,16 @@ class DataLoader:
     com a hierarquia de Matérias -> Assuntos.
     """
     
-    def __init__(self, log_callback: Callable[..., None]):
+    def __init__(self, log_callback: Callable[..., None], caminho: str = HIERARQUIA_FILE):
         self.log = log_callback
+        self.caminho = caminho
         
         # Atributos que serão preenchidos
         self.materias: List[str] = []
         self.assuntos_por_materia: Dict[str, List[str]] = {}
+        self.niveis_por_materia: Dict[str, List[int]] = {} # Paralelo a assuntos_por_materia
+        self.questoes_por_materia: Dict[str, List[Optional[int]]] = {} # Idem (contagem de questões no TEC)
+        self.comentadas_por_materia: Dict[str, List[Optional[int]]] = {} # Idem (questões comentadas)
         self.lista_completa_fallback: List[str] = []
 
         try:
@@ -49,23 +53,26 @@ class DataLoader:
 
     def _load_and_process_data(self):
         """Lê o JSON e preenche os atributos da classe."""
-        self.log(f"Carregando arquivo de hierarquia: {HIERARQUIA_FILE}")
+        self.log(f"Carregando arquivo de hierarquia: {self.caminho}")
 
         try:
             # A lógica aqui dentro não precisa mudar
-            with open(HIERARQUIA_FILE, 'r', encoding='utf-8') as f:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
                 data = json.load(f)
         except FileNotFoundError:
-            self.log(f"❌ ERRO CRÍTICO: Arquivo de dados não encontrado em '{HIERARQUIA_FILE}'")
+            self.log(f"❌ ERRO CRÍTICO: Arquivo de dados não encontrado em '{self.caminho}'")
             self.log(f"  (Verifique se 'materias_assuntos_tec.json' está na pasta 'data' e se a pasta foi incluída no build)")
             raise
         except json.JSONDecodeError:
-            self.log(f"❌ ERRO CRÍTICO: O arquivo '{HIERARQUIA_FILE}' não é um JSON válido.")
+            self.log(f"❌ ERRO CRÍTICO: O arquivo '{self.caminho}' não é um JSON válido.")
             raise
         
         # O resto do seu código permanece exatamente o mesmo...
         materias_list = []
         assuntos_dict = {}
+        niveis_dict = {}
+        questoes_dict = {}
+        comentadas_dict = {}
         lista_fallback = []
 
         for materia_data in data:
@@ -75,16 +82,36 @@ class DataLoader:
             
             materias_list.append(nome_materia)
             assuntos_dict[nome_materia] = []
+            niveis_dict[nome_materia] = []
+            questoes_dict[nome_materia] = []
+            comentadas_dict[nome_materia] = []
             
             for assunto_data in materia_data.get('assuntos', []):
                 nome_assunto = assunto_data.get('nome')
                 if nome_assunto:
                     assuntos_dict[nome_materia].append(nome_assunto)
+                    niveis_dict[nome_materia].append(int(assunto_data.get('nivel', 0) or 0))
+                    questoes_dict[nome_materia].append(self._to_int(assunto_data.get('questoes')))
+                    comentadas_dict[nome_materia].append(self._to_int(assunto_data.get('comentadas')))
                     lista_fallback.append(nome_assunto)
         
-        self.log(f"Processadas {len(materias_list)} matérias e {len(lista_fallback)} assuntos no total.")
+        vazios = sum(1 for qs in questoes_dict.values() for q in qs if q == 0)
+        self.log(f"Processadas {len(materias_list)} matérias e {len(lista_fallback)} assuntos no total ({vazios} sem questões).")
         
         self.materias = materias_list
         self.assuntos_por_materia = assuntos_dict        
+        self.niveis_por_materia = niveis_dict
+        self.questoes_por_materia = questoes_dict
+        self.comentadas_por_materia = comentadas_dict
         self.lista_completa_fallback = lista_fallback
 
+    @staticmethod
+    def _to_int(valor) -> Optional[int]:
+        """Contagens vêm como texto no JSON ("14759", às vezes "1.234"). Ausente/inválida vira None (desconhecida)."""
+        if valor is None:
+            return None
+        try:
+            return int(str(valor).replace('.', '').strip())
+        except ValueError:
+            return None
+
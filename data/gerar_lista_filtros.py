@@ -3,14 +3,32 @@
 Script para converter o JSON consolidado em uma lista Python de filtros
 para uso no sistema de matching de IA.
 
-Gera dois arquivos:
-1. filtros_tec_completo.py - Lista completa (matérias + assuntos)
-2. filtros_tec_materias.py - Apenas matérias (para matching mais rápido)
+Comandos:
+  listas (padrão) - Gera dois arquivos:
+      1. filtros_tec_completo.py - Lista completa (matérias + assuntos)
+      2. filtros_tec_materias.py - Apenas matérias (para matching mais rápido)
+  indice          - Pré-computa os artefatos do TextMatcher (embeddings de matérias,
+                    assuntos e fallback, textos normalizados e manifesto)
+                    em data/indice, prontos para empacotar com o PyInstaller.
+  diff            - Compara duas versões do catálogo (adicionados, removidos,
+                    renomeados e movidos). Com --aplicar, atualiza os embeddings
+                    de forma incremental e remapeia os cursos em cache/matches_cache.json.
+
+Uso:
+  python data/gerar_lista_filtros.py
+  python data/gerar_lista_filtros.py indice [--catalogo ARQ.json] [--saida PASTA] [--modelo NOME]
+  python data/gerar_lista_filtros.py diff ANTIGO.json NOVO.json [--aplicar] [--relatorio ARQ.json]
 """
 
+import sys
 import json
+import argparse
+import time
 from pathlib import Path
 
+# Permite importar 'data' e 'src' ao rodar o script diretamente
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
 def gerar_lista_filtros():
     """
     Lê o JSON consolidado e gera listas Python de filtros
@@ -122,5 +140,143 @@ def gerar_lista_filtros():
     print("\n" + "=" * 80)
 
 
+def gerar_indice(catalogo: Path, saida: Path, modelo: str = None):
+    """
+    Carrega o catálogo, calcula todos os embeddings do zero (sem ler o cache local)
+    e grava o índice pré-computado que o TextMatcher usa na inicialização.
+    """
+    from data.data_loader import DataLoader
+    from src.matching import TextMatcher, MODELO_PADRAO
+
+    modelo = modelo or MODELO_PADRAO
+    print("\n" + "=" * 80)
+    print("🧠 GERANDO ÍNDICE PRÉ-COMPUTADO DO MATCHER")
+    print("=" * 80)
+
+    inicio = time.time()
+    print(f"\n[1/3] Carregando catálogo: {catalogo}")
+    loader = DataLoader(lambda msg: print(f"   {msg}"), caminho=str(catalogo))
+
+    print(f"\n[2/3] Calculando embeddings com o modelo '{modelo}'...")
+    matcher = TextMatcher(
+        log_callback=lambda msg: print(f"   {msg}"),
+        lista_materias=loader.materias,
+        dict_assuntos_por_materia=loader.assuntos_por_materia,
+        lista_completa_fallback=loader.lista_completa_fallback,
+        model_name=modelo,
+        index_dir=None,
+        usar_cache=False
+    )
+
+    print(f"\n[3/3] Salvando artefatos em: {saida}")
+    manifest = matcher.exportar_indice(str(saida))
+
+    print("\n" + "=" * 80)
+    print("📊 ESTATÍSTICAS")
+    print("=" * 80)
+    print(f"Matérias: {manifest['totais']['materias']}")
+    print(f"Assuntos: {manifest['totais']['assuntos']}")
+    print(f"Dimensão dos embeddings: {manifest['dimensao']}")
+    print(f"Assinatura do catálogo: {manifest['assinatura_catalogo'][:16]}...")
+    print(f"Tempo total: {time.time() - inicio:.1f}s")
+    print("\n✅ Índice gerado com sucesso!")
+    print('📦 PyInstaller: --add-data "data/indice;data/indice"')
+    print("\n" + "=" * 80)
+
+
+def diff_catalogo(antigo: Path, novo: Path, aplicar: bool = False, relatorio: Path = None):
+    """
+    Mostra o que mudou entre duas versões do catálogo e, opcionalmente,
+    propaga as mudanças para os embeddings e para o cache de cursos.
+    """
+    from data.data_loader import DataLoader
+    from src.catalog_diff import carregar_catalogo, diff_catalogos
+
+    print("\n" + "=" * 80)
+    print("🔀 COMPARANDO VERSÕES DO CATÁLOGO")
+    print("=" * 80)
+    print(f"Antigo: {antigo}")
+    print(f"Novo:   {novo}")
+
+    diff = diff_catalogos(carregar_catalogo(antigo), carregar_catalogo(novo))
+
+    print("\n📊 RESUMO")
+    print(f"Matérias adicionadas: {len(diff['materias']['adicionadas'])}")
+    print(f"Matérias removidas:   {len(diff['materias']['removidas'])}")
+    print(f"Matérias renomeadas:  {len(diff['materias']['renomeadas'])}")
+    print(f"Assuntos inalterados: {diff['inalterados']}")
+    print(f"Assuntos adicionados: {len(diff['adicionados'])}")
+    print(f"Assuntos removidos:   {len(diff['removidos'])}")
+    print(f"Assuntos renomeados:  {len(diff['renomeados'])}")
+    print(f"Assuntos movidos:     {len(diff['movidos'])}")
+
+    for r in diff["renomeados"][:20]:
+        print(f"   ✏️  [{r['materia']}] '{r['de']}' -> '{r['para']}'")
+    for r in diff["removidos"][:20]:
+        print(f"   🗑️  [{r['materia']}] '{r['nome']}'")
+
+    if relatorio:
+        with open(relatorio, 'w', encoding='utf-8') as f:
+            json.dump(diff, f, ensure_ascii=False, indent=4)
+        print(f"\n📁 Relatório completo salvo em: {relatorio}")
+
+    if not aplicar:
+        print("\nℹ️ Nada foi alterado. Use --aplicar para atualizar embeddings e cache de cursos.")
+        return
+
+    from src.catalog_diff import aplicar_patch_embeddings
+    from src.cache_manager import CacheManager
+
+    log = lambda msg: print(f"   {msg}")
+    loader_antigo = DataLoader(log, caminho=str(antigo))
+    loader_novo = DataLoader(log, caminho=str(novo))
+
+    print("\n[1/2] Atualizando embeddings (somente textos novos são calculados)...")
+    stats = aplicar_patch_embeddings(loader_antigo, loader_novo, log)
+    print(f"   ✓ {stats['reaproveitados']} reaproveitados, {stats['calculados']} calculados")
+
+    print("\n[2/2] Remapeando cursos salvos em cache/matches_cache.json...")
+    cache = CacheManager(log_callback=log)
+    termos_validos = set(loader_novo.materias) | set(loader_novo.lista_completa_fallback)
+    obsoletos = cache.remapear_termos(diff["renomeacoes"], termos_validos)
+    cache.save_cache()
+    total_obsoletos = sum(len(t) for aulas in obsoletos.values() for t in aulas.values())
+    print(f"   ✓ {len(diff['renomeacoes'])} renomeações aplicadas")
+    if total_obsoletos:
+        print(f"   ⚠️ {total_obsoletos} termo(s) sem correspondência no catálogo novo (ver meta.termos_obsoletos):")
+        for course_id, aulas in obsoletos.items():
+            for aula, termos in aulas.items():
+                print(f"      [{course_id}] {aula[:50]}: {', '.join(termos)}")
+
+    print("\n✅ Catálogo atualizado!")
+
+
+def main():
+    from data.data_loader import HIERARQUIA_FILE
+
+    parser = argparse.ArgumentParser(description="Geração de artefatos a partir do catálogo do TEC.")
+    sub = parser.add_subparsers(dest="comando")
+    sub.add_parser("listas", help="Gera filtros_tec_materias.py e filtros_tec_completo.py")
+
+    p_indice = sub.add_parser("indice", help="Pré-computa o índice do TextMatcher")
+    p_indice.add_argument("--catalogo", type=Path, default=Path(HIERARQUIA_FILE))
+    p_indice.add_argument("--saida", type=Path, default=Path(__file__).parent / "indice")
+    p_indice.add_argument("--modelo", default=None, help="Padrão: o mesmo modelo do TextMatcher")
+
+    p_diff = sub.add_parser("diff", help="Compara duas versões do catálogo")
+    p_diff.add_argument("antigo", type=Path)
+    p_diff.add_argument("novo", type=Path)
+    p_diff.add_argument("--aplicar", action="store_true", help="Atualiza embeddings e cache de cursos")
+    p_diff.add_argument("--relatorio", type=Path, default=None, help="Salva o diff completo em JSON")
+
+    args = parser.parse_args()
+    if args.comando == "indice":
+        gerar_indice(args.catalogo, args.saida, args.modelo)
+    elif args.comando == "diff":
+        diff_catalogo(args.antigo, args.novo, args.aplicar, args.relatorio)
+    else:
+        gerar_lista_filtros()
+
+
 if __name__ == "__main__":
-    gerar_lista_filtros()
+    main()
@@ -1,33 +1,176 @@
-# main.py (VERSÃO ORIGINAL RESTAURADA)
+# main.py
+#
+# Ponto de entrada de linha de comando (sem GUI).
+# Processa vários cursos em lote reaproveitando UM modelo e UM navegador:
+# BO -> matching -> (aceite automático opcional) -> TEC -> relatório, por curso,
+# e grava um resumo JSON legível por máquina em relatorios/lote_<data>.json.
+#
+# Uso:
+#   python main.py lote cursos.json [--aceitar-acima 0.75] [--sem-tec] [--headless] [--resumo saida.json]
+#   python main.py lote cursos.json --paralelo 3   # scheduler: até 3 páginas, etapas em paralelo
+#   python main.py reextrair 12345                 # re-extrai offline o HTML salvo do curso no BO
+#   python main.py replay cache/tec_gravacoes      # servidor local que repete respostas gravadas do TEC
+#   python run_gui.py                 # interface gráfica
+#
 
 import sys
 import os
+import argparse
 from typing import Dict, Any, Callable
 
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
-from src.automation.orchestrator import Orchestrator
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
 
 def run_automation_logic(config: Dict[str, Any], log_callback: Callable[..., None], headless: bool = False) -> str:
     """
-    Função chamada pela GUI original (ttkbootstrap).
+    Mantida para compatibilidade: processa um único curso (config no formato da GUI)
+    e devolve o caminho do relatório.
     """
+    from src.automation.orchestrator import Orchestrator
+
     log_callback("=" * 50)
-    log_callback("🚀 INICIANDO ORQUESTRADOR (MODO ORIGINAL)")
+    log_callback("🚀 INICIANDO ORQUESTRADOR")
     log_callback("=" * 50)
-    
+
     try:
-        # Instancia o Orchestrator passando a config (que agora tem 'materia_selecionada')
         orchestrator = Orchestrator(
-            user_data=config, 
+            user_data=config,
             log_callback=log_callback,
             headless=headless
         )
-        
-        return orchestrator.run()
-            
+        report_path, _ = orchestrator.run_tec_automation()
+        return report_path
+
     except Exception as e:
         log_callback(f"❌ Erro fatal no main.py: {e}")
         return None
 
+
+def reextrair_offline(curso_id: str) -> int:
+    """Roda o extrator do BO sobre o HTML do último snapshot (sem login) e compara com as aulas salvas."""
+    from src.bo_snapshot import SnapshotsBO, curso_id_valido
+    from src.automation.web_automation import WebAutomation
+    from src.automation.bo_integration import BoAutomation
+
+    if not curso_id_valido(curso_id):
+        print(f"❌ ID de curso inválido: {curso_id!r}")
+        return 1
+    snapshots = SnapshotsBO(print)
+    html = snapshots.carregar_html(curso_id)
+    if html is None:
+        print(f"❌ Nenhum HTML salvo para o curso {curso_id} (rode a busca no BO antes).")
+        return 1
+    salvas = [a["texto"] for a in (snapshots.carregar(curso_id) or {}).get("aulas", [])]
+
+    with WebAutomation(log_callback=print, headless=True, perfis_rede={}) as automation:
+        bo = BoAutomation(automation.page, print)
+        registros = bo.extrair_de_html(html)
+
+    textos = [bo.formatar_aula(r) for r in registros]
+    for r in registros:
+        print(f"   #{r['indice'] + 1} [aula {r['numero']}] id={r['id']} | {r['titulo'][:60]} | {len(r['conteudo'])} chars")
+    diferentes = set(textos) ^ set(salvas)
+    print(f"\n📊 {len(textos)} aula(s) re-extraída(s); {len(diferentes)} diferença(s) em relação ao snapshot.")
+    return 0
+
+
+def servir_replay(caminho: str, porta: int) -> int:
+    """Sobe o ServidorReplay até Ctrl+C; aponte o cliente para ele com TEC_HTTP_BASE."""
+    import time
+    from src.automation.tec_replay import ServidorReplay
+
+    if not os.path.exists(caminho):
+        print(f"❌ Gravações não encontradas: {caminho} (grave com AUTOMACAO_GRAVAR_TEC=1).")
+        return 1
+    with ServidorReplay(caminho, porta=porta) as servidor:
+        print(f"🔁 Replay do TEC em {servidor.url} (TEC_HTTP_BASE={servidor.url}). Ctrl+C para sair.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def main() -> int:
+    from src.automation.tec_http import endpoints_verificados
+
+    parser = argparse.ArgumentParser(description="Automação TEC em linha de comando.")
+    sub = parser.add_subparsers(dest="comando")
+
+    p_lote = sub.add_parser("lote", help="Processa vários cursos listados em um arquivo JSON.")
+    p_lote.add_argument("arquivo", help="JSON com 'cursos' (IDs ou objetos com 'id' e filtros) e 'padrao' opcional.")
+    p_lote.add_argument("--aceitar-acima", type=float, default=None,
+                        help="Aceita automaticamente matches com score >= valor em cursos ainda não revisados.")
+    p_lote.add_argument("--sem-tec", action="store_true", help="Só busca, casa e salva no cache (não cria cadernos).")
+    p_lote.add_argument("--headless", action="store_true", help="Navegador invisível (os logins manuais exigem navegador visível).")
+    p_lote.add_argument("--resumo", help="Caminho do resumo JSON (padrão: relatorios/lote_<data>.json).")
+    p_lote.add_argument("--settings", default=None, help="Arquivo de credenciais/filtros base (padrão: user_settings.json).")
+    p_lote.add_argument("--paralelo", type=int, default=0,
+                        help="Usa o scheduler com até N páginas de navegador simultâneas (0 = um curso por vez).")
+    p_lote.add_argument("--workers-matching", type=int, default=1, help="Jobs de matching simultâneos no scheduler.")
+    p_lote.add_argument("--abas", type=int, default=None,
+                        help="Abas paralelas na criação dos cadernos de cada curso (exige sessão do TEC salva).")
+    if endpoints_verificados(): # Escondido até data/tec_endpoints.json ser conferido contra uma gravação real
+        p_lote.add_argument("--tec-http", action="store_true",
+                            help="Cria os cadernos pelos endpoints JSON do TEC (volta ao navegador se a resposta mudar).")
+
+    p_reextrair = sub.add_parser("reextrair", help="Re-extrai offline as aulas do HTML salvo de um curso do BO.")
+    p_reextrair.add_argument("curso_id")
+
+    p_replay = sub.add_parser("replay", help="Servidor local com respostas gravadas do TEC (para o atalho HTTP).")
+    p_replay.add_argument("gravacoes", help="Arquivo .jsonl ou pasta (padrão de gravação: cache/tec_gravacoes).")
+    p_replay.add_argument("--porta", type=int, default=8765)
+
+    args = parser.parse_args()
+    if args.comando == "reextrair":
+        return reextrair_offline(args.curso_id)
+    if args.comando == "replay":
+        return servir_replay(args.gravacoes, args.porta)
+    if args.comando != "lote":
+        parser.print_help()
+        print("\nPara a interface gráfica, execute 'python run_gui.py'.")
+        return 0
+
+    from src.automation.batch import ProcessadorLote, carregar_lote, SETTINGS_FILE
+
+    configs = carregar_lote(args.arquivo, args.settings or SETTINGS_FILE)
+    if not configs:
+        print("❌ Nenhum curso no arquivo de lote.")
+        return 1
+    for config in configs:
+        if args.abas:
+            config["abas_paralelas"] = args.abas
+        if getattr(args, "tec_http", False):
+            config["tec_http"] = True
+
+    if args.paralelo > 0:
+        from src.automation.scheduler import SchedulerCursos
+        processador = SchedulerCursos(
+            log_callback=print,
+            headless=args.headless,
+            max_paginas=args.paralelo,
+            workers_bo=args.paralelo,
+            workers_matching=args.workers_matching,
+            workers_tec=args.paralelo,
+            aceitar_acima=args.aceitar_acima,
+            criar_cadernos=not args.sem_tec
+        )
+    else:
+        processador = ProcessadorLote(
+            log_callback=print,
+            headless=args.headless,
+            aceitar_acima=args.aceitar_acima,
+            criar_cadernos=not args.sem_tec
+        )
+    resumo = processador.processar(configs, args.resumo)
+
+    print("\n📊 RESUMO DO LOTE")
+    for status, total in resumo["totais"].items():
+        if total:
+            print(f"   - {status}: {total}")
+    return 0 if resumo["totais"]["erro"] == 0 else 2
+
+
 if __name__ == "__main__":
-    print("Execute 'python run_gui.py' para abrir o programa.")
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# src/aula_preprocessing.py
+"""
+Pré-processamento dos títulos de aula vindos do BackOffice.
+
+Todas as regras ficam em data/regras_aulas.json e são compiladas em DUAS
+expressões combinadas (uma alternância com grupos nomeados por regra):
+uma para limpeza e outra para detectar aulas especiais que devem ser puladas.
+Cada texto é varrido uma única vez e o grupo que casou diz qual regra disparou.
+"""
+
+import re
+import json
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
+
+from data.data_loader import resource_path
+from src.text_normalization import normalizar_texto, normalizar_lista
+
+REGRAS_FILE = resource_path("data/regras_aulas.json")
+
+
+class PreprocessadorAulas:
+    def __init__(self, regras: Optional[Dict[str, Any]] = None, caminho: str = REGRAS_FILE):
+        if regras is None:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                regras = json.load(f)
+
+        self.regras_limpeza = regras.get("limpeza", [])
+        self.regras_pulo = regras.get("pular", [])
+        # Muda com qualquer edição das regras: invalida os matches salvos (bo_snapshot.assinatura_matching)
+        base = json.dumps([self.regras_limpeza, self.regras_pulo], sort_keys=True, ensure_ascii=False)
+        self.assinatura = hashlib.sha1(base.encode("utf-8")).hexdigest()[:16]
+        self._re_limpeza, self._grupos_limpeza = self._compilar(self.regras_limpeza)
+        self._re_pulo, self._grupos_pulo = self._compilar(self.regras_pulo)
+
+    @staticmethod
+    def _compilar(regras: List[Dict[str, Any]]) -> Tuple[Optional["re.Pattern"], Dict[str, Dict[str, Any]]]:
+        """Junta as regras em '(?P<r0>...)|(?P<r1>...)' e devolve o mapa grupo -> regra."""
+        if not regras:
+            return None, {}
+        grupos = {f"r{i}": regra for i, regra in enumerate(regras)}
+        alternancia = "|".join(f"(?P<{g}>{regra['padrao']})" for g, regra in grupos.items())
+        return re.compile(alternancia, re.IGNORECASE), grupos
+
+    def limpar(self, nome: str) -> Tuple[str, List[str]]:
+        """Aplica todas as regras de limpeza numa única varredura. Retorna (texto_limpo, regras_disparadas)."""
+        if not nome or self._re_limpeza is None:
+            return (nome or "").strip(), []
+        disparadas = []
+
+        def substituir(m):
+            regra = self._grupos_limpeza[m.lastgroup]
+            if regra["nome"] not in disparadas:
+                disparadas.append(regra["nome"])
+            return regra.get("substituicao", "")
+
+        return self._re_limpeza.sub(substituir, nome).strip(), disparadas
+
+    def regra_pulo(self, texto: str, ja_normalizado: bool = False) -> Optional[str]:
+        """Nome da regra de aula especial que casa com o texto (ou None se a aula deve ser processada)."""
+        if self._re_pulo is None or not texto:
+            return None
+        m = self._re_pulo.search(texto if ja_normalizado else normalizar_texto(texto))
+        return self._grupos_pulo[m.lastgroup]["nome"] if m else None
+
+    def processar(self, aulas: List[str]) -> List[Dict[str, Any]]:
+        """
+        Processa um curso inteiro de uma vez.
+        Cada item: {'original', 'limpo', 'limpeza': [regras], 'pular': regra ou None}.
+        """
+        limpos = [self.limpar(a) for a in aulas]
+        normalizados = normalizar_lista([l for l, _ in limpos])
+        return [
+            {
+                "original": original,
+                "limpo": limpo,
+                "limpeza": regras,
+                "pular": self.regra_pulo(norm, ja_normalizado=True),
+            }
+            for original, (limpo, regras), norm in zip(aulas, limpos, normalizados)
+        ]
@@ -0,0 +1,176 @@
+# src/automation/batch.py
+"""
+Processamento em lote (sem GUI): vários cursos com UM modelo e UM navegador.
+
+Arquivo de entrada (JSON):
+{
+  "padrao": {"banca": "CEBRASPE", "ano": "2023,2024", "escolaridade": "Superior",
+             "area_carreira": "", "materia_selecionada": ["Direito Administrativo"]},
+  "cursos": ["12345", {"id": "67890", "materia_selecionada": ["Direito Constitucional"]}]
+}
+Credenciais e filtros ausentes vêm do user_settings.json da GUI; 'padrao' e cada
+curso sobrescrevem, nessa ordem.
+"""
+
+import os
+import json
+import time
+import traceback
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from data.data_loader import DataLoader
+from src.matching import TextMatcher
+from src.telemetry import Telemetria
+from src.bo_snapshot import curso_id_valido
+from .web_automation import WebAutomation
+from .orchestrator import Orchestrator
+
+SETTINGS_FILE = "user_settings.json"
+RESUMO_DIR = "relatorios"
+
+
+def carregar_lote(caminho: str, settings_file: str = SETTINGS_FILE) -> List[Dict[str, Any]]:
+    """Lê o arquivo de lote e devolve um user_data completo (formato da GUI) por curso."""
+    base = {}
+    if settings_file and os.path.exists(settings_file):
+        with open(settings_file, "r", encoding="utf-8") as f:
+            base = json.load(f)
+
+    with open(caminho, "r", encoding="utf-8") as f:
+        lote = json.load(f)
+    if isinstance(lote, list):
+        lote = {"cursos": lote}
+
+    configs = []
+    for curso in lote.get("cursos", []):
+        if not isinstance(curso, dict):
+            curso = {"id": str(curso)}
+        config = {**base, **lote.get("padrao", {}), **curso}
+        curso_id = str(config.pop("id", "")).strip()
+        if not curso_id and "id=" in config.get("course_url", ""):
+            curso_id = config["course_url"].split("id=")[-1].strip()
+        if not curso_id:
+            raise ValueError(f"Curso sem 'id' no lote: {curso}")
+        if not curso_id_valido(curso_id):
+            raise ValueError(f"ID de curso inválido no lote: {curso_id!r}")
+        # O Orchestrator e o relatório extraem o ID da URL do curso
+        config["course_url"] = f"?id={curso_id}"
+        config["curso_id"] = curso_id
+        configs.append(config)
+    return configs
+
+
+class ProcessadorLote:
+    def __init__(self, log_callback: Callable[..., None], headless: bool = False,
+                 aceitar_acima: Optional[float] = None, criar_cadernos: bool = True):
+        """
+        aceitar_acima: score mínimo para aceitar automaticamente os matches da IA em cursos
+                       ainda não revisados. None = cursos sem revisão ficam pendentes.
+        criar_cadernos: False para só buscar/casar/salvar (sem ida ao TEC).
+        """
+        self.log = log_callback
+        self.headless = headless
+        self.aceitar_acima = aceitar_acima
+        self.criar_cadernos = criar_cadernos
+        self.telemetria = Telemetria(log_callback=self.log)
+
+        # Recursos caros, criados uma única vez para o lote inteiro
+        with self.telemetria.span("lote.inicializar"):
+            self.data_loader = DataLoader(log_callback=self.log)
+            self.text_matcher = TextMatcher(
+                log_callback=self.log,
+                lista_materias=self.data_loader.materias,
+                dict_assuntos_por_materia=self.data_loader.assuntos_por_materia,
+                lista_completa_fallback=self.data_loader.lista_completa_fallback,
+                questoes_por_materia=self.data_loader.questoes_por_materia,
+                telemetria=self.telemetria
+            )
+        self.automation = WebAutomation(log_callback=self.log, headless=headless)
+
+    def processar(self, configs: List[Dict[str, Any]], caminho_resumo: Optional[str] = None) -> Dict[str, Any]:
+        resultados = []
+        inicio = time.perf_counter()
+        try:
+            with self.telemetria.span("navegador.iniciar"):
+                self.automation.start()
+            for i, config in enumerate(configs, 1):
+                self.log("\n" + "=" * 60)
+                self.log(f"📚 Curso {i}/{len(configs)}: {config['curso_id']}")
+                self.log("=" * 60)
+                resultados.append(self.processar_curso(config))
+        finally:
+            self.automation.stop()
+
+        resumo = {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "run_telemetria": self.telemetria.run_id,
+            "duracao_s": round(time.perf_counter() - inicio, 1),
+            "aceitar_acima": self.aceitar_acima,
+            "cursos": resultados,
+            "totais": {
+                status: sum(1 for r in resultados if r["status"] == status)
+                for status in ("concluido", "pendente_revisao", "sem_aulas", "falha_tec", "erro")
+            },
+        }
+        self.telemetria.finalizar()
+
+        caminho_resumo = caminho_resumo or os.path.join(
+            RESUMO_DIR, f"lote_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(caminho_resumo) or ".", exist_ok=True)
+        with open(caminho_resumo, "w", encoding="utf-8") as f:
+            json.dump(resumo, f, ensure_ascii=False, indent=2)
+        resumo["arquivo"] = caminho_resumo
+        self.log(f"\n🧾 Resumo do lote salvo em {caminho_resumo}")
+        return resumo
+
+    def processar_curso(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        curso_id = config["curso_id"]
+        r = {"curso_id": curso_id, "status": "erro", "aulas": 0, "aceitas_auto": 0,
+             "cadernos_ok": 0, "cadernos_falha": 0, "questoes": 0, "relatorio": None, "erro": None}
+        inicio = time.perf_counter()
+        try:
+            with self.telemetria.span("lote.curso", curso=curso_id) as span:
+                orc = Orchestrator(config, self.log, headless=self.headless, telemetria=self.telemetria,
+                                   data_loader=self.data_loader, text_matcher=self.text_matcher,
+                                   automation=self.automation)
+                orc.cache_manager.set_course_id(curso_id)
+                ja_revisado = orc.cache_manager.has_data()
+
+                dados = orc.fetch_and_preview_matches()
+                r["aulas"] = len(dados)
+                if not dados:
+                    r["status"] = "sem_aulas"
+                    return r
+
+                if not ja_revisado:
+                    if self.aceitar_acima is None:
+                        self.log("📝 Curso sem revisão salva: rode a revisão na GUI ou use --aceitar-acima.")
+                        r["status"] = "pendente_revisao"
+                        return r
+                    r["aceitas_auto"] = orc.aceitar_automaticamente(dados, self.aceitar_acima)
+
+                if not self.criar_cadernos:
+                    r["status"] = "concluido"
+                    return r
+
+                report_path, final_res = orc.run_tec_automation()
+                r["relatorio"] = report_path
+                r["cadernos_ok"] = sum(1 for t in final_res if t.get("success"))
+                r["cadernos_falha"] = len(final_res) - r["cadernos_ok"]
+                r["questoes"] = sum(t.get("num_questoes") or 0 for t in final_res if t.get("success"))
+                r["cadernos"] = [
+                    {"nome": t["nome_caderno"], "success": bool(t.get("success")), "url": t.get("url"),
+                     "num_questoes": t.get("num_questoes", 0), "erro": t.get("erro")}
+                    for t in final_res
+                ]
+                r["status"] = "concluido" if report_path else "falha_tec"
+                span.set(status=r["status"])
+        except Exception as e:
+            r["erro"] = str(e)
+            self.log(f"❌ Erro no curso {curso_id}: {e}")
+            self.log(traceback.format_exc())
+        finally:
+            r["duracao_s"] = round(time.perf_counter() - inicio, 1)
+        return r
@@ -1,7 +1,44 @@
 # Ficheiro: src/automation/bo_integration.py
 
-from typing import List, Callable
+import re
+from typing import Any, Callable, Dict, List
 from playwright.sync_api import Page
+from src.telemetry import Telemetria
+from .web_automation import registrar_navegacao
+
+SELETOR_CONTAINER_AULA = "div.blocoLink"
+
+# Extrai TODAS as aulas numa única chamada. Layout padrão: linha 3 da tabela = título,
+# linha 4 = conteúdo. Variantes: título = 1ª célula que começa com "Aula N" (ou a 1ª
+# célula não vazia) e conteúdo = a célula seguinte a ela. 'fallback' lista os campos
+# que não vieram do layout padrão.
+JS_EXTRAIR_AULAS = """(seletor) => {
+    const texto = (el) => (el && el.innerText || '').trim();
+    return Array.from(document.querySelectorAll(seletor)).map((c, indice) => {
+        const fallback = [];
+        const celulas = Array.from(c.querySelectorAll('table > tbody > tr > td')).filter(td => texto(td));
+        let tdTitulo = c.querySelector('table > tbody > tr:nth-child(3) > td');
+        let tdConteudo = c.querySelector('table > tbody > tr:nth-child(4) > td');
+        if (!texto(tdTitulo)) {
+            tdTitulo = celulas.find(td => /^aula\\s*\\d+/i.test(texto(td))) || celulas[0] || null;
+            fallback.push('titulo');
+        }
+        if (!texto(tdConteudo) || tdConteudo === tdTitulo) {
+            const i = celulas.indexOf(tdTitulo);
+            tdConteudo = i >= 0 ? (celulas[i + 1] || null) : null;
+            fallback.push('conteudo');
+        }
+        let id = c.id || c.getAttribute('data-id') || null;
+        const links = Array.from(c.querySelectorAll('a[href]')).map(a => a.href);
+        if (!id) {
+            for (const href of links) {
+                const m = href.match(/[?&](?:id|codigo|aula)=(\\d+)/i);
+                if (m) { id = m[1]; break; }
+            }
+        }
+        return {indice, titulo: texto(tdTitulo), conteudo: texto(tdConteudo), id, links, fallback};
+    });
+}"""
 
 class BoAutomation:
     """
@@ -9,21 +46,27 @@ class BoAutomation:
     Usa o log_callback injetado para reportar o progresso para a GUI.
     """
 
-    def __init__(self, page: Page, log_callback: Callable[..., None]):
+    def __init__(self, page: Page, log_callback: Callable[..., None], telemetria: Telemetria = None):
         """
         Inicializa o robô do Back Office.
         
         Args:
             page (Page): A página do Playwright que será controlada.
             log_callback (Callable): Função da GUI para enviar mensagens de log.
+            telemetria (Telemetria): Spans de login/extração (opcional).
         """
         self.page = page
         self.log = log_callback
+        self.telemetria = telemetria or Telemetria.nula()
 
     def login(self, username, password):
         """
         Preenche as credenciais e pausa para o usuário fazer o login manualmente.
         """
+        with self.telemetria.span("bo.login", manual=True):
+            self._login(username, password)
+
+    def _login(self, username, password):
         self.log("Navegando até a página de login do BO...")
         self.page.goto("https://estrategiaconcursos.com.br/adminProf")
         self.page.wait_for_load_state("domcontentloaded")
@@ -63,36 +106,68 @@ class BoAutomation:
 
     def get_aulas(self, course_code: str) -> List[str]:
         """Extrai os nomes das aulas de um curso específico no Back Office."""
+        return [self.formatar_aula(r) for r in self.get_aulas_detalhadas(course_code)]
+
+    def get_aulas_detalhadas(self, course_code: str) -> List[Dict[str, Any]]:
+        """Como get_aulas, mas devolve os registros estruturados (número, título, conteúdo, id, links)."""
+        with self.telemetria.span("bo.get_aulas", curso=course_code) as span:
+            registros = self._extrair_aulas(course_code)
+            span.set(n_aulas=len(registros))
+            return registros
+
+    @staticmethod
+    def formatar_aula(registro: Dict[str, Any]) -> str:
+        """
+        Texto da aula no formato usado pelo matcher e pelo cache: 'Título: conteúdo'.
+        Mesmo sem conteúdo fica 'Título: ', como sempre foi: o texto é a chave das revisões salvas.
+        """
+        return f"{registro['titulo']}: {registro['conteudo']}"
+
+    def _extrair_aulas(self, course_code: str) -> List[Dict[str, Any]]:
         self.log(f"\nIniciando extração para o curso de código: {course_code}")
         url_curso = f"https://www.estrategiaconcursos.com.br/admin/produto-curso/?codigo={course_code}"
         self.log(f"Navegando para: {url_curso}")
         self.page.goto(url_curso)
         self.page.wait_for_load_state("domcontentloaded")
-        
-        seletor_container_aula = "div.blocoLink"
-        seletor_nome_aula = "table > tbody > tr:nth-child(3) > td"
-        seletor_conteudo_aula = "table > tbody > tr:nth-child(4) > td"
+        registrar_navegacao(self.page, self.telemetria, "bo.pagina_curso")
         
         self.log("Procurando por aulas na página...")
-        lista_de_aulas = []
-        
         try:
-            self.page.wait_for_selector(seletor_container_aula, timeout=15000)
-            containers_de_aula = self.page.locator(seletor_container_aula).all()
+            self.page.wait_for_selector(SELETOR_CONTAINER_AULA, timeout=15000)
         except Exception:
             self.log("❌ Nenhum container de aula encontrado. Verifique o código do curso ou o HTML da página.")
             return []
-            
-        self.log(f"Encontrado(s) {len(containers_de_aula)} elemento(s) de aula. Extraindo dados...")
-        for container in containers_de_aula:
-            try:
-                nome_aula = container.locator(seletor_nome_aula).inner_text()
-                conteudo_aula = container.locator(seletor_conteudo_aula).inner_text()
-                conteudo_limpo = " ".join(conteudo_aula.strip().split())
-                aula_completa = f"{nome_aula.strip()}: {conteudo_limpo}"
-                lista_de_aulas.append(aula_completa)
-            except Exception as e:
-                # Loga como aviso, mas continua tentando as outras aulas
-                self.log(f"⚠️ Erro ao extrair dados de uma aula: {e}")
+        return self._extrair_da_pagina()
+
+    def extrair_de_html(self, html: str) -> List[Dict[str, Any]]:
+        """Re-extração offline: carrega um HTML salvo (snapshot) na página e roda o mesmo extrator."""
+        self.page.set_content(html, wait_until="domcontentloaded")
+        return self._extrair_da_pagina()
+
+    def _extrair_da_pagina(self) -> List[Dict[str, Any]]:
+        # Uma única ida ao navegador para todas as aulas (antes: 2 inner_text por aula)
+        with self.telemetria.span("bo.extrair_dom"):
+            brutos = self.page.evaluate(JS_EXTRAIR_AULAS, SELETOR_CONTAINER_AULA)
+        self.log(f"Encontrado(s) {len(brutos)} elemento(s) de aula. Extraindo dados...")
+
+        lista_de_aulas = []
+        for bruto in brutos:
+            titulo = (bruto.get("titulo") or "").strip()
+            if not titulo:
+                # Loga como aviso, mas continua com as outras aulas
+                self.log(f"⚠️ Aula #{bruto['indice'] + 1} sem título reconhecível; ignorada.")
+                self.telemetria.contar("bo.aula_com_erro")
+                continue
+            if bruto.get("fallback"):
+                self.telemetria.contar("bo.campo_fallback", n=len(bruto["fallback"]), campos=",".join(bruto["fallback"]))
+            numero = re.search(r"aula\s*(\d+)", titulo, re.IGNORECASE)
+            lista_de_aulas.append({
+                "indice": bruto["indice"],
+                "numero": int(numero.group(1)) if numero else None,
+                "titulo": titulo,
+                "conteudo": " ".join((bruto.get("conteudo") or "").split()),
+                "id": bruto.get("id"),
+                "links": bruto.get("links", []),
+            })
                 
         return lista_de_aulas
@@ -0,0 +1,237 @@
+# src/automation/browser_manager.py
+"""
+Navegador de longa duração, compartilhado entre a Revisão (BO) e a Criação (TEC).
+
+O Playwright síncrono só pode ser usado na thread que o iniciou. Por isso o
+BrowserManager tem UMA thread própria: ela inicia o Playwright e o Chrome uma
+única vez e executa ali todo o trabalho de página (executar(site, funcao)).
+
+Cada site tem o seu contexto e a sua página (um WebAutomation "anexado" ao
+navegador), criados sob demanda e reaproveitados entre cliques, junto com os
+logins já feitos (sites_logados). Se o usuário fechar a janela do navegador,
+o próximo executar() abre outro.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .web_automation import WebAutomation, _find_chrome_executable
+
+TIMEOUT_CHROME_S = 20 # Espera pelo arquivo DevToolsActivePort do Chrome compartilhado
+
+
+class BrowserManager:
+    def __init__(self, log_callback: Callable[..., None], headless: bool = False):
+        self.log = log_callback
+        self.headless = headless
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="navegador")
+        self._base: Optional[WebAutomation] = None # Dona do Playwright e do navegador
+        self._sites: Dict[str, WebAutomation] = {}
+        self._parado = False
+        self._lock = threading.Lock()
+
+    def aquecer(self, sites: Iterable[str] = ("bo", "tec")) -> Future:
+        """Inicia o navegador e as páginas dos sites em segundo plano (ex.: enquanto o usuário preenche o formulário)."""
+        def _aquecer():
+            try:
+                for site in sites:
+                    self._automacao(site)
+                self.log("🔥 Navegador pronto.")
+            except Exception as e:
+                # Sem navegador agora não é fatal: o próximo executar() tenta de novo
+                self.log(f"⚠️ Não foi possível pré-abrir o navegador: {e}")
+        return self._submeter(_aquecer)
+
+    def executar(self, site: str, funcao: Callable[..., Any], *args, **kwargs) -> Any:
+        """Roda funcao(automation_do_site, *args) na thread do navegador e devolve o resultado (bloqueante)."""
+        return self._submeter(lambda: funcao(self._automacao(site), *args, **kwargs)).result()
+
+    def parar(self):
+        """Fecha páginas, navegador e Playwright (na thread deles) e encerra a thread. Idempotente."""
+        with self._lock:
+            if self._parado:
+                return
+            self._parado = True
+        try:
+            self._executor.submit(self._fechar).result(timeout=30)
+        except Exception as e:
+            self.log(f"⚠️ Aviso ao encerrar o navegador: {e}")
+        self._executor.shutdown(wait=False)
+
+    # --- Internos (sempre na thread do navegador) ---
+    def _submeter(self, funcao: Callable[[], Any]) -> Future:
+        with self._lock:
+            if self._parado:
+                raise RuntimeError("BrowserManager já foi encerrado.")
+            return self._executor.submit(funcao)
+
+    def _navegador_ativo(self) -> bool:
+        return self._base is not None and self._base.browser is not None and self._base.browser.is_connected()
+
+    def _iniciar(self):
+        if self._navegador_ativo():
+            return
+        if self._base is not None:
+            self.log("⚠️ O navegador foi fechado. Abrindo outro...")
+            self._fechar()
+        base = WebAutomation(log_callback=self.log, headless=self.headless)
+        base.start()
+        # A página inicial da base não é usada: cada site ganha contexto próprio
+        base.page.close()
+        base.context.close()
+        base.page = base.context = None
+        self._base = base
+
+    def _automacao(self, site: str) -> WebAutomation:
+        self._iniciar()
+        automation = self._sites.get(site)
+        if automation is None or automation.page is None or automation.page.is_closed():
+            if automation is not None:
+                automation.stop()
+            automation = WebAutomation(log_callback=self.log, headless=self.headless)
+            automation.anexar(self._base.browser)
+            self._sites[site] = automation
+        return automation
+
+    def _fechar(self):
+        for automation in self._sites.values():
+            automation.stop()
+        self._sites.clear()
+        if self._base is not None:
+            self._base.stop()
+            self._base = None
+
+
+class ChromeCompartilhado:
+    """
+    Um único processo do Chrome com depuração remota. Cada thread conecta a ele o seu
+    próprio Playwright (WebAutomation.conectar) e abre só um contexto e uma página:
+    N abas custam N renderizadores, não N navegadores inteiros.
+    """
+
+    def __init__(self, log_callback: Callable[..., None], headless: bool = False):
+        self.log = log_callback
+        self.headless = headless
+        self.endpoint: Optional[str] = None
+        self._processo: Optional[subprocess.Popen] = None
+        self._perfil: Optional[str] = None
+
+    def iniciar(self) -> str:
+        """Abre o Chrome e devolve o endpoint CDP (http://127.0.0.1:porta)."""
+        chrome = _find_chrome_executable()
+        if not chrome:
+            raise FileNotFoundError("Nenhum navegador encontrado para as abas paralelas.")
+        self._perfil = tempfile.mkdtemp(prefix="automacao-chrome-")
+        args = [
+            chrome, "--remote-debugging-port=0", f"--user-data-dir={self._perfil}",
+            "--no-first-run", "--no-default-browser-check",
+            "--disable-blink-features=AutomationControlled", "--no-sandbox", "--disable-dev-shm-usage",
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        self._processo = subprocess.Popen(args + ["about:blank"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # Com porta 0, o Chrome escolhe uma livre e a escreve no perfil
+        arquivo_porta = os.path.join(self._perfil, "DevToolsActivePort")
+        limite = time.monotonic() + TIMEOUT_CHROME_S
+        while time.monotonic() < limite:
+            if self._processo.poll() is not None:
+                break
+            try:
+                with open(arquivo_porta, "r", encoding="utf-8") as f:
+                    porta = f.readline().strip()
+                if porta:
+                    self.endpoint = f"http://127.0.0.1:{porta}"
+                    return self.endpoint
+            except OSError:
+                pass
+            time.sleep(0.1)
+        self.parar()
+        raise RuntimeError("O Chrome compartilhado não abriu a porta de depuração.")
+
+    def parar(self):
+        """Encerra o processo (as conexões das threads já devem ter sido fechadas) e apaga o perfil temporário."""
+        if self._processo is not None:
+            self._processo.terminate()
+            try:
+                self._processo.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._processo.kill()
+                self._processo.wait()
+            self._processo = None
+        if self._perfil is not None:
+            shutil.rmtree(self._perfil, ignore_errors=True)
+            self._perfil = None
+        self.endpoint = None
+
+
+class NavegadoresPorThread:
+    """
+    Um WebAutomation por thread de um ThreadPoolExecutor (scheduler, abas paralelas do TEC):
+    cada thread inicia o seu na primeira vez e o reaproveita nas tarefas seguintes.
+    """
+
+    def __init__(self, log_callback: Callable[..., None], headless: bool = False, telemetria=None,
+                 ao_iniciar: Optional[Callable[[WebAutomation], None]] = None, endpoint_cdp: Optional[str] = None):
+        """
+        ao_iniciar: chamado na thread logo após abrir o navegador (ex.: restaurar a sessão).
+        endpoint_cdp: com um ChromeCompartilhado, cada thread só conecta a ele em vez de abrir um navegador.
+        """
+        self.log = log_callback
+        self.headless = headless
+        self.telemetria = telemetria
+        self.ao_iniciar = ao_iniciar
+        self.endpoint_cdp = endpoint_cdp
+        self._local = threading.local()
+
+    def _abrir(self, automation: WebAutomation):
+        if self.endpoint_cdp:
+            automation.conectar(self.endpoint_cdp)
+        else:
+            automation.start()
+
+    def obter(self) -> WebAutomation:
+        automation = getattr(self._local, "automation", None)
+        if automation is None:
+            automation = WebAutomation(log_callback=self.log, headless=self.headless)
+            if self.telemetria is not None:
+                with self.telemetria.span("navegador.iniciar", compartilhado=bool(self.endpoint_cdp)):
+                    self._abrir(automation)
+            else:
+                self._abrir(automation)
+            if self.ao_iniciar is not None:
+                try:
+                    self.ao_iniciar(automation)
+                except Exception:
+                    automation.stop()
+                    raise
+            self._local.automation = automation
+        return automation
+
+    def fechar_todos(self, pool: ThreadPoolExecutor, n_threads: int):
+        """
+        Fecha cada navegador NA SUA thread. Com n_threads tarefas presas na mesma barreira,
+        cada uma ocupa uma thread diferente do pool.
+        """
+        barreira = threading.Barrier(n_threads)
+
+        def fechar():
+            try:
+                barreira.wait(timeout=30)
+            except threading.BrokenBarrierError:
+                pass
+            automation = getattr(self._local, "automation", None)
+            if automation is not None:
+                if self.telemetria is not None:
+                    automation.descarregar_rede(self.telemetria)
+                automation.stop()
+                self._local.automation = None
+
+        for futuro in [pool.submit(fechar) for _ in range(n_threads)]:
+            futuro.result()
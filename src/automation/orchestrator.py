@@ -1,29 +1,104 @@
+import os
+import threading
 import traceback
-import re
-from typing import Dict, Any, Callable, List, Union
+from typing import Dict, Any, Callable, List, Union, Tuple, Optional
 from data.data_loader import DataLoader
 from src.cache_manager import CacheManager
 from .web_automation import WebAutomation
+from .browser_manager import BrowserManager
 from .bo_integration import BoAutomation
 from .tec_automation import TecAutomationPerfeito
+from .tec_paralelo import CriadorParaleloCadernos
+from .tec_http import GravadorRespostas, TecHttpClient, endpoints_verificados, gravacao_ativa
 from src.matching import TextMatcher
+from src.notebook_estimator import EstimadorCadernos
+from src.aula_preprocessing import PreprocessadorAulas
 from src.reporting.report_generator import ReportGenerator
+from src.telemetry import Telemetria
+from src.bo_snapshot import SnapshotsBO, hash_aula, normalizar_aula, assinatura_matching, curso_id_valido
+
+# Um login manual por site de cada vez: navegadores paralelos (scheduler) esperam
+# e reaproveitam a sessão que o primeiro salvar, em vez de pedir vários CAPTCHAs.
+_LOCKS_LOGIN = {"bo": threading.Lock(), "tec": threading.Lock()}
 
 class Orchestrator:
-    def __init__(self, user_data: Dict[str, Any], log_callback: Callable[..., None], headless: bool = False):
+    def __init__(self, user_data: Dict[str, Any], log_callback: Callable[..., None], headless: bool = False,
+                 telemetria: Telemetria = None, data_loader: DataLoader = None, text_matcher: TextMatcher = None,
+                 automation: WebAutomation = None, navegador: BrowserManager = None):
+        """
+        data_loader / text_matcher / automation: recursos compartilhados (modo lote, main.py).
+        Um 'automation' recebido já iniciado não é fechado aqui, e os logins feitos nele são reaproveitados.
+        navegador: BrowserManager de longa duração (GUI); as etapas com página rodam na thread dele.
+        """
         self.user_data = user_data
         self.log = log_callback
         self.headless = headless
+        # Uma execução = um Orchestrator: spans vão para telemetria/<run_id>.jsonl e o resumo para o log.
+        # Telemetria recebida de fora pertence a quem a criou (não é finalizada aqui).
+        self._dono_telemetria = telemetria is None
+        self.telemetria = telemetria or Telemetria(log_callback=self.log)
+        self.automation_compartilhada = automation
+        self.navegador = navegador
         
-        self.cache_manager = CacheManager(log_callback=self.log)
-        self.data_loader = DataLoader(log_callback=self.log)
-        
-        self.text_matcher = TextMatcher(
-            log_callback=self.log,
-            lista_materias=self.data_loader.materias,
-            dict_assuntos_por_materia=self.data_loader.assuntos_por_materia,
-            lista_completa_fallback=self.data_loader.lista_completa_fallback
-        )
+        with self.telemetria.span("orquestrador.inicializar"):
+            self.cache_manager = CacheManager(log_callback=self.log)
+            self.data_loader = data_loader or DataLoader(log_callback=self.log)
+            
+            if text_matcher is not None:
+                self.text_matcher = text_matcher
+                self.preprocessador = text_matcher.preprocessador
+            else:
+                self.preprocessador = PreprocessadorAulas()
+                self.text_matcher = TextMatcher(
+                    log_callback=self.log,
+                    lista_materias=self.data_loader.materias,
+                    dict_assuntos_por_materia=self.data_loader.assuntos_por_materia,
+                    lista_completa_fallback=self.data_loader.lista_completa_fallback,
+                    questoes_por_materia=self.data_loader.questoes_por_materia,
+                    preprocessador=self.preprocessador,
+                    telemetria=self.telemetria
+                )
+            self.estimador = EstimadorCadernos(self.data_loader)
+        self.snapshots = SnapshotsBO(self.log)
+
+    def _finalizar_telemetria(self):
+        if self._dono_telemetria:
+            self.telemetria.finalizar()
+
+    def _abrir_navegador(self, automation: WebAutomation = None) -> Tuple[WebAutomation, bool]:
+        """Devolve (navegador, dono). Só o dono fecha o navegador ao fim da etapa."""
+        automation = automation or self.automation_compartilhada
+        if automation is not None:
+            return automation, False
+        automation = WebAutomation(log_callback=self.log, headless=self.headless)
+        try:
+            with self.telemetria.span("navegador.iniciar"):
+                automation.start()
+        except Exception:
+            automation.stop() # Libera o que chegou a abrir (Playwright sem navegador, etc.)
+            raise
+        return automation, True
+
+    def _garantir_login(self, automation: WebAutomation, site: str, usuario: str, fazer_login: Callable[[], Any]) -> bool:
+        """Sessão já aberta neste navegador > sessão salva válida > login interativo (que é salvo)."""
+        if site in automation.sites_logados:
+            self.log(f"🔑 Sessão do {site.upper()} já aberta neste navegador.")
+            return True
+
+        with _LOCKS_LOGIN[site]:
+            with self.telemetria.span("sessao.restaurar", site=site) as span:
+                valida = automation.restaurar_sessao(site, usuario)
+                span.set(valida=valida)
+            if valida:
+                self.log(f"🔑 Sessão salva do {site.upper()} reaproveitada (sem login manual).")
+                self.telemetria.contar("sessao.reutilizada")
+            else:
+                self.telemetria.contar("sessao.login_manual")
+                if fazer_login() is False:
+                    return False
+                automation.salvar_sessao(site, usuario)
+        automation.sites_logados.add(site)
+        return True
 
     def _extract_course_id(self, url: str) -> str:
         try:
@@ -31,10 +106,18 @@ class Orchestrator:
         except:
             return "unknown"
 
-    def fetch_and_preview_matches(self) -> List[Dict]:
+    def fetch_and_preview_matches(self, atualizar: bool = False) -> List[Dict]:
         """
         BOTÃO 1: Lógica de Preparação (BackOffice + IA + Cache)
+        atualizar: mesmo com revisão salva, relê o curso no BO e só manda à IA as aulas novas/alteradas.
         """
+        try:
+            with self.telemetria.span("orquestrador.revisao", atualizar=atualizar):
+                return self._fetch_and_preview_matches(atualizar)
+        finally:
+            self._finalizar_telemetria()
+
+    def _fetch_and_preview_matches(self, atualizar: bool = False) -> List[Dict]:
         current_url = self.user_data.get('course_url', '')
         current_id = self._extract_course_id(current_url)
         
@@ -44,7 +127,7 @@ class Orchestrator:
         dados_para_review = []
         
         # 2. Verifica se JÁ EXISTEM DADOS salvos para ESTE curso específico
-        if current_id and self.cache_manager.has_data():
+        if current_id and self.cache_manager.has_data() and not atualizar:
             self.log(f"🧠 Curso ID {current_id} encontrado na memória.")
             self.log("⏩ Pulando acesso ao BackOffice e usando dados salvos.")
             
@@ -68,43 +151,151 @@ class Orchestrator:
         
         # Nota: Não resetamos mais o cache global aqui para preservar outros cursos.
         # Se houver dados parciais corrompidos para este curso, o usuário pode limpar manualmente ou sobrescrever.
+        aulas_bo = self.buscar_aulas_bo(current_id)
+        if not aulas_bo:
+            return []
 
-        automation = WebAutomation(log_callback=self.log, headless=self.headless)
+        # 4. RODA A IA (na atualização, só no que mudou desde a revisão)
+        if atualizar and self.cache_manager.has_data():
+            return self._casar_incremental(aulas_bo)
+        return self.casar_aulas(aulas_bo)
+
+    def _casar_incremental(self, aulas_bo: List[str]) -> List[Dict]:
+        """Aulas com o mesmo texto (a menos de espaços) de uma aula revisada herdam a revisão; as demais vão à IA e saem marcadas como 'nova'."""
+        revisadas = self.cache_manager.mapeamentos_normalizados()
+        atuais = {normalizar_aula(a) for a in aulas_bo}
+        delta = [a for a in aulas_bo if normalizar_aula(a) not in revisadas]
+        removidas = sum(1 for chave in revisadas if chave not in atuais)
+        self.log(f"🔁 Atualização: {len(aulas_bo) - len(delta)} aula(s) revisada(s) mantida(s), "
+                 f"{len(delta)} nova(s)/alterada(s) para a IA, {removidas} removida(s) do curso.")
+        self.telemetria.contar("revisao.aulas_mantidas", len(aulas_bo) - len(delta))
+        self.telemetria.contar("revisao.aulas_novas", len(delta))
+
+        casadas = {item['aula']: item['matches'] for item in self.casar_aulas(delta)} if delta else {}
+        dados = []
+        for aula in aulas_bo:
+            if aula in casadas:
+                dados.append({'aula': aula, 'matches': casadas[aula], 'nova': True})
+            else:
+                filtros = revisadas[normalizar_aula(aula)]['filtros']
+                dados.append({'aula': aula, 'matches': [{'termo': f, 'score': 1.0, 'origem': 'Memória'} for f in filtros]})
+        return dados
+
+    # --- Etapas isoladas (usadas pelo scheduler, cada uma no seu pool de workers) ---
+    def buscar_aulas_bo(self, curso_id: str, automation: WebAutomation = None) -> List[str]:
+        """Etapa BO: login (se a sessão ainda não existir nesse navegador) + extração das aulas."""
+        if automation is None and self.navegador is not None:
+            try:
+                return self.navegador.executar("bo", self.telemetria.propagar(
+                    lambda automation: self.buscar_aulas_bo(curso_id, automation)))
+            except Exception as e: # Navegador compartilhado não abriu
+                self.log(f"Erro ao buscar aulas: {e}")
+                return []
+        dono = False
         try:
-            automation.start()
-            bo = BoAutomation(automation.page, self.log)
-            bo.login(self.user_data['bo_user'], self.user_data['bo_pass'])
+            automation, dono = self._abrir_navegador(automation)
+            bo = BoAutomation(automation.page, self.log, telemetria=self.telemetria)
+            usuario = self.user_data['bo_user']
+            self._garantir_login(automation, "bo", usuario, lambda: bo.login(usuario, self.user_data['bo_pass']))
             
-            aulas_bo = bo.get_aulas(current_id)
-            if not aulas_bo:
+            registros = bo.get_aulas_detalhadas(curso_id)
+            if not registros:
                 self.log("❌ Nenhuma aula encontrada no BO.")
                 return []
+            for r in registros:
+                r["texto"] = bo.formatar_aula(r)
+
+            # Snapshot da página: o que mudou desde a última raspagem deste curso
+            if curso_id_valido(curso_id):
+                diff = self.snapshots.comparar(curso_id, registros)
+                self.log(f"🧾 BO x último snapshot: {len(diff['novas'])} nova(s), {len(diff['alteradas'])} alterada(s), "
+                         f"{len(diff['removidas'])} removida(s), {len(diff['inalteradas'])} igual(is).")
+                try:
+                    html = automation.page.content()
+                except Exception:
+                    html = None
+                self.snapshots.salvar(curso_id, registros, html)
+            else:
+                self.log(f"⚠️ ID de curso {curso_id!r} fora do padrão: snapshot do BO não gravado.")
+            return [r["texto"] for r in registros]
             
         except Exception as e:
             self.log(f"Erro ao buscar aulas: {e}")
             return []
         finally:
-            automation.stop()
+            if automation is not None:
+                automation.descarregar_rede(self.telemetria)
+            if dono:
+                automation.stop()
+
+    def casar_aulas(self, aulas_bo: List[str]) -> List[Dict]:
+        """
+        Etapa de matching (CPU): devolve os dados no formato da ReviewWindow.
+        Aulas iguais às do snapshot reaproveitam os matches já calculados; só o resto vai à IA.
+        """
+        curso_id = self._extract_course_id(self.user_data.get('course_url', ''))
+        assinatura = assinatura_matching(self.text_matcher, self.user_data.get("materia_selecionada"), self.preprocessador)
+        usar_snapshot = curso_id_valido(curso_id) # O ID vem da URL e vira nome de arquivo
+        salvos = self.snapshots.matches_salvos(curso_id, assinatura) if usar_snapshot else {}
+        pendentes = [a for a in aulas_bo if hash_aula(a) not in salvos]
+        if len(pendentes) < len(aulas_bo):
+            self.log(f"♻️ {len(aulas_bo) - len(pendentes)} aula(s) sem mudança reaproveitam os matches anteriores.")
+            self.telemetria.contar("matching.aulas_reaproveitadas", len(aulas_bo) - len(pendentes))
 
-        # 4. RODA A IA
-        self.log("🤖 Processando aulas com IA...")
-        tarefas_detalhadas = self._match_aulas_inteligente(aulas_bo, return_details=True)
+        novos = {}
+        if pendentes:
+            self.log(f"🤖 Processando {len(pendentes)} aula(s) com IA...")
+            with self.telemetria.span("matching", aulas=len(pendentes)):
+                tarefas_detalhadas = self._match_aulas_inteligente(pendentes, return_details=True)
+            novos = {t['aula_original']: t['matches_detalhados'] for t in tarefas_detalhadas}
+            if usar_snapshot:
+                self.snapshots.guardar_matches(curso_id, assinatura, novos)
         
-        for tarefa in tarefas_detalhadas:
-            dados_para_review.append({
-                'aula': tarefa['aula_original'],
-                'matches': tarefa['matches_detalhados']
-            })
-            
-        return dados_para_review
+        return [
+            {'aula': aula, 'matches': novos[aula] if aula in novos else salvos[hash_aula(aula)]}
+            for aula in aulas_bo
+        ]
+
+    def aceitar_automaticamente(self, dados: List[Dict], score_minimo: float) -> int:
+        """Equivale a salvar a ReviewWindow mantendo só os matches com score >= score_minimo."""
+        aceitas = 0
+        for item in dados:
+            termos = []
+            for m in item['matches']:
+                if m['score'] >= score_minimo and m['termo'] not in termos:
+                    termos.append(m['termo'])
+            self.cache_manager.set(item['aula'], termos)
+            aceitas += bool(termos)
+        self.cache_manager.save_cache()
+        self.log(f"✅ Aceite automático (score ≥ {score_minimo}): {aceitas}/{len(dados)} aulas com assuntos.")
+        return aceitas
 
-    def run_tec_automation(self):
+    def run_tec_automation(self, automation: WebAutomation = None):
         """
         BOTÃO 2: Apenas execução no TEC (Baseado no Cache/Revisão)
         Retorna uma tupla: (caminho_relatorio, lista_dados_finais)
         """
+        try:
+            with self.telemetria.span("orquestrador.tec"):
+                return self._run_tec_automation(automation)
+        finally:
+            self._finalizar_telemetria()
+
+    def _run_tec_automation(self, automation: WebAutomation = None):
+        if automation is None and self.navegador is not None:
+            try:
+                return self.navegador.executar("tec", self.telemetria.propagar(self._run_tec_automation))
+            except Exception as e: # Navegador compartilhado não abriu
+                self.log(f"❌ Erro fatal na automação TEC: {e}")
+                return None, []
+
         self.log("🚀 Iniciando fase de automação no TEC Concursos...")
         
+        # Contexto do curso (um Orchestrator novo ainda não passou por fetch_and_preview_matches)
+        curso_id = self._extract_course_id(self.user_data.get('course_url', ''))
+        if curso_id:
+            self.cache_manager.set_course_id(curso_id)
+
         # 1. Carrega tarefas da memória (do curso ATUAL selecionado)
         tarefas = self.cache_manager.get_all_tasks_formatted()
         
@@ -115,18 +306,42 @@ class Orchestrator:
 
         self.log(f"📂 {len(tarefas)} cadernos prontos para criação.")
 
-        automation = WebAutomation(log_callback=self.log, headless=self.headless)
+        # Estimativa offline: só previsão (as contagens do catálogo envelhecem conforme o TEC
+        # ganha questões). Pular os cadernos com teto 0 é opcional ('pular_vazios_offline').
+        estimativas = self.estimador.estimar_tarefas(tarefas, self._prepare_filters()["materias"])
+        pular_vazios = self.user_data.get('pular_vazios_offline', False)
+        for t in tarefas:
+            est = estimativas[t['nome_caderno']]
+            t['estimativa_questoes'] = est['questoes_max']
+            if not (t['mapeado'] and est['vazio']):
+                continue
+            self.telemetria.contar("tec.cadernos_vazios_offline")
+            if pular_vazios:
+                self.log(f"⏭️ {t['nome_caderno'][:50]}: catálogo indica 0 questões. Pulando.")
+                t.update({"mapeado": False, "success": False, "erro": "0 questões (estimativa offline)", "num_questoes": 0})
+                self.telemetria.contar("tec.cadernos_pulados_offline")
+            else:
+                self.log(f"📐 {t['nome_caderno'][:50]}: catálogo indica 0 questões; o TEC confirma na criação.")
+        teto_total = sum(e['questoes_max'] for e in estimativas.values())
+        self.log(f"📐 Estimativa offline: até {teto_total} questões no total (antes de Banca/Ano/Escolaridade).")
+
+        dono = False
         try:
-            automation.start()
+            automation, dono = self._abrir_navegador(automation)
             page = automation.page
             
             # 2. Login e Criação no TEC
             filtros_tec = self._prepare_filters()
             
             # Passa os filtros globais (incluindo lista de matérias) para o executor
-            tec = TecAutomationPerfeito(page, self.log, filtros_tec)
+            tec = TecAutomationPerfeito(page, self.log, filtros_tec, telemetria=self.telemetria,
+                                        reaproveitar_filtros=self.user_data.get('reaproveitar_filtros', True))
             
-            if tec.login(self.user_data['tec_user'], self.user_data['tec_pass']):
+            usuario = self.user_data['tec_user']
+            logado = self._garantir_login(automation, "tec", usuario,
+                                          lambda: tec.login(usuario, self.user_data['tec_pass']))
+
+            if logado:
                 # Filtra apenas o que tem mapeamento
                 cadernos_validos = [t for t in tarefas if t['mapeado']]
                 
@@ -134,7 +349,8 @@ class Orchestrator:
                     self.log("⚠️ Nenhuma aula possui matérias vinculadas. Nada a criar.")
                     return None, []
 
-                resultados = tec.criar_multiplos_cadernos(cadernos_validos)
+                with self.telemetria.span("tec.cadernos", total=len(cadernos_validos)):
+                    resultados = self._criar_cadernos(automation, tec, cadernos_validos)
                 
                 # Consolidação para Relatório
                 final_res = []
@@ -144,7 +360,7 @@ class Orchestrator:
                     if t['mapeado'] and t['nome_caderno'] in mapa_res:
                         t.update(mapa_res[t['nome_caderno']])
                     else:
-                        if not t.get('success'):
+                        if not t.get('success') and not t.get('erro'):
                             t.update({"success": False, "erro": "Não mapeado/Ignorado", "num_questoes": 0})
                     
                     # Formata display dos filtros usados
@@ -154,7 +370,7 @@ class Orchestrator:
                         t['filtros_ia'] = "N/A"
                     final_res.append(t)
 
-                gen = ReportGenerator(self.log)
+                gen = ReportGenerator(self.log, telemetria=self.telemetria)
                 report_path = gen.generate_report(self.user_data, final_res)
                 
                 return report_path, final_res
@@ -165,14 +381,81 @@ class Orchestrator:
             self.log(f"❌ Erro fatal na automação TEC: {e}")
             self.log(traceback.format_exc())
         finally:
-            automation.stop()
+            if automation is not None:
+                automation.descarregar_rede(self.telemetria)
+            if dono:
+                automation.stop()
         return None, []
 
+    def _criar_cadernos(self, automation: WebAutomation, tec: TecAutomationPerfeito, cadernos: List[Dict]) -> List[Dict]:
+        """
+        Sequencial na aba principal ou, com 'abas_paralelas' > 1 e sessão salva, em várias abas.
+        Com 'tec_http', a aba principal tenta antes o atalho HTTP (e volta ao navegador se ele falhar).
+        """
+        gravador = GravadorRespostas() if gravacao_ativa() else None
+        if gravador is None:
+            return self._despachar_cadernos(automation, tec, cadernos, None)
+        gravador.acompanhar(automation.page)
+        self.log(f"🎙️ Gravando as respostas do TEC em {gravador.caminho}")
+        try:
+            return self._despachar_cadernos(automation, tec, cadernos, gravador)
+        finally:
+            gravador.soltar()
+
+    def _despachar_cadernos(self, automation: WebAutomation, tec: TecAutomationPerfeito, cadernos: List[Dict],
+                                  gravador: Optional[GravadorRespostas]) -> List[Dict]:
+        if self.user_data.get('tec_http') and not endpoints_verificados():
+            self.log("⚠️ Endpoints HTTP do TEC ainda não conferidos (data/tec_endpoints.json); usando o navegador.")
+        elif self.user_data.get('tec_http'):
+            try:
+                tec.http = TecHttpClient.do_navegador(automation, self.log, telemetria=self.telemetria, gravador=gravador)
+            except Exception as e:
+                self.log(f"⚠️ Atalho HTTP indisponível ({e}); usando o navegador.")
+        if tec.http is not None:
+            self.log("⚡ Criando cadernos pelos endpoints do TEC (navegador como reserva).")
+            try:
+                return tec.criar_multiplos_cadernos(cadernos)
+            finally:
+                if tec.http is not None:
+                    tec.http.fechar()
+                    tec.http = None
+
+        abas = int(self.user_data.get('abas_paralelas') or 1)
+        usuario = self.user_data['tec_user']
+        if abas <= 1 or len(cadernos) <= 1:
+            return tec.criar_multiplos_cadernos(cadernos)
+        if not os.path.exists(automation.caminho_sessao("tec", usuario)):
+            self.log("⚠️ Sem sessão salva do TEC para as abas paralelas; criando em sequência.")
+            return tec.criar_multiplos_cadernos(cadernos)
+
+        # As abas partem dos filtros comuns já capturados (ou capturados pela primeira delas)
+        criador = CriadorParaleloCadernos(self.log, tec.filtros_padrao, usuario, abas=abas,
+                                          headless=self.headless, telemetria=self.telemetria,
+                                          reaproveitar_filtros=tec.reaproveitar_filtros,
+                                          filtros_comuns=tec.filtros_comuns)
+        resultados = criador.criar(cadernos)
+
+        # Falhas antes de chegar ao TEC (navegador/sessão da aba) são refeitas na aba principal
+        refazer = [i for i, r in enumerate(resultados) if not r['success'] and r.get('url') is None]
+        if refazer:
+            self.log(f"🔁 Refazendo {len(refazer)} caderno(s) na aba principal...")
+            refeitos = tec.criar_multiplos_cadernos([cadernos[i] for i in refazer])
+            for i, r in zip(refazer, refeitos):
+                resultados[i] = r
+        return resultados
+
     def _match_aulas_inteligente(self, aulas_bo, return_details=False):
         materia_alvo = self.user_data.get("materia_selecionada")
         
-        def limpar(nome): return re.sub(r'(?i)aula\s+\d+\s*[:.-]\s*', '', nome).strip()
-        aulas_limpas = [limpar(a) for a in aulas_bo]
+        # Limpeza + detecção de aulas especiais numa única passada sobre o curso
+        processadas = self.preprocessador.processar(aulas_bo)
+        aulas_limpas = [p['limpo'] for p in processadas]
+        pular = [p['pular'] is not None for p in processadas] # Repassado ao matcher: as regras rodam uma vez só
+        puladas = [p for p in processadas if p['pular']]
+        if puladas:
+            self.log(f"⏭️ {len(puladas)} aula(s) especial(is) serão ignoradas pela IA:")
+            for p in puladas:
+                self.log(f"   - {p['limpo'][:60]} (regra: {p['pular']})")
 
         # Verifica se há seleção (Lista não vazia ou String não vazia)
         has_selection = False
@@ -185,12 +468,12 @@ class Orchestrator:
             # Passa a lista (ou string) para o matcher, que agora suporta multisseleção
             self.log(f"🔍 Buscando assuntos nas matérias selecionadas: {materia_alvo}")
             matches = self.text_matcher.find_best_matches_filtered_batch(
-                query_texts=aulas_limpas, target_materia=materia_alvo
+                query_texts=aulas_limpas, target_materia=materia_alvo, pular=pular
             )
         else:
             self.log("🔍 Busca Hierárquica Global (nenhuma matéria específica selecionada)...")
             matches = self.text_matcher.find_best_matches_hierarquico_batch(
-                query_texts=aulas_limpas
+                query_texts=aulas_limpas, pular=pular
             )
 
         if return_details:
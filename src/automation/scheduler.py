@@ -0,0 +1,260 @@
+# src/automation/scheduler.py
+"""
+Scheduler de vários cursos com paralelismo limitado por etapa.
+
+Cada curso vira um job que passa pelas etapas:
+    bo (navegador) -> matching (CPU) -> [aceite automático] -> tec (navegador)
+Cursos já revisados (com dados no cache) vão direto para 'tec'.
+
+- Navegador: um pool de no máximo 'max_paginas' threads; cada thread tem o SEU
+  WebAutomation (o Playwright síncrono só pode ser usado na thread que o criou),
+  reaproveitado entre jobs. Logo, nunca há mais que 'max_paginas' páginas abertas.
+  Dentro desse pool, 'workers_bo' e 'workers_tec' limitam quantos jobs de cada etapa
+  rodam ao mesmo tempo; jobs em 'tec' têm prioridade (terminam cursos antes de abrir novos).
+- Matching: pool próprio ('workers_matching') com o TextMatcher compartilhado, para que a
+  CPU trabalhe enquanto os navegadores esperam a rede. O matcher não guarda estado por
+  chamada na instância (a gravação de scores, se ligada, é por thread).
+
+Cada job guarda estado, erro e a duração de cada etapa (e o tempo na fila).
+"""
+
+import os
+import json
+import time
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from data.data_loader import DataLoader
+from src.matching import TextMatcher
+from src.telemetry import Telemetria
+from src.cache_manager import CacheManager
+from .browser_manager import NavegadoresPorThread
+from .orchestrator import Orchestrator
+from .batch import RESUMO_DIR
+
+ETAPAS_NAVEGADOR = ("tec", "bo") # Ordem = prioridade de despacho
+ESTADOS_FINAIS = ("concluido", "pendente_revisao", "sem_aulas", "falha_tec", "erro")
+
+
+class SchedulerCursos:
+    def __init__(self, log_callback: Callable[..., None], headless: bool = False,
+                 max_paginas: int = 2, workers_bo: int = 2, workers_matching: int = 1, workers_tec: int = 2,
+                 aceitar_acima: Optional[float] = None, criar_cadernos: bool = True):
+        """
+        max_paginas: teto de páginas de navegador abertas ao mesmo tempo (= threads de navegador).
+        workers_*: jobs simultâneos por etapa (bo/tec também ficam limitados por max_paginas).
+        aceitar_acima / criar_cadernos: mesmo significado do ProcessadorLote.
+        """
+        self.log = log_callback
+        self.headless = headless
+        self.max_paginas = max(1, max_paginas)
+        self.limites = {
+            "bo": max(1, min(workers_bo, self.max_paginas)),
+            "matching": max(1, workers_matching),
+            "tec": max(1, min(workers_tec, self.max_paginas)),
+        }
+        self.aceitar_acima = aceitar_acima
+        self.criar_cadernos = criar_cadernos
+        self.telemetria = Telemetria(log_callback=self.log)
+
+        with self.telemetria.span("scheduler.inicializar"):
+            self.data_loader = DataLoader(log_callback=self.log)
+            self.text_matcher = TextMatcher(
+                log_callback=self.log,
+                lista_materias=self.data_loader.materias,
+                dict_assuntos_por_materia=self.data_loader.assuntos_por_materia,
+                lista_completa_fallback=self.data_loader.lista_completa_fallback,
+                questoes_por_materia=self.data_loader.questoes_por_materia,
+                telemetria=self.telemetria
+            )
+
+        self._lock = threading.Lock()
+        self._filas = {etapa: deque() for etapa in self.limites}
+        self._ativos = {etapa: 0 for etapa in self.limites}
+        self._pendentes = 0
+        self._terminou = threading.Event()
+        self._navegadores = NavegadoresPorThread(self.log, headless=self.headless, telemetria=self.telemetria)
+        self._pool_navegador: Optional[ThreadPoolExecutor] = None
+        self._pool_matching: Optional[ThreadPoolExecutor] = None
+        self.jobs: List[Dict[str, Any]] = []
+
+    # --- API ---
+    def processar(self, configs: List[Dict[str, Any]], caminho_resumo: Optional[str] = None) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        self.jobs = [self._novo_job(config) for config in configs]
+        # Cursos com revisão salva não precisam de BO nem de IA
+        cache = CacheManager(log_callback=self.log)
+        for job in self.jobs:
+            cache.set_course_id(job["curso_id"])
+            if cache.has_data():
+                job["ja_revisado"] = True
+                job["aulas"] = len(cache.cache_structure["courses"][job["curso_id"]])
+        self._pendentes = len(self.jobs)
+        if not self.jobs:
+            self._terminou.set()
+
+        self._pool_navegador = ThreadPoolExecutor(max_workers=self.max_paginas, thread_name_prefix="navegador")
+        self._pool_matching = ThreadPoolExecutor(max_workers=self.limites["matching"], thread_name_prefix="matching")
+        self.log(f"🗂️ Scheduler: {len(self.jobs)} curso(s), até {self.max_paginas} página(s) | "
+                 f"bo={self.limites['bo']} matching={self.limites['matching']} tec={self.limites['tec']}")
+        try:
+            with self._lock:
+                for job in self.jobs:
+                    self._enfileirar(job, "inicio")
+                self._despachar()
+            self._terminou.wait()
+        finally:
+            self._navegadores.fechar_todos(self._pool_navegador, self.max_paginas)
+            self._pool_navegador.shutdown(wait=True)
+            self._pool_matching.shutdown(wait=True)
+
+        resumo = {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "run_telemetria": self.telemetria.run_id,
+            "duracao_s": round(time.perf_counter() - inicio, 1),
+            "aceitar_acima": self.aceitar_acima,
+            "limites": {"max_paginas": self.max_paginas, **self.limites},
+            "cursos": [self._resultado(job) for job in self.jobs],
+            "totais": {
+                estado: sum(1 for job in self.jobs if job["estado"] == estado)
+                for estado in ESTADOS_FINAIS
+            },
+        }
+        self.telemetria.finalizar()
+
+        caminho_resumo = caminho_resumo or os.path.join(
+            RESUMO_DIR, f"scheduler_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(caminho_resumo) or ".", exist_ok=True)
+        with open(caminho_resumo, "w", encoding="utf-8") as f:
+            json.dump(resumo, f, ensure_ascii=False, indent=2)
+        resumo["arquivo"] = caminho_resumo
+        self.log(f"\n🧾 Resumo do scheduler salvo em {caminho_resumo}")
+        return resumo
+
+    def estado(self) -> List[Dict[str, Any]]:
+        """Foto do andamento (pode ser chamada de outra thread, ex.: GUI)."""
+        with self._lock:
+            return [{"curso_id": j["curso_id"], "estado": j["estado"], "duracoes_s": dict(j["duracoes_s"])}
+                    for j in self.jobs]
+
+    # --- Jobs ---
+    def _novo_job(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "curso_id": config["curso_id"], "config": config, "orc": None,
+            "estado": "pendente", "dados": None, "ja_revisado": False,
+            "duracoes_s": {}, "espera_s": {}, "enfileirado_em": None, "inicio": time.perf_counter(),
+            "aulas": 0, "aceitas_auto": 0, "relatorio": None, "resultados": [], "erro": None,
+        }
+
+    def _resultado(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        final_res = job["resultados"]
+        ok = [t for t in final_res if t.get("success")]
+        return {
+            "curso_id": job["curso_id"], "status": job["estado"], "aulas": job["aulas"],
+            "aceitas_auto": job["aceitas_auto"], "cadernos_ok": len(ok), "cadernos_falha": len(final_res) - len(ok),
+            "questoes": sum(t.get("num_questoes") or 0 for t in ok), "relatorio": job["relatorio"],
+            "erro": job["erro"], "duracoes_s": job["duracoes_s"], "espera_s": job["espera_s"],
+            "duracao_s": job.get("duracao_s"),
+        }
+
+    def _enfileirar(self, job: Dict[str, Any], etapa: str):
+        # Chamado com self._lock
+        if etapa == "inicio":
+            if not job["ja_revisado"]:
+                etapa = "bo"
+            elif self.criar_cadernos:
+                etapa = "tec"
+            else:
+                self._finalizar_job(job, "concluido")
+                return
+        job["estado"] = f"fila_{etapa}"
+        job["enfileirado_em"] = time.perf_counter()
+        self._filas[etapa].append(job)
+
+    def _despachar(self):
+        # Chamado com self._lock: ocupa as vagas livres de cada etapa
+        for etapa in ETAPAS_NAVEGADOR + ("matching",):
+            pool = self._pool_matching if etapa == "matching" else self._pool_navegador
+            while self._filas[etapa] and self._ativos[etapa] < self.limites[etapa]:
+                if etapa != "matching" and sum(self._ativos[e] for e in ETAPAS_NAVEGADOR) >= self.max_paginas:
+                    break
+                job = self._filas[etapa].popleft()
+                self._ativos[etapa] += 1
+                job["espera_s"][etapa] = round(time.perf_counter() - job["enfileirado_em"], 2)
+                job["estado"] = etapa
+                pool.submit(self._executar_etapa, job, etapa)
+
+    def _executar_etapa(self, job: Dict[str, Any], etapa: str):
+        inicio = time.perf_counter()
+        proxima = None
+        try:
+            with self.telemetria.span(f"scheduler.{etapa}", curso=job["curso_id"]):
+                proxima = getattr(self, f"_etapa_{etapa}")(job)
+        except Exception as e:
+            job["erro"] = str(e)
+            proxima = "erro"
+            self.log(f"❌ [{job['curso_id']}] Erro na etapa {etapa}: {e}")
+            self.log(traceback.format_exc())
+        finally:
+            job["duracoes_s"][etapa] = round(time.perf_counter() - inicio, 2)
+            with self._lock:
+                self._ativos[etapa] -= 1
+                if proxima in self.limites:
+                    self._enfileirar(job, proxima)
+                else:
+                    self._finalizar_job(job, proxima or "erro")
+                self._despachar()
+
+    def _finalizar_job(self, job: Dict[str, Any], estado: str):
+        # Chamado com self._lock
+        job["estado"] = estado
+        job["duracao_s"] = round(time.perf_counter() - job["inicio"], 1)
+        job["orc"] = job["dados"] = None # Libera memória do job
+        self.telemetria.contar(f"scheduler.{estado}")
+        self.log(f"🏁 [{job['curso_id']}] {estado} em {job['duracao_s']}s")
+        self._pendentes -= 1
+        if self._pendentes == 0:
+            self._terminou.set()
+
+    def _orquestrador(self, job: Dict[str, Any]) -> Orchestrator:
+        if job["orc"] is None:
+            job["orc"] = Orchestrator(job["config"], self._log_job(job), headless=self.headless,
+                                      telemetria=self.telemetria, data_loader=self.data_loader,
+                                      text_matcher=self.text_matcher)
+        return job["orc"]
+
+    def _log_job(self, job: Dict[str, Any]) -> Callable[..., None]:
+        prefixo = f"[{job['curso_id']}] "
+        return lambda msg, *args, **kwargs: self.log(prefixo + str(msg), *args, **kwargs)
+
+    # --- Etapas (cada uma devolve a próxima etapa ou um estado final) ---
+    def _etapa_bo(self, job: Dict[str, Any]) -> str:
+        orc = self._orquestrador(job)
+        aulas_bo = orc.buscar_aulas_bo(job["curso_id"], automation=self._navegadores.obter())
+        if not aulas_bo:
+            return "sem_aulas"
+        job["dados"] = aulas_bo
+        job["aulas"] = len(aulas_bo)
+        return "matching"
+
+    def _etapa_matching(self, job: Dict[str, Any]) -> str:
+        orc = self._orquestrador(job)
+        dados = orc.casar_aulas(job["dados"])
+        job["dados"] = None
+        if self.aceitar_acima is None:
+            orc.log("📝 Curso sem revisão salva: revise na GUI ou use --aceitar-acima.")
+            return "pendente_revisao"
+        job["aceitas_auto"] = orc.aceitar_automaticamente(dados, self.aceitar_acima)
+        return "tec" if self.criar_cadernos else "concluido"
+
+    def _etapa_tec(self, job: Dict[str, Any]) -> str:
+        orc = self._orquestrador(job)
+        report_path, final_res = orc.run_tec_automation(automation=self._navegadores.obter())
+        job["relatorio"] = report_path
+        job["resultados"] = final_res
+        return "concluido" if report_path else "falha_tec"
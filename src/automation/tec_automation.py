@@ -1,17 +1,168 @@
 # src/automation/tec_automation.py
 
 import re
+import time
+import threading
+import itertools
 import traceback
 from typing import List, Dict, Any, Callable
 from playwright.sync_api import Page, expect
+from src.telemetry import Telemetria
+from .web_automation import registrar_navegacao
+from .tec_http import RespostaInesperada, TecHttpClient
+
+# Esperas por sinal (não por tempo fixo). Os tetos abaixo só valem quando o sinal não vem;
+# nesse caso a automação segue como antes, e a telemetria conta o timeout.
+TIMEOUT_ESPERA_MS = 5000
+POLLING_ESPERA_MS = 50
+ESTAVEL_MS = 300            # Tempo sem mudanças no DOM para considerar a árvore/contador "renderizados"
+INTERVALO_MIN_CADERNOS_S = 0.5 # Respiro mínimo entre o início de dois cadernos (antes: 2s fixos após cada um)
+TIMEOUT_CAPTURA_S = 60      # Quanto uma aba espera outra terminar de capturar os filtros comuns
+SELETOR_ARVORE = "div.arvore-wrapper span.arvore-item-nome"
+SELETOR_CONTADOR = ".gerador-filtrador-resultado strong"
+
+# A página do gerador é AngularJS: sem requisições $http pendentes = XHRs (árvore, contador) concluídos.
+# Com 'seletor', também espera o texto desses elementos ficar estável por ESTAVEL_MS (re-render
+# terminado); com 'termo', retorna assim que algum deles contiver o termo. O estado da estabilidade
+# fica sob o token de cada espera: uma espera nova nunca herda o "estável desde" de uma anterior.
+JS_PAGINA_PRONTA = """([seletor, termo, estavelMs, token]) => {
+    const ng = window.angular;
+    if (ng) {
+        const raiz = document.querySelector('[ng-app], [data-ng-app], .ng-scope');
+        const injetor = raiz && ng.element(raiz).injector();
+        if (injetor && injetor.get('$http').pendingRequests.length > 0) return false;
+    }
+    if (!seletor) return true;
+    const textos = Array.from(document.querySelectorAll(seletor)).map(e => (e.innerText || '').trim().toLowerCase());
+    if (termo && textos.some(t => t.includes(termo))) return true;
+    const assinatura = textos.join('|');
+    const estado = window.__automacaoEstavel || (window.__automacaoEstavel = {});
+    const agora = performance.now();
+    if (!estado[token] || estado[token].assinatura !== assinatura) {
+        estado[token] = {assinatura, desde: agora};
+        return false;
+    }
+    if (agora - estado[token].desde < estavelMs) return false;
+    delete estado[token];
+    return true;
+}"""
+_TOKENS_ESPERA = itertools.count(1) # next() é atômico no CPython: seguro entre abas/threads
+
+class LimitadorTaxa:
+    """Intervalo mínimo entre inícios de caderno, compartilhado por todas as threads e abas do processo."""
+
+    def __init__(self, intervalo_s: float):
+        self.intervalo_s = intervalo_s
+        self._lock = threading.Lock()
+        self._proxima_vaga = 0.0
+
+    def reservar(self) -> float:
+        """Reserva a próxima vaga livre e devolve quantos segundos faltam para ela."""
+        with self._lock:
+            agora = time.monotonic()
+            vaga = max(agora, self._proxima_vaga)
+            self._proxima_vaga = vaga + self.intervalo_s
+            return vaga - agora
+
+
+# Global: cadernos sequenciais, abas paralelas e jobs do scheduler dividem o mesmo ritmo
+LIMITADOR_TEC = LimitadorTaxa(INTERVALO_MIN_CADERNOS_S)
+URL_GERADOR = "https://www.tecconcursos.com.br/questoes/cadernos/novo"
+
+
+class FiltrosComuns:
+    """
+    Estado do gerador com os filtros comuns ao curso (Área, Banca, Ano, Escolaridade) já aplicados,
+    capturado pela URL da página após o primeiro caderno. Uma instância por curso, compartilhável
+    entre abas (a URL vale em qualquer navegador com a mesma sessão).
+
+    Entre abas, só uma captura por vez (reservar_captura); as outras esperam por ela em
+    aguardar_captura em vez de aplicar os filtros clique a clique ao mesmo tempo.
+    """
+
+    def __init__(self):
+        self.url = None
+        self.contador = None       # Texto do contador só com os filtros comuns: confere a restauração
+        self.indisponivel = False  # TEC não expôs o estado na URL (ou a restauração divergiu)
+        self._capturando = False
+        self._condicao = threading.Condition()
+
+    def capturado(self) -> bool:
+        with self._condicao:
+            return self.url is not None and not self.indisponivel
+
+    def estado(self):
+        """(url, texto do contador) capturados, ou None."""
+        with self._condicao:
+            if self.url is None or self.indisponivel:
+                return None
+            return self.url, self.contador
+
+    def reservar_captura(self) -> bool:
+        """True = esta aba captura (e depois chama publicar, marcar_indisponivel ou liberar_captura)."""
+        with self._condicao:
+            if self.url is not None or self.indisponivel or self._capturando:
+                return False
+            self._capturando = True
+            return True
+
+    def aguardar_captura(self, timeout: float = TIMEOUT_CAPTURA_S):
+        """Se outra aba está capturando, espera ela terminar (ou o timeout)."""
+        with self._condicao:
+            self._condicao.wait_for(lambda: not self._capturando, timeout)
+
+    def publicar(self, url: str, contador: str):
+        with self._condicao:
+            self.url, self.contador = url, contador
+            self._liberar()
+
+    def marcar_indisponivel(self):
+        with self._condicao:
+            self.indisponivel = True
+            self._liberar()
+
+    def liberar_captura(self):
+        """Fim da captura sem resultado (ex.: erro no caderno): outra aba pode tentar."""
+        with self._condicao:
+            self._liberar()
+
+    def _liberar(self):
+        self._capturando = False
+        self._condicao.notify_all()
 
 class TecAutomationPerfeito:
-    def __init__(self, page: Page, log_callback: Callable[..., None], filtros_padrao: Dict = None):
+    def __init__(self, page: Page, log_callback: Callable[..., None], filtros_padrao: Dict = None, telemetria: Telemetria = None,
+                 reaproveitar_filtros: bool = True, filtros_comuns: FiltrosComuns = None):
+        """
+        reaproveitar_filtros: aplica Área/Banca/Ano/Escolaridade uma vez e abre os cadernos seguintes
+                              já a partir desse estado (ver FiltrosComuns); cada caderno só soma os assuntos.
+        """
         self.page = page
         self.log = log_callback
         self.filtros_padrao = filtros_padrao or {}
+        self.telemetria = telemetria or Telemetria.nula()
+        self.reaproveitar_filtros = reaproveitar_filtros and self._tem_filtros_comuns()
+        self.filtros_comuns = filtros_comuns or FiltrosComuns()
+        self.http: TecHttpClient = None # Atalho HTTP opcional (ver tec_http.py); None = só navegador
+
+    def _aguardar(self, motivo: str, seletor: str = None, termo: str = None, timeout: int = TIMEOUT_ESPERA_MS) -> bool:
+        """Espera a página do gerador ficar pronta (XHRs do Angular + DOM estável). Cada motivo vira um span."""
+        with self.telemetria.span(f"tec.espera.{motivo}") as span:
+            try:
+                self.page.wait_for_function(JS_PAGINA_PRONTA, arg=[seletor, (termo or "").lower() or None, ESTAVEL_MS,
+                                                                   f"espera-{next(_TOKENS_ESPERA)}"],
+                                            polling=POLLING_ESPERA_MS, timeout=timeout)
+                return True
+            except Exception:
+                span.set(timeout=True)
+                self.telemetria.contar("tec.espera_timeout", motivo=motivo)
+                return False
 
     def login(self, username, password):
+        with self.telemetria.span("tec.login", manual=True):
+            return self._login(username, password)
+
+    def _login(self, username, password):
         try:
             self.log("Login no TEC...")
             self.page.goto("https://www.tecconcursos.com.br/login")
@@ -30,13 +181,13 @@ class TecAutomationPerfeito:
             self.log(f"  > Filtro: '{nome}'")
             # Tenta clicar no filtro lateral pelo nome (ex: "Área", "Banca", "Ano")
             self.page.get_by_role("listitem", name=re.compile(nome, re.IGNORECASE)).click(timeout=5000)
-            self.page.wait_for_timeout(1000)
+            self._aguardar("filtro_lateral", SELETOR_ARVORE)
             return True
         except:
             try:
                 self.log(f"    (Tentando clique alternativo no filtro '{nome}')")
                 self.page.locator(f"li:has-text('{nome}')").first.click(timeout=3000)
-                self.page.wait_for_timeout(1000)
+                self._aguardar("filtro_lateral", SELETOR_ARVORE)
                 return True
             except:
                 return False
@@ -92,7 +243,10 @@ class TecAutomationPerfeito:
             if pasta_locator.is_visible():
                 # Clica na PASTA para expandir
                 pasta_locator.click()
-                self.page.wait_for_timeout(1000) # Espera animação da árvore
+                # Espera o filho aparecer (expansão da árvore), não um tempo fixo
+                with self.telemetria.span("tec.espera.expandir_pasta"):
+                    try: item_locator.wait_for(state="visible", timeout=3000)
+                    except: pass
                 
                 # Agora tenta achar o item filho novamente com o filtro flexível
                 if item_locator.is_visible():
@@ -147,7 +301,7 @@ class TecAutomationPerfeito:
             # Limpa e preenche
             input_busca.fill("")
             input_busca.fill(item)
-            self.page.wait_for_timeout(1500) # Espera a árvore ser filtrada
+            self._aguardar("busca", SELETOR_ARVORE, termo=item) # Árvore filtrada (ou estável sem o item)
             
             # --- LÓGICA DE SELEÇÃO ---
             base_arvore = "div.arvore-wrapper > div > ul"
@@ -157,6 +311,7 @@ class TecAutomationPerfeito:
             
             if not candidatos:
                 self.log(f"    ⚠️ Item '{item}' não encontrado na busca.")
+                self.telemetria.contar("tec.item_nao_encontrado")
                 try: self.page.get_by_role("link", name="Voltar").click(timeout=500)
                 except: pass
                 return False
@@ -186,6 +341,7 @@ class TecAutomationPerfeito:
             
         except Exception as e:
             self.log(f"    ✗ Erro ao selecionar '{item}': {e}")
+            self.telemetria.contar("tec.item_erro")
             try: self.page.get_by_role("link", name="Voltar").click(timeout=500)
             except: pass
             return False
@@ -227,49 +383,151 @@ class TecAutomationPerfeito:
             return self._selecionar_item(nivel_texto)
 
     def create_notebook(self, nome_caderno: str, materias: List[str]) -> Dict:
-        self.log(f"\nCriando: {nome_caderno[:50]}...")
+        with self.telemetria.span("tec.caderno", caderno=nome_caderno[:60], n_filtros=len(materias)) as span:
+            resultado = self._criar_via_http(nome_caderno, materias) if self.http is not None else None
+            span.set(http=resultado is not None)
+            if resultado is None:
+                resultado = self._criar_caderno(nome_caderno, materias)
+            span.set(ok=resultado["success"], num_questoes=resultado["num_questoes"])
+            return resultado
+
+    def _criar_via_http(self, nome_caderno: str, materias: List[str]):
+        """
+        Resultado pelo atalho HTTP, ou None para seguir pelo navegador (só quando a falha
+        veio antes do pedido de criação; depois dele o caderno pode existir e não é refeito).
+        """
+        self.log(f"\nCriando (HTTP): {nome_caderno[:50]}...")
         try:
-            self.page.goto("https://www.tecconcursos.com.br/questoes/cadernos/novo")
+            resultado = self.http.criar_caderno(nome_caderno, materias, self.filtros_padrao)
+        except RespostaInesperada as e:
+            # Endpoint mudou ou sessão expirou: não vai se resolver no próximo caderno
+            self.log(f"⚠️ Atalho HTTP indisponível ({e}); seguindo pelo navegador.")
+            self.telemetria.contar("tec.http.fallback")
+            self._desligar_http()
+            return None
+        if resultado.get("incerto"):
+            self._desligar_http() # Os próximos cadernos vão pelo navegador
+        return resultado
+
+    def _desligar_http(self):
+        self.http.fechar()
+        self.http = None
+
+    def _tem_filtros_comuns(self) -> bool:
+        return any(self.filtros_padrao.get(k) for k in ("areas", "bancas", "anos", "escolaridades"))
+
+    def _abrir_gerador(self, url: str = URL_GERADOR):
+        with self.telemetria.span("tec.abrir_gerador"):
+            self.page.goto(url)
             self.page.wait_for_selector('button:has-text("Gerar Caderno")', timeout=20000)
+        registrar_navegacao(self.page, self.telemetria, "tec.pagina_gerador")
+
+    def _ler_contador(self):
+        """(texto, número de questões) do contador do gerador; (None, 0) se ilegível."""
+        try:
+            contador = self.page.locator(SELETOR_CONTADOR).first
+            texto_contador = contador.inner_text().strip().lower()
+            if "uma" in texto_contador: num = 1
+            elif "nenhuma" in texto_contador: num = 0
+            else: num = int(texto_contador.replace(".",""))
+            return texto_contador, num
+        except:
+            return None, 0
+
+    def _preparar_filtros_comuns(self):
+        """Gerador aberto com os filtros comuns: restaurados do estado capturado ou aplicados clique a clique."""
+        comuns = self.filtros_comuns
+        if self.reaproveitar_filtros:
+            comuns.aguardar_captura() # Outra aba pode estar capturando agora
+            if self._restaurar_filtros_comuns():
+                return
+        capturar = self.reaproveitar_filtros and comuns.reservar_captura()
+        try:
+            self._abrir_gerador()
+            self._aplicar_filtros_comuns()
+            if capturar:
+                self._capturar_filtros_comuns()
+        finally:
+            if capturar:
+                comuns.liberar_captura() # Sem efeito se já publicou
+
+    def _capturar_filtros_comuns(self):
+        """Guarda a URL do gerador com os filtros comuns aplicados (antes dos assuntos do caderno)."""
+        comuns = self.filtros_comuns
+        self._aguardar("contador", SELETOR_CONTADOR, timeout=10000)
+        url = self.page.url
+        if url.rstrip("/") == URL_GERADOR: # Sem query nem fragmento: o estado ficou só no Angular
+            comuns.marcar_indisponivel()
+            self.log("ℹ️ O TEC não expôs os filtros na URL; os filtros comuns serão aplicados em cada caderno.")
+            return
+        contador, _ = self._ler_contador()
+        comuns.publicar(url, contador)
+        self.log("📌 Filtros comuns capturados: os próximos cadernos partem deles.")
 
-            # 1. Filtro: Área (USANDO LÓGICA DE EXPANSÃO)
-            if self.filtros_padrao.get("areas"):
+    def _restaurar_filtros_comuns(self) -> bool:
+        """Abre o gerador na URL capturada e confere o contador; se divergir, desliga o reaproveitamento."""
+        estado = self.filtros_comuns.estado()
+        if estado is None:
+            return False
+        url, contador_esperado = estado
+        with self.telemetria.span("tec.filtros_comuns.restaurar") as span:
+            self._abrir_gerador(url)
+            self._aguardar("contador", SELETOR_CONTADOR, timeout=10000)
+            texto, _ = self._ler_contador()
+            if texto is None or texto != contador_esperado:
+                span.set(ok=False)
+                self.filtros_comuns.marcar_indisponivel()
+                self.telemetria.contar("tec.filtros_comuns.divergentes")
+                self.log(f"⚠️ Estado restaurado não confere ({texto} ≠ {contador_esperado}); voltando aos filtros completos.")
+                return False
+        self.telemetria.contar("tec.filtros_comuns.reaproveitados")
+        return True
+
+    def _aplicar_filtros_comuns(self):
+        self.telemetria.contar("tec.filtros_comuns.aplicados")
+
+        # 1. Filtro: Área (USANDO LÓGICA DE EXPANSÃO)
+        if self.filtros_padrao.get("areas"):
+            with self.telemetria.span("tec.filtro", filtro="Área"):
                 if self._clicar_filtro_lateral("Área"): 
                     for area in self.filtros_padrao["areas"]:
                         # Usa o método específico
                         self._selecionar_area_especifica(area)
 
-            # 2. Filtro: Matéria e Assunto
-            if materias:
-                if self._clicar_filtro_lateral("Matéria e assunto"):
-                    for m in materias: self._selecionar_item(m)
-
-            # 3. Filtro: Banca
-            if self.filtros_padrao.get("bancas"):
+        # 2. Filtro: Banca
+        if self.filtros_padrao.get("bancas"):
+            with self.telemetria.span("tec.filtro", filtro="Banca"):
                 if self._clicar_filtro_lateral("Banca"):
                     for b in self.filtros_padrao["bancas"]: self._selecionar_item(b)
 
-            # 4. Filtro: Ano
-            if self.filtros_padrao.get("anos"):
+        # 3. Filtro: Ano
+        if self.filtros_padrao.get("anos"):
+            with self.telemetria.span("tec.filtro", filtro="Ano"):
                 if self._clicar_filtro_lateral("Ano"):
                     for a in self.filtros_padrao["anos"]: self._selecionar_item(str(a))
 
-            # 5. Filtro: Escolaridade
-            if self.filtros_padrao.get("escolaridades"):
+        # 4. Filtro: Escolaridade
+        if self.filtros_padrao.get("escolaridades"):
+            with self.telemetria.span("tec.filtro", filtro="Escolaridade"):
                 if self._clicar_filtro_lateral("Escolaridade"):
                     for esc in self.filtros_padrao["escolaridades"]:
                         self._selecionar_escolaridade_exata(esc)
 
-            self.page.wait_for_timeout(2000)
+    def _criar_caderno(self, nome_caderno: str, materias: List[str]) -> Dict:
+        self.log(f"\nCriando: {nome_caderno[:50]}...")
+        try:
+            # Filtros comuns ao curso: restaurados do estado capturado ou aplicados clique a clique
+            self._preparar_filtros_comuns()
 
-            try:
-                contador = self.page.locator(".gerador-filtrador-resultado strong").first
-                texto_contador = contador.inner_text().strip().lower()
-                if "uma" in texto_contador: num = 1
-                elif "nenhuma" in texto_contador: num = 0
-                else: num = int(texto_contador.replace(".",""))
-            except:
-                num = 0
+            # 5. Filtro: Matéria e Assunto (o que muda de um caderno para outro)
+            if materias:
+                with self.telemetria.span("tec.filtro", filtro="Matéria e assunto", itens=len(materias)):
+                    if self._clicar_filtro_lateral("Matéria e assunto"):
+                        for m in materias: self._selecionar_item(m)
+
+            # Contador: XHR de contagem concluído e número estável
+            self._aguardar("contador", SELETOR_CONTADOR, timeout=10000)
+            _, num = self._ler_contador()
 
             if num == 0:
                 self.log("❌ 0 questões encontradas. Pulando.")
@@ -285,10 +543,11 @@ class TecAutomationPerfeito:
             self.log(f"✅ {num} questões.")
             self.page.get_by_role("textbox", name="Nome do caderno").fill(nome_caderno)
             
-            btn_gerar = self.page.get_by_role("button", name="Gerar Caderno")
-            expect(btn_gerar).to_be_enabled(timeout=5000)
-            btn_gerar.click()
-            self.page.wait_for_url(re.compile(r".*/cadernos/(?!novo)"), timeout=30000)
+            with self.telemetria.span("tec.gerar"):
+                btn_gerar = self.page.get_by_role("button", name="Gerar Caderno")
+                expect(btn_gerar).to_be_enabled(timeout=5000)
+                btn_gerar.click()
+                self.page.wait_for_url(re.compile(r".*/cadernos/(?!novo)"), timeout=30000)
             
             return {
                 "success": True, 
@@ -314,6 +573,13 @@ class TecAutomationPerfeito:
         total = len(lista_aulas)
         for i, aula in enumerate(lista_aulas, 1):
             self.log(f"\n--- Caderno {i}/{total} ---")
+            self.respeitar_intervalo()
             res.append(self.create_notebook(aula["nome_caderno"], aula["materias"]))
-            if i < total: self.page.wait_for_timeout(2000)
-        return res
\ No newline at end of file
+        return res
+
+    def respeitar_intervalo(self):
+        # O goto do próximo caderno já espera a página; aqui só garante o ritmo global de criação no TEC
+        espera = LIMITADOR_TEC.reservar()
+        if espera > 0:
+            with self.telemetria.span("tec.espera.limitador"):
+                self.page.wait_for_timeout(espera * 1000) # Mantém o Playwright processando eventos (rotas)
\ No newline at end of file
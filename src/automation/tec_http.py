@@ -0,0 +1,271 @@
+# src/automation/tec_http.py
+"""
+Atalho HTTP para criar cadernos no TEC, falando direto com os endpoints JSON que
+a própria página "Gerar Caderno" usa (busca de filtros, contagem, criação).
+
+- Reaproveita os cookies da sessão do navegador já logado (nenhum login extra).
+- Uma requests.Session com pool de conexões: um caderno custa poucas requisições
+  em vez de dezenas de cliques, esperas e renderizações.
+- Endpoints e esquemas das respostas ficam em data/tec_endpoints.json. Enquanto o
+  arquivo não estiver marcado como "verificado" (conferido contra uma gravação real),
+  o atalho fica escondido na GUI e no main.py. Qualquer
+  resposta fora do esquema (ou erro HTTP, ou HTML de login) vira RespostaInesperada,
+  e quem chamou volta para o fluxo do Playwright. Exceção: falha depois que o pedido
+  de criação saiu. O caderno pode já existir, então o resultado volta como falha
+  "incerto" (sem repetir pelo navegador, para não duplicar).
+- Com AUTOMACAO_GRAVAR_TEC=1, as trocas (do cliente e os XHRs do próprio navegador)
+  são gravadas em cache/tec_gravacoes/, para conferir os endpoints e alimentar o
+  servidor de replay (tec_replay.py).
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.telemetry import Telemetria
+
+ENDPOINTS_FILE = os.path.join("data", "tec_endpoints.json")
+GRAVACOES_DIR = os.path.join("cache", "tec_gravacoes")
+TIMEOUT_HTTP_S = 15
+TIPOS_ESQUEMA = {"int": int, "float": (int, float), "str": str, "bool": bool}
+
+
+class RespostaInesperada(Exception):
+    """Resposta que o atalho HTTP não sabe interpretar: use o navegador."""
+
+
+def gravacao_ativa() -> bool:
+    return os.environ.get("AUTOMACAO_GRAVAR_TEC", "0") == "1"
+
+
+def carregar_endpoints(caminho: str = ENDPOINTS_FILE) -> Dict[str, Any]:
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def endpoints_verificados(caminho: str = ENDPOINTS_FILE) -> bool:
+    """True só depois que os endpoints foram conferidos contra uma gravação real do TEC."""
+    try:
+        return carregar_endpoints(caminho).get("verificado") is True
+    except (OSError, ValueError):
+        return False
+
+
+def validar_esquema(dados: Any, esquema: Any, caminho: str = "resposta") -> Optional[str]:
+    """
+    None se 'dados' bate com o esquema; senão, a descrição do primeiro problema.
+    Esquema: nome de tipo ("int", "str"...), {"lista": esquema_do_item} ou {campo: esquema}.
+    Campos extras na resposta são ignorados.
+    """
+    if isinstance(esquema, str):
+        # bool é subclasse de int em Python: não vale como número
+        if isinstance(dados, TIPOS_ESQUEMA[esquema]) and not (esquema != "bool" and isinstance(dados, bool)):
+            return None
+        return f"{caminho}: esperado {esquema}, veio {type(dados).__name__}"
+    if list(esquema) == ["lista"]:
+        if not isinstance(dados, list):
+            return f"{caminho}: esperado lista, veio {type(dados).__name__}"
+        for i, item in enumerate(dados):
+            erro = validar_esquema(item, esquema["lista"], f"{caminho}[{i}]")
+            if erro:
+                return erro
+        return None
+    if not isinstance(dados, dict):
+        return f"{caminho}: esperado objeto, veio {type(dados).__name__}"
+    for campo, sub in esquema.items():
+        if campo not in dados:
+            return f"{caminho}.{campo} ausente"
+        erro = validar_esquema(dados[campo], sub, f"{caminho}.{campo}")
+        if erro:
+            return erro
+    return None
+
+
+def chave_gravacao(metodo: str, url: str, corpo: Any) -> str:
+    """Identifica uma requisição independente do host (o replay roda em outro endereço)."""
+    partes = urlparse(url)
+    query = json.dumps(parse_qs(partes.query), sort_keys=True, ensure_ascii=False)
+    return f"{metodo.upper()} {partes.path} {query} {json.dumps(corpo, sort_keys=True, ensure_ascii=False)}"
+
+
+class GravadorRespostas:
+    """Grava pares requisição/resposta em JSONL (um arquivo por execução)."""
+
+    def __init__(self, pasta: str = GRAVACOES_DIR):
+        os.makedirs(pasta, exist_ok=True)
+        self.caminho = os.path.join(pasta, f"tec_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.jsonl")
+        self._lock = threading.Lock()
+        self._ouvintes = []
+
+    def registrar(self, metodo: str, url: str, corpo: Any, status: int, resposta: Any, origem: str = "http"):
+        partes = urlparse(url)
+        linha = {
+            "origem": origem, "metodo": metodo.upper(), "caminho": partes.path,
+            "query": parse_qs(partes.query), "corpo": corpo, "status": status, "resposta": resposta,
+        }
+        with self._lock, open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(linha, ensure_ascii=False) + "\n")
+
+    def acompanhar(self, page):
+        """Grava também os XHRs JSON que a página do TEC faz durante o fluxo do Playwright."""
+        def ao_responder(resposta):
+            requisicao = resposta.request
+            if requisicao.resource_type not in ("xhr", "fetch") or "json" not in resposta.headers.get("content-type", ""):
+                return
+            try:
+                corpo = requisicao.post_data_json
+            except Exception:
+                corpo = requisicao.post_data
+            try:
+                self.registrar(requisicao.method, resposta.url, corpo, resposta.status, resposta.json(), origem="navegador")
+            except Exception:
+                pass # Gravação é diagnóstico: nunca derruba a automação
+        page.on("response", ao_responder)
+        self._ouvintes.append((page, ao_responder))
+
+    def soltar(self):
+        """Para de acompanhar as páginas (elas podem continuar vivas no BrowserManager)."""
+        for page, ouvinte in self._ouvintes:
+            try:
+                page.remove_listener("response", ouvinte)
+            except Exception:
+                pass
+        self._ouvintes.clear()
+
+
+class TecHttpClient:
+    def __init__(self, log_callback, cookies: List[Dict[str, Any]] = None, cabecalhos: Dict[str, str] = None,
+                 endpoints: Dict[str, Any] = None, base_url: str = None, telemetria: Telemetria = None,
+                 gravador: GravadorRespostas = None, timeout_s: float = TIMEOUT_HTTP_S):
+        """
+        cookies: no formato do Playwright (context.cookies()).
+        base_url: sobrescreve a do arquivo de endpoints (ou TEC_HTTP_BASE), ex.: o servidor de replay.
+        """
+        self.log = log_callback
+        self.config = endpoints or carregar_endpoints()
+        self.base_url = (base_url or os.environ.get("TEC_HTTP_BASE") or self.config["base_url"]).rstrip("/")
+        self.telemetria = telemetria or Telemetria.nula()
+        self.gravador = gravador
+        self.timeout_s = timeout_s
+        self._ids: Dict[tuple, int] = {} # (tipo, nome) -> id do filtro, válido para o processo todo
+
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.headers.update({"Accept": "application/json", "X-Requested-With": "XMLHttpRequest"})
+        self.sessao.headers.update(cabecalhos or {})
+        for c in cookies or []:
+            self.sessao.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+            if c["name"] == "XSRF-TOKEN":
+                # Proteção CSRF padrão do AngularJS: o token do cookie volta no cabeçalho
+                self.sessao.headers["X-XSRF-TOKEN"] = c["value"]
+
+    @classmethod
+    def do_navegador(cls, automation, log_callback, **kwargs) -> "TecHttpClient":
+        """Cliente com os cookies do TEC e o User-Agent do navegador já logado."""
+        from .web_automation import SITES_SESSAO # Só aqui: o cliente em si não depende do Playwright
+        dominio = SITES_SESSAO["tec"]["dominio"]
+        cookies = [c for c in automation.context.cookies() if dominio in c.get("domain", "")]
+        config = kwargs.get("endpoints") or carregar_endpoints()
+        cabecalhos = {"User-Agent": automation.page.evaluate("navigator.userAgent"), "Referer": config["url_gerador"]}
+        return cls(log_callback, cookies=cookies, cabecalhos=cabecalhos, **{**kwargs, "endpoints": config})
+
+    def fechar(self):
+        self.sessao.close()
+
+    def _chamar(self, nome: str, corpo: Any = None, params: Dict[str, Any] = None, **caminho) -> Any:
+        endpoint = self.config["endpoints"][nome]
+        url = self.base_url + endpoint["caminho"].format(**caminho)
+        with self.telemetria.span(f"tec.http.{nome}") as span:
+            try:
+                resposta = self.sessao.request(endpoint["metodo"], url, params=params, json=corpo,
+                                               timeout=self.timeout_s, allow_redirects=False)
+            except requests.RequestException as e:
+                raise RespostaInesperada(f"{nome}: {e}") from e
+            span.set(status=resposta.status_code)
+            try:
+                dados = resposta.json()
+            except ValueError:
+                dados = None
+            if self.gravador is not None:
+                self.gravador.registrar(endpoint["metodo"], resposta.url, corpo, resposta.status_code, dados)
+
+            # Redirecionamento = sessão expirada (login); HTML = página em vez de API
+            if not 200 <= resposta.status_code < 300:
+                raise RespostaInesperada(f"{nome}: HTTP {resposta.status_code}")
+            erro = validar_esquema(dados, endpoint["esquema"])
+            if erro:
+                span.set(esquema=False)
+                raise RespostaInesperada(f"{nome}: {erro}")
+            return dados
+
+    def resolver_filtro(self, tipo: str, nome: str) -> int:
+        """
+        ID do item de filtro pelo nome exibido no gerador (mesmo critério da busca na árvore:
+        nome exato; senão, o último que contém o termo = o mais específico).
+        """
+        alvo = nome.strip().lower()
+        chave = (tipo, alvo)
+        if chave not in self._ids:
+            itens = self._chamar("buscar_filtro", params={"termo": nome}, tipo=self.config["tipos_filtro"][tipo])
+            exatos = [i for i in itens if i["nome"].strip().lower() == alvo]
+            candidatos = exatos or [i for i in itens if alvo in i["nome"].lower()]
+            if not candidatos:
+                # A árvore do navegador tem caminhos que a busca não cobre (ex.: "Todo o conteúdo de ...")
+                raise RespostaInesperada(f"filtro '{nome}' ({tipo}) não encontrado pela busca")
+            self._ids[chave] = candidatos[-1]["id"]
+        return self._ids[chave]
+
+    def criar_caderno(self, nome_caderno: str, materias: List[str], filtros_padrao: Dict[str, Any]) -> Dict[str, Any]:
+        """Mesmo resultado de TecAutomationPerfeito.create_notebook, sem abrir página."""
+        with self.telemetria.span("tec.http.caderno"):
+            filtros = {}
+            for tipo, valores in (("areas", filtros_padrao.get("areas")), ("materias", materias),
+                                  ("bancas", filtros_padrao.get("bancas")), ("anos", filtros_padrao.get("anos")),
+                                  ("escolaridades", filtros_padrao.get("escolaridades"))):
+                if valores:
+                    filtros[tipo] = [self.resolver_filtro(tipo, str(v)) for v in valores]
+
+            num = self._chamar("contar", corpo={"filtros": filtros})["quantidade"]
+            if num == 0:
+                self.log("❌ 0 questões encontradas. Pulando.")
+                return {
+                    "success": False,
+                    "erro": "0 questões encontradas",
+                    "num_questoes": 0,
+                    "filtros_usados": materias,
+                    "nome_caderno": nome_caderno,
+                    "url": self.config["url_gerador"]
+                }
+
+            self.log(f"✅ {num} questões.")
+            try:
+                caderno = self._chamar("criar", corpo={"nome": nome_caderno, "filtros": filtros})
+            except RespostaInesperada as e:
+                # O POST de criação pode ter chegado ao TEC: repetir pelo navegador duplicaria o caderno
+                self.log(f"⚠️ Criação via HTTP sem confirmação ({e}). Confira no TEC antes de repetir.")
+                self.telemetria.contar("tec.http.incertos")
+                return {
+                    "success": False,
+                    "incerto": True,
+                    "erro": "Criação via HTTP sem confirmação: confira no TEC antes de repetir",
+                    "num_questoes": num,
+                    "filtros_usados": materias,
+                    "nome_caderno": nome_caderno,
+                    "url": self.config["url_gerador"]
+                }
+            self.telemetria.contar("tec.http.cadernos")
+            return {
+                "success": True,
+                "url": self.config["url_caderno"].format(id=caderno["id"]),
+                "nome_caderno": nome_caderno,
+                "num_questoes": num,
+                "filtros_usados": materias
+            }
@@ -0,0 +1,94 @@
+# src/automation/tec_paralelo.py
+"""
+Criação de cadernos no TEC em várias abas ao mesmo tempo.
+
+O Playwright síncrono não permite dirigir páginas de um mesmo contexto a partir
+de threads diferentes; por isso cada "aba" é um worker com o seu próprio
+Playwright (NavegadoresPorThread), autenticado com a sessão do TEC salva em
+cache/sessoes (o login manual acontece uma única vez, no navegador principal).
+Os workers conectam todos ao mesmo processo do Chrome (ChromeCompartilhado),
+cada um com o seu contexto; só se ele não abrir cada aba vira um navegador próprio.
+
+Todas as abas passam pelo LIMITADOR_TEC global antes de iniciar um caderno, e
+os resultados voltam na mesma ordem da lista de entrada.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from src.telemetry import Telemetria
+from .browser_manager import ChromeCompartilhado, NavegadoresPorThread
+from .tec_automation import FiltrosComuns, TecAutomationPerfeito
+from .web_automation import WebAutomation
+
+MAX_ABAS = 6 # Mais que isso começa a ser descortês com o TEC (e cada aba ainda custa um renderizador)
+
+
+class CriadorParaleloCadernos:
+    def __init__(self, log_callback: Callable[..., None], filtros_padrao: Dict, usuario_tec: str,
+                 abas: int = 3, headless: bool = False, telemetria: Telemetria = None,
+                 reaproveitar_filtros: bool = True, filtros_comuns: FiltrosComuns = None):
+        self.log = log_callback
+        self.filtros_padrao = filtros_padrao
+        self.reaproveitar_filtros = reaproveitar_filtros
+        self.filtros_comuns = filtros_comuns or FiltrosComuns() # Um só para todas as abas
+        self.usuario_tec = usuario_tec
+        self.abas = max(1, min(abas, MAX_ABAS))
+        self.telemetria = telemetria or Telemetria.nula()
+        self._chrome = ChromeCompartilhado(self.log, headless=headless)
+        self._navegadores = NavegadoresPorThread(self.log, headless=headless, telemetria=self.telemetria,
+                                                 ao_iniciar=self._autenticar)
+        self._erro_sessao = None # Sessão recusada uma vez = recusada para todas as abas
+
+    def _autenticar(self, automation: WebAutomation):
+        if not automation.restaurar_sessao("tec", self.usuario_tec):
+            self._erro_sessao = "Sessão do TEC indisponível para a aba paralela"
+            raise RuntimeError(self._erro_sessao)
+        automation.sites_logados.add("tec")
+
+    def criar(self, lista_aulas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        total = len(lista_aulas)
+        abas = min(self.abas, total) or 1
+        self.log(f"🗂️ Criando {total} caderno(s) em {abas} aba(s) paralela(s)...")
+
+        try:
+            self._navegadores.endpoint_cdp = self._chrome.iniciar()
+        except Exception as e:
+            self.log(f"⚠️ Chrome compartilhado indisponível ({e}); cada aba abre o seu navegador.")
+            self._navegadores.endpoint_cdp = None
+
+        pool = ThreadPoolExecutor(max_workers=abas, thread_name_prefix="tec-aba")
+        try:
+            with self.telemetria.span("tec.paralelo", abas=abas, total=total,
+                                      compartilhado=self._navegadores.endpoint_cdp is not None):
+                futuros = [pool.submit(self._criar_um, i, total, aula) for i, aula in enumerate(lista_aulas, 1)]
+                # Ordem da entrada, independente de qual aba terminou primeiro
+                return [f.result() for f in futuros]
+        finally:
+            self._navegadores.fechar_todos(pool, abas)
+            pool.shutdown(wait=True)
+            self._chrome.parar()
+
+    def _criar_um(self, i: int, total: int, aula: Dict[str, Any]) -> Dict[str, Any]:
+        prefixo = f"[caderno {i}/{total}] "
+        log = lambda msg, *args, **kwargs: self.log(prefixo + str(msg), *args, **kwargs)
+        try:
+            if self._erro_sessao:
+                raise RuntimeError(self._erro_sessao)
+            automation = self._navegadores.obter()
+            tec = TecAutomationPerfeito(automation.page, log, self.filtros_padrao, telemetria=self.telemetria,
+                                        reaproveitar_filtros=self.reaproveitar_filtros,
+                                        filtros_comuns=self.filtros_comuns)
+            tec.respeitar_intervalo()
+            return tec.create_notebook(aula["nome_caderno"], aula["materias"])
+        except Exception as e:
+            # url None = falhou antes de chegar ao TEC (navegador/sessão): quem chamou pode refazer na aba principal
+            log(f"❌ Erro na aba: {e}")
+            return {
+                "success": False,
+                "erro": str(e)[:100],
+                "num_questoes": 0,
+                "filtros_usados": aula["materias"],
+                "nome_caderno": aula["nome_caderno"],
+                "url": None
+            }
@@ -0,0 +1,104 @@
+# src/automation/tec_replay.py
+"""
+Servidor local que responde como os endpoints do TEC a partir de gravações
+(cache/tec_gravacoes/*.jsonl, ver GravadorRespostas). Serve para exercitar o
+TecHttpClient sem rede e sem conta no TEC:
+
+    python main.py replay cache/tec_gravacoes --porta 8765
+    TEC_HTTP_BASE=http://127.0.0.1:8765 python main.py lote cursos.json --tec-http
+
+(--tec-http só existe com data/tec_endpoints.json marcado como "verificado".)
+
+Cada requisição é casada pela chave completa (método, caminho, query e corpo);
+sem gravação idêntica, vale a última do mesmo método + caminho; sem nenhuma, 404.
+"""
+
+import os
+import json
+import glob
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from .tec_http import chave_gravacao
+
+
+def carregar_gravacoes(caminho: str) -> List[Dict[str, Any]]:
+    """Lê um arquivo .jsonl ou todos os .jsonl de uma pasta (em ordem de nome)."""
+    arquivos = sorted(glob.glob(os.path.join(caminho, "*.jsonl"))) if os.path.isdir(caminho) else [caminho]
+    gravacoes = []
+    for arquivo in arquivos:
+        with open(arquivo, "r", encoding="utf-8") as f:
+            gravacoes.extend(json.loads(linha) for linha in f if linha.strip())
+    return gravacoes
+
+
+class ServidorReplay:
+    def __init__(self, caminho: str, porta: int = 0, host: str = "127.0.0.1"):
+        """porta 0 = qualquer porta livre (veja .url depois de iniciar())."""
+        self.host = host
+        self.porta = porta
+        self._exatas: Dict[str, Dict[str, Any]] = {}
+        self._por_rota: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for g in carregar_gravacoes(caminho):
+            url = g["caminho"] + ("?" + urlencode(g["query"], doseq=True) if g["query"] else "")
+            self._exatas[chave_gravacao(g["metodo"], url, g["corpo"])] = g
+            self._por_rota[(g["metodo"], g["caminho"])] = g
+        self._servidor: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.porta}"
+
+    def responder(self, metodo: str, caminho: str, corpo: Any) -> Tuple[int, Any]:
+        gravacao = self._exatas.get(chave_gravacao(metodo, caminho, corpo))
+        if gravacao is None:
+            gravacao = self._por_rota.get((metodo.upper(), caminho.split("?")[0]))
+        if gravacao is None:
+            return 404, {"erro": f"sem gravação para {metodo} {caminho}"}
+        return gravacao["status"], gravacao["resposta"]
+
+    def iniciar(self) -> str:
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _responder(self):
+                tamanho = int(self.headers.get("Content-Length") or 0)
+                bruto = self.rfile.read(tamanho) if tamanho else b""
+                try:
+                    corpo = json.loads(bruto) if bruto else None
+                except ValueError:
+                    corpo = bruto.decode("utf-8", "replace")
+                status, dados = replay.responder(self.command, self.path, corpo)
+                saida = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(saida)))
+                self.end_headers()
+                self.wfile.write(saida)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _responder
+
+            def log_message(self, *args):
+                pass # Silencioso: quem testa olha a telemetria do cliente
+
+        self._servidor = ThreadingHTTPServer((self.host, self.porta), Handler)
+        self.porta = self._servidor.server_address[1]
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name="tec-replay", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def parar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def __enter__(self) -> "ServidorReplay":
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc):
+        self.parar()
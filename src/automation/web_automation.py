@@ -7,10 +7,83 @@ from playwright.sync_api import (
     BrowserContext,
     Playwright
 )
-from typing import Optional, Callable
+from typing import Optional, Callable, Set, Dict, Any
 import os
+import re
 import sys
+import json
+import hashlib
 import subprocess
+from urllib.parse import urlparse
+
+SESSOES_DIR = os.path.join("cache", "sessoes")
+
+# Por site: domínio dos cookies/localStorage salvos, uma URL protegida barata para
+# validar a sessão e o trecho de URL que indica redirecionamento para o login.
+SITES_SESSAO: Dict[str, Dict[str, str]] = {
+    "bo": {
+        "dominio": "estrategiaconcursos.com.br",
+        "url_validacao": "https://www.estrategiaconcursos.com.br/admin/",
+        "marcador_login": "adminProf",
+    },
+    "tec": {
+        "dominio": "tecconcursos.com.br",
+        "url_validacao": "https://www.tecconcursos.com.br/questoes/cadernos/novo",
+        "marcador_login": "/login",
+    },
+}
+
+# Perfis de roteamento de rede. Por site (identificado pelo domínio da PÁGINA que fez
+# a requisição): tipos de recurso abortados. Em "*": padrões de URL de terceiros
+# (analytics, anúncios, players) bloqueados em qualquer página. Scripts bloqueados
+# recebem um stub vazio (200) para a página não quebrar esperando por eles.
+# "permitidos" vence tudo: o CAPTCHA dos logins manuais precisa das imagens dele.
+# Desligue com AUTOMACAO_BLOQUEIO_REDE=0 (ex.: para comparar tempos na telemetria).
+PERFIS_REDE: Dict[str, Dict[str, Any]] = {
+    "*": {
+        "permitidos": [r"google\.com/recaptcha", r"gstatic\.com/recaptcha", r"recaptcha\.net",
+                       r"hcaptcha\.com", r"challenges\.cloudflare\.com"],
+        "padroes": [
+            r"google-analytics\.com", r"googletagmanager\.com", r"doubleclick\.net", r"googlesyndication\.com",
+            r"googleadservices\.com", r"facebook\.(net|com)/(tr|en_US|signals)", r"connect\.facebook\.net",
+            r"hotjar\.(com|io)", r"clarity\.ms", r"tiktok\.com", r"hubspot\.com", r"rdstation\.com",
+            r"youtube\.com/(embed|iframe_api)", r"player\.vimeo\.com",
+            r"onesignal\.com", r"zopim\.com", r"zendesk\.com",
+        ],
+    },
+    "bo": {"dominio": "estrategiaconcursos.com.br", "tipos": ["image", "media", "font"]},
+    "tec": {"dominio": "tecconcursos.com.br", "tipos": ["image", "media", "font"]},
+}
+STUB_SCRIPT = "/* bloqueado pela automação */"
+
+
+def _bloqueio_rede_ativo() -> bool:
+    return os.environ.get("AUTOMACAO_BLOQUEIO_REDE", "1") != "0"
+
+
+def registrar_navegacao(page, telemetria, nome: str, **attrs):
+    """Leva à telemetria o tempo até DOM interativo e até DOMContentLoaded da navegação atual."""
+    tempos = medir_navegacao(page)
+    if not tempos:
+        return
+    telemetria.registrar_duracao(f"{nome}.dom_interativo", tempos["dom_interativo_ms"], **attrs)
+    telemetria.registrar_duracao(f"{nome}.dom_pronto", tempos["dom_pronto_ms"], bytes=tempos["bytes"],
+                                 recursos=tempos["recursos"], **attrs)
+
+
+def medir_navegacao(page) -> Optional[Dict[str, float]]:
+    """Navigation Timing da última navegação da página (ms desde o início), ou None se indisponível."""
+    try:
+        return page.evaluate("""() => {
+            const n = performance.getEntriesByType('navigation')[0];
+            if (!n) return null;
+            return {dom_interativo_ms: n.domInteractive, dom_pronto_ms: n.domContentLoadedEventEnd,
+                    load_ms: n.loadEventEnd, bytes: n.transferSize,
+                    recursos: performance.getEntriesByType('resource').length};
+        }""")
+    except Exception:
+        return None
+
 
 def _find_chrome_executable():
     """
@@ -57,13 +130,15 @@ class WebAutomation:
     Ideal para executáveis PyInstaller.
     """
     
-    def __init__(self, log_callback: Callable[..., None], headless: bool = False):
+    def __init__(self, log_callback: Callable[..., None], headless: bool = False,
+                 perfis_rede: Optional[Dict[str, Dict[str, Any]]] = None):
         """
         Inicializa a automação web.
 
         Args:
             log_callback (Callable): Função da GUI para enviar mensagens de log.
             headless (bool): Define se o navegador será executado em modo invisível.
+            perfis_rede (dict): Perfis de bloqueio de recursos (padrão: PERFIS_REDE; {} desliga).
         """
         self.log = log_callback
         self.headless = headless
@@ -73,9 +148,26 @@ class WebAutomation:
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self._dono_navegador = True # False quando o navegador pertence a um BrowserManager
+        self._conectado = False     # True quando o navegador é um ChromeCompartilhado (via CDP)
+
+        # Sites com login já feito neste navegador (permite reusar a sessão entre cursos)
+        self.sites_logados: Set[str] = set()
         
         # Encontrar navegador do sistema
         self.chrome_path = _find_chrome_executable()
+        self.sessoes_dir = SESSOES_DIR
+
+        # Roteamento de rede: regras pré-compiladas e contagem do que foi bloqueado
+        if perfis_rede is None:
+            perfis_rede = PERFIS_REDE if _bloqueio_rede_ativo() else {}
+        self._padroes_permitidos = [re.compile(p) for p in perfis_rede.get("*", {}).get("permitidos", [])]
+        self._padroes_terceiros = [re.compile(p) for p in perfis_rede.get("*", {}).get("padroes", [])]
+        self._tipos_por_dominio = {
+            perfil["dominio"]: (site, set(perfil.get("tipos", [])))
+            for site, perfil in perfis_rede.items() if "dominio" in perfil
+        }
+        self.estatisticas_rede: Dict[tuple, int] = {}
 
     def start(self):
         """Inicia o Playwright, abre o navegador e cria uma nova página."""
@@ -108,34 +200,198 @@ class WebAutomation:
                 ]
             )
             
-            self.context = self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
-            
-            self.page = self.context.new_page()
+            self._abrir_contexto()
             self.log("✅ Navegador iniciado com sucesso.")
             
         except Exception as e:
             self.log(f"❌ Erro crítico ao iniciar o Playwright: {e}")
             raise
 
+    def conectar(self, endpoint_cdp: str):
+        """
+        Conecta o Playwright desta thread a um Chrome já aberto (ChromeCompartilhado) e abre
+        contexto e página próprios. stop() desconecta, mas não fecha o navegador dos outros.
+        """
+        self.playwright = sync_playwright().start()
+        self._dono_navegador = False
+        self._conectado = True
+        try:
+            self.browser = self.playwright.chromium.connect_over_cdp(endpoint_cdp)
+            self._abrir_contexto()
+        except Exception as e:
+            self.log(f"❌ Erro ao conectar ao navegador compartilhado: {e}")
+            self.stop() # Para o Playwright desta thread
+            raise
+
+    def anexar(self, browser: Browser):
+        """Abre contexto e página num navegador já iniciado (de um BrowserManager), sem ser dono dele."""
+        self.browser = browser
+        self._dono_navegador = False
+        self._abrir_contexto()
+
+    def _abrir_contexto(self):
+        self.context = self.browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        )
+        
+        if self._padroes_terceiros or self._tipos_por_dominio:
+            self.context.route("**/*", self._rotear)
+        self.page = self.context.new_page()
+
+    # --- Roteamento de rede ---
+    def _site_da_pagina(self, request) -> tuple:
+        try:
+            url_pagina = request.frame.url
+        except Exception:
+            url_pagina = request.url # Ex.: service worker, sem frame
+        host = urlparse(url_pagina).hostname or ""
+        for dominio, regra in self._tipos_por_dominio.items():
+            if host.endswith(dominio):
+                return regra
+        return "outros", set()
+
+    def _rotear(self, route):
+        request = route.request
+        tipo = request.resource_type
+        site, tipos_bloqueados = self._site_da_pagina(request)
+        try:
+            if any(p.search(request.url) for p in self._padroes_permitidos):
+                acao = "permitido"
+                route.continue_()
+            elif tipo in tipos_bloqueados:
+                acao = "abortado"
+                route.abort("blockedbyclient")
+            elif any(p.search(request.url) for p in self._padroes_terceiros):
+                if tipo == "script":
+                    acao = "stub"
+                    route.fulfill(status=200, content_type="application/javascript", body=STUB_SCRIPT)
+                else:
+                    acao = "abortado"
+                    route.abort("blockedbyclient")
+            else:
+                acao = "permitido"
+                route.continue_()
+        except Exception:
+            return # Página fechada no meio da requisição
+        chave = (site, acao, tipo)
+        self.estatisticas_rede[chave] = self.estatisticas_rede.get(chave, 0) + 1
+
+    def descarregar_rede(self, telemetria):
+        """Envia as contagens de requisições (bloqueadas/stub/permitidas) à telemetria e zera."""
+        estatisticas, self.estatisticas_rede = self.estatisticas_rede, {}
+        for (site, acao, tipo), n in sorted(estatisticas.items()):
+            telemetria.contar(f"rede.{site}.{acao}", n, tipo=tipo)
+
     def stop(self):
         """Fecha o navegador e finaliza o Playwright de forma segura."""
         self.log("Finalizando automação web...")
+        # Fecha os recursos na ordem inversa de criação; uma falha (ex.: janela já
+        # fechada pelo usuário) não impede o fechamento dos seguintes
+        recursos = [self.page, self.context]
+        if self._dono_navegador:
+            recursos += [self.browser, self.playwright]
+        elif self._conectado:
+            recursos += [self.playwright] # Desconecta sem fechar o Chrome compartilhado
+        falhas = 0
+        for recurso in recursos:
+            if recurso is None:
+                continue
+            try:
+                recurso.stop() if recurso is self.playwright else recurso.close()
+            except Exception as e:
+                falhas += 1
+                self.log(f"⚠️ Aviso ao fechar o navegador: {e}")
+        self.page = self.context = None
+        if self._dono_navegador or self._conectado:
+            self.browser = self.playwright = None
+            if not falhas:
+                self.log("Navegador fechado com segurança.")
+
+    # --- Sessões persistentes (storage state por site e usuário) ---
+    def caminho_sessao(self, site: str, usuario: str) -> str:
+        # O usuário vira hash: o nome do arquivo não expõe o e-mail/login
+        chave = hashlib.sha1((usuario or "").strip().lower().encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.sessoes_dir, f"{site}_{chave}.json")
+
+    def salvar_sessao(self, site: str, usuario: str):
+        """Grava os cookies e o localStorage do site (apenas do domínio dele) após um login manual."""
+        dominio = SITES_SESSAO[site]["dominio"]
+        try:
+            estado = self.context.storage_state()
+            estado = {
+                "cookies": [c for c in estado.get("cookies", []) if c.get("domain", "").lstrip(".").endswith(dominio)],
+                "origins": [o for o in estado.get("origins", []) if dominio in o.get("origin", "")],
+            }
+            os.makedirs(self.sessoes_dir, exist_ok=True)
+            caminho = self.caminho_sessao(site, usuario)
+            tmp = caminho + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(estado, f)
+            os.replace(tmp, caminho)
+            self.log(f"💾 Sessão de '{site}' salva ({len(estado['cookies'])} cookies).")
+        except Exception as e:
+            self.log(f"⚠️ Não foi possível salvar a sessão de '{site}': {e}")
+
+    def restaurar_sessao(self, site: str, usuario: str) -> bool:
+        """
+        Injeta os cookies salvos no contexto atual e valida com UMA requisição HTTP
+        (sem renderizar página). Só com a sessão válida o localStorage salvo é reposto.
+        False = sem sessão, expirada ou sem resposta: o login interativo é necessário.
+        O arquivo só é apagado quando a resposta mostra a sessão expirada (não em falhas de rede).
+        """
+        caminho = self.caminho_sessao(site, usuario)
+        if not os.path.exists(caminho):
+            return False
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                estado = json.load(f)
+        except (OSError, ValueError) as e:
+            self.log(f"⚠️ Sessão salva de '{site}' ilegível: {e}")
+            self._descartar_sessao(caminho)
+            return False
+
+        config = SITES_SESSAO[site]
+        try:
+            if estado.get("cookies"):
+                self.context.add_cookies(estado["cookies"])
+            resposta = self.context.request.get(config["url_validacao"], timeout=15000)
+            status, url_final = resposta.status, resposta.url
+            resposta.dispose()
+        except Exception as e:
+            # Rede/timeout: nada prova que a sessão expirou; o arquivo fica para a próxima vez
+            self.log(f"⚠️ Não foi possível validar a sessão salva de '{site}': {e}")
+            return False
+
+        if status in (401, 403) or config["marcador_login"] in url_final:
+            self.log(f"⌛ Sessão salva de '{site}' expirou. Login manual necessário.")
+            self._descartar_sessao(caminho)
+            return False
+        if not 200 <= status < 300:
+            self.log(f"⚠️ Validação da sessão de '{site}' respondeu HTTP {status}; sessão mantida, login manual agora.")
+            return False
+
+        for origem in estado.get("origins", []):
+            self._restaurar_local_storage(origem)
+        return True
+
+    def _descartar_sessao(self, caminho: str):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+    def _restaurar_local_storage(self, origem: Dict[str, Any]):
+        # O Playwright só aceita localStorage na criação do contexto. Aqui ele é reposto
+        # uma única vez, na própria origem; depois disso o site atualiza o que quiser.
+        itens = {item["name"]: item["value"] for item in origem.get("localStorage", [])}
+        if not itens:
+            return
         try:
-            # Fecha os recursos na ordem inversa de criação
-            if self.page:
-                self.page.close()
-            if self.context:
-                self.context.close()
-            if self.browser:
-                self.browser.close()
-            if self.playwright:
-                self.playwright.stop()
-            self.log("Navegador fechado com segurança.")
+            self.page.goto(origem["origin"], wait_until="domcontentloaded")
+            self.page.evaluate("itens => { for (const [k, v] of Object.entries(itens)) localStorage.setItem(k, v); }", itens)
         except Exception as e:
-            self.log(f"⚠️ Aviso ao fechar o navegador: {e}")
+            self.log(f"⚠️ localStorage de {origem['origin']} não reposto: {e}")
 
     # --- Context Manager Support ---
     def __enter__(self):
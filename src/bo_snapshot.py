@@ -0,0 +1,164 @@
+# src/bo_snapshot.py
+"""
+Snapshots da página de curso do BO, por ID de curso.
+
+Cada raspagem guarda em cache/bo_snapshots/:
+  - <curso>.json: data, hash do conteúdo extraído e as aulas (registro + hash de cada uma),
+    além dos matches da IA por hash de aula (com a assinatura do matcher que os gerou);
+  - <curso>.html: o HTML bruto da página, para re-extrair offline (depurar o extrator).
+
+Na raspagem seguinte, comparar() diz o que é novo, alterado, removido ou igual, e
+matches_salvos() devolve os matches já calculados das aulas que não mudaram:
+só o que mudou volta para o matcher.
+"""
+
+import os
+import re
+import json
+import hashlib
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+SNAPSHOTS_DIR = os.path.join("cache", "bo_snapshots")
+VERSAO_SNAPSHOT = 1
+_CURSO_ID_RE = re.compile(r"[A-Za-z0-9_-]+") # Códigos do BO; nada de separadores ou '..' no nome do arquivo
+
+
+def curso_id_valido(curso_id: str) -> bool:
+    """O ID vem de arquivo de lote ou de URL e vira nome de arquivo: só letras, dígitos, '_' e '-'."""
+    return bool(curso_id) and _CURSO_ID_RE.fullmatch(curso_id) is not None
+
+
+def normalizar_aula(texto_aula: str) -> str:
+    """Texto da aula já formatado ('Título: conteúdo') sem diferenças de espaços."""
+    return " ".join(texto_aula.split())
+
+
+def hash_aula(texto_aula: str) -> str:
+    """Hash do texto da aula já formatado, insensível a espaços extras."""
+    return hashlib.sha1(normalizar_aula(texto_aula).encode("utf-8")).hexdigest()[:16]
+
+
+def assinatura_matching(text_matcher, materias: Any, preprocessador=None) -> str:
+    """
+    Matches só são reaproveitáveis com as mesmas entradas do matching: modelo, catálogo,
+    matérias (e, com elas, o modo filtrado/hierárquico), limiares, assuntos vazios
+    (política e contagens) e regras de limpeza/pulo das aulas.
+    """
+    from src.matching import TOP_K_ASSUNTOS, LIMIAR_MATERIA, LIMIAR_ASSUNTO, LIMIAR_FALLBACK
+
+    materias = sorted(materias) if isinstance(materias, list) else [materias or ""]
+    modo = "filtrado" if any(materias) else "hierarquico"
+    preprocessador = preprocessador or text_matcher.preprocessador
+    base = json.dumps([
+        text_matcher.model_name, text_matcher.assinatura, materias, modo,
+        [TOP_K_ASSUNTOS, LIMIAR_MATERIA, LIMIAR_ASSUNTO, LIMIAR_FALLBACK],
+        text_matcher.assinatura_ajustes, preprocessador.assinatura,
+    ], ensure_ascii=False)
+    return hashlib.sha1(base.encode("utf-8")).hexdigest()[:16]
+
+
+class SnapshotsBO:
+    def __init__(self, log_callback: Callable[..., None], pasta: str = SNAPSHOTS_DIR):
+        self.log = log_callback
+        self.pasta = pasta
+
+    def _caminho(self, curso_id: str, extensao: str) -> str:
+        if not curso_id_valido(curso_id):
+            raise ValueError(f"ID de curso inválido para snapshot: {curso_id!r}")
+        return os.path.join(self.pasta, f"{curso_id}.{extensao}")
+
+    def carregar(self, curso_id: str) -> Optional[Dict[str, Any]]:
+        caminho = self._caminho(curso_id, "json")
+        if not os.path.exists(caminho):
+            return None
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            return snapshot if snapshot.get("versao") == VERSAO_SNAPSHOT else None
+        except Exception as e:
+            self.log(f"⚠️ Snapshot do curso {curso_id} ilegível: {e}")
+            return None
+
+    def carregar_html(self, curso_id: str) -> Optional[str]:
+        caminho = self._caminho(curso_id, "html")
+        if not os.path.exists(caminho):
+            return None
+        with open(caminho, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def salvar(self, curso_id: str, aulas: List[Dict[str, Any]], html: Optional[str] = None):
+        """
+        aulas: registros do BoAutomation.get_aulas_detalhadas acrescidos de 'texto' (formatado).
+        Os matches de aulas que continuam no curso são preservados.
+        """
+        anterior = self.carregar(curso_id) or {}
+        hashes = [hash_aula(a["texto"]) for a in aulas]
+        atuais = set(hashes)
+        matches = {h: m for h, m in anterior.get("matches", {}).items() if h in atuais}
+        snapshot = {
+            "versao": VERSAO_SNAPSHOT,
+            "curso_id": curso_id,
+            "capturado_em": datetime.now().isoformat(timespec="seconds"),
+            "hash_conteudo": hashlib.sha1("".join(hashes).encode("utf-8")).hexdigest()[:16],
+            "aulas": [{**a, "hash": h} for a, h in zip(aulas, hashes)],
+            "assinatura_matching": anterior.get("assinatura_matching"),
+            "matches": matches,
+        }
+        self._gravar(curso_id, snapshot)
+        if html is not None:
+            with open(self._caminho(curso_id, "html"), "w", encoding="utf-8") as f:
+                f.write(html)
+
+    def comparar(self, curso_id: str, aulas: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """
+        Classifica as aulas extraídas agora contra o último snapshot. A chave de cada aula é o
+        id do BO quando existe (senão, o título): mesma chave com outro hash = alterada.
+        """
+        anterior = self.carregar(curso_id)
+        resultado = {"novas": [], "alteradas": [], "inalteradas": [], "removidas": []}
+        if anterior is None:
+            resultado["novas"] = [a["texto"] for a in aulas]
+            return resultado
+
+        chave = lambda a: a.get("id") or a["titulo"]
+        antigas = {chave(a): a for a in anterior["aulas"]}
+        vistas = set()
+        for aula in aulas:
+            k = chave(aula)
+            vistas.add(k)
+            if k not in antigas:
+                resultado["novas"].append(aula["texto"])
+            elif antigas[k]["hash"] != hash_aula(aula["texto"]):
+                resultado["alteradas"].append(aula["texto"])
+            else:
+                resultado["inalteradas"].append(aula["texto"])
+        resultado["removidas"] = [a["texto"] for k, a in antigas.items() if k not in vistas]
+        return resultado
+
+    def matches_salvos(self, curso_id: str, assinatura: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Matches por hash de aula, se calculados com a mesma assinatura de matching."""
+        snapshot = self.carregar(curso_id)
+        if not snapshot or snapshot.get("assinatura_matching") != assinatura:
+            return {}
+        return snapshot.get("matches", {})
+
+    def guardar_matches(self, curso_id: str, assinatura: str, matches_por_aula: Dict[str, List[Dict[str, Any]]]):
+        """matches_por_aula: texto da aula -> matches da IA."""
+        snapshot = self.carregar(curso_id)
+        if snapshot is None:
+            return
+        if snapshot.get("assinatura_matching") != assinatura:
+            snapshot["matches"] = {}
+            snapshot["assinatura_matching"] = assinatura
+        for texto, matches in matches_por_aula.items():
+            snapshot["matches"][hash_aula(texto)] = matches
+        self._gravar(curso_id, snapshot)
+
+    def _gravar(self, curso_id: str, snapshot: Dict[str, Any]):
+        os.makedirs(self.pasta, exist_ok=True)
+        caminho = self._caminho(curso_id, "json")
+        tmp = caminho + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, caminho)
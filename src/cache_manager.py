@@ -1,11 +1,17 @@
 # src/cache_manager.py
 import os
 import json
-from typing import Callable, Dict, Any, List, Optional
+import threading
+from typing import Callable, Dict, Any, List, Optional, Set
+
+from src.bo_snapshot import normalizar_aula
 
 CACHE_DIR = "cache"
 CACHE_FILE = os.path.join(CACHE_DIR, "matches_cache.json")
 
+# Várias instâncias (jobs paralelos do scheduler/lote) gravam o mesmo arquivo
+_LOCK_ARQUIVO = threading.Lock()
+
 class CacheManager:
     def __init__(self, log_callback: Callable[..., None]):
         self.log = log_callback
@@ -24,6 +30,9 @@ class CacheManager:
             "courses": {}
         }
         self.has_changed: bool = False
+        # Cursos alterados por ESTA instância: só eles são gravados por cima do arquivo
+        self._cursos_alterados: Set[str] = set()
+        self._reescrever_tudo: bool = False
 
         try:
             if not os.path.exists(CACHE_DIR):
@@ -32,6 +41,7 @@ class CacheManager:
             self.log(f"⚠️ Aviso: Não foi possível criar diretório cache: {e}")
             
         self._load_cache()
+        self._reescrever_tudo = False # O reset da carga inicial não deve apagar o que outros jobs gravarem
 
     def _load_cache(self):
         try:
@@ -52,6 +62,8 @@ class CacheManager:
                             self.cache_structure["meta"]["last_accessed_id"] = old_id
                     else:
                         self.cache_structure = loaded
+                    # Seção de versões antigas: a própria chave (texto da aula) já identifica a revisão
+                    self.cache_structure.pop("fingerprints", None)
             else:
                 self.reset_all_cache()
         except Exception as e:
@@ -65,12 +77,14 @@ class CacheManager:
             "courses": {}
         }
         self.has_changed = True
+        self._reescrever_tudo = True
 
     def reset_current_course(self):
         """Limpa apenas os dados do curso atual selecionado"""
         if self.current_course_id and self.current_course_id in self.cache_structure["courses"]:
             del self.cache_structure["courses"][self.current_course_id]
             self.has_changed = True
+            self._cursos_alterados.add(self.current_course_id)
 
     # Mantido para compatibilidade, mas agora apenas reseta o curso ATUAL
     def reset_cache(self):
@@ -112,6 +126,25 @@ class CacheManager:
         if current_data.get(key) != value:
             self.cache_structure["courses"][self.current_course_id][key] = value
             self.has_changed = True
+            self._cursos_alterados.add(self.current_course_id)
+
+    def substituir_curso(self, mapeamentos: Dict[str, List[str]]):
+        """Troca TODOS os mapeamentos do curso atual (aulas que saíram do curso deixam o cache)."""
+        if not self.current_course_id: return
+        removidas = set(self.cache_structure["courses"][self.current_course_id]) - set(mapeamentos)
+        for aula in removidas:
+            del self.cache_structure["courses"][self.current_course_id][aula]
+        if removidas:
+            self.has_changed = True
+            self._cursos_alterados.add(self.current_course_id)
+        for aula, filtros in mapeamentos.items():
+            self.set(aula, filtros)
+
+    def mapeamentos_normalizados(self) -> Dict[str, Dict[str, Any]]:
+        """{texto normalizado da aula: {'aula', 'filtros'}} do curso atual, para reaproveitar revisões de aulas que não mudaram."""
+        if not self.current_course_id: return {}
+        aulas = self.cache_structure["courses"].get(self.current_course_id, {})
+        return {normalizar_aula(aula): {"aula": aula, "filtros": filtros} for aula, filtros in aulas.items()}
 
     def get_all_tasks_formatted(self) -> List[Dict]:
         """Retorna tarefas do curso ATUAL"""
@@ -135,8 +168,63 @@ class CacheManager:
             return
 
         try:
-            with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.cache_structure, f, indent=4, ensure_ascii=False)
+            with _LOCK_ARQUIVO:
+                estrutura = self._mesclar_com_disco()
+                tmp = CACHE_FILE + ".tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(estrutura, f, indent=4, ensure_ascii=False)
+                os.replace(tmp, CACHE_FILE)
+            self.cache_structure = estrutura
             self.has_changed = False
+            self._cursos_alterados.clear()
+            self._reescrever_tudo = False
         except Exception as e:
-            self.log(f"❌ Erro ao salvar cache: {e}")
\ No newline at end of file
+            self.log(f"❌ Erro ao salvar cache: {e}")
+
+    def _mesclar_com_disco(self) -> Dict[str, Any]:
+        """Relê o arquivo e aplica por cima apenas os cursos alterados aqui (não apaga o trabalho de outros jobs)."""
+        if self._reescrever_tudo or not os.path.exists(CACHE_FILE):
+            return self.cache_structure
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                disco = json.load(f)
+        except Exception:
+            return self.cache_structure
+        if "courses" not in disco:
+            return self.cache_structure
+
+        disco.pop("fingerprints", None)
+        for course_id in self._cursos_alterados:
+            if course_id in self.cache_structure["courses"]:
+                disco["courses"][course_id] = self.cache_structure["courses"][course_id]
+            else:
+                disco["courses"].pop(course_id, None)
+        disco.setdefault("meta", {}).update(self.cache_structure["meta"])
+        return disco
+
+    def remapear_termos(self, renomeacoes: Dict[str, str], termos_validos: Set[str]) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Atualiza os mapeamentos de TODOS os cursos após uma nova versão do catálogo.
+        Termos renomeados são trocados pelo nome novo; termos que deixaram de existir
+        são mantidos, mas sinalizados em meta['termos_obsoletos'] para revisão manual.
+        """
+        obsoletos: Dict[str, Dict[str, List[str]]] = {}
+        for course_id, aulas in self.cache_structure["courses"].items():
+            for aula, filtros in aulas.items():
+                novos_filtros = []
+                for termo in filtros:
+                    if termo not in termos_validos and termo in renomeacoes:
+                        termo = renomeacoes[termo]
+                    elif termo not in termos_validos:
+                        obsoletos.setdefault(course_id, {}).setdefault(aula, []).append(termo)
+                    if termo not in novos_filtros:
+                        novos_filtros.append(termo)
+                if novos_filtros != filtros:
+                    aulas[aula] = novos_filtros
+                    self.has_changed = True
+                    self._cursos_alterados.add(course_id)
+
+        if self.cache_structure["meta"].get("termos_obsoletos") != obsoletos:
+            self.cache_structure["meta"]["termos_obsoletos"] = obsoletos
+            self.has_changed = True
+        return obsoletos
@@ -0,0 +1,280 @@
+# src/catalog_diff.py
+"""
+Comparação entre duas versões de materias_assuntos_tec.json.
+
+Classifica cada assunto como adicionado, removido, renomeado ou movido e usa
+esse resultado para atualizar, sem recalcular o que não mudou:
+  - os embeddings já calculados (índice pré-computado e cache/embeddings);
+  - os mapeamentos de cursos salvos em cache/matches_cache.json.
+"""
+
+import os
+import re
+import json
+import pickle
+import difflib
+from typing import List, Dict, Any, Callable, Optional
+
+from src.text_normalization import normalizar_lista
+from src.catalog_index import (
+    INDEX_DIR, assinatura_catalogo, carregar_manifesto, carregar_indice,
+    salvar_indice, construir_arvore
+)
+
+_ID_ASSUNTO_RE = re.compile(r"/assuntos/(\d+)")
+SIMILARIDADE_RENOMEACAO = 0.75
+
+
+def carregar_catalogo(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _id_assunto(url: Optional[str]) -> Optional[str]:
+    match = _ID_ASSUNTO_RE.search(url or "")
+    return match.group(1) if match else None
+
+
+def _achatar(catalogo: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Lista plana de assuntos com matéria, id do TEC (quando há URL) e índice global do pai."""
+    nomes, niveis, brutos = {}, {}, {}
+    for materia_data in catalogo:
+        materia = materia_data.get("nome")
+        if not materia:
+            continue
+        validos = [a for a in materia_data.get("assuntos", []) if a.get("nome")]
+        nomes[materia] = [a["nome"] for a in validos]
+        niveis[materia] = [int(a.get("nivel", 0) or 0) for a in validos]
+        brutos[materia] = validos
+
+    registros = []
+    for materia, nos in construir_arvore(nomes, niveis).items():
+        base = len(registros)
+        for no, bruto in zip(nos, brutos[materia]):
+            registros.append({
+                "materia": materia,
+                "materia_cmp": materia, # Nome usado na comparação (ajustado quando a matéria é renomeada)
+                "nome": no["nome"],
+                "id": _id_assunto(bruto.get("url")),
+                "pai": base + no["pai"] if no["pai"] is not None else None,
+            })
+    return registros
+
+
+def _parear(antigos: List[Dict], novos: List[Dict]) -> Dict[int, int]:
+    """Associa índices antigos -> novos em etapas, da evidência mais forte para a mais fraca."""
+    pares: Dict[int, int] = {}
+    livres_novos = set(range(len(novos)))
+
+    def restantes_antigos():
+        return [i for i in range(len(antigos)) if i not in pares]
+
+    # 1. Mesmo id do TEC (URL do assunto)
+    por_id = {r["id"]: j for j, r in enumerate(novos) if r["id"]}
+    for i in restantes_antigos():
+        j = por_id.get(antigos[i]["id"]) if antigos[i]["id"] else None
+        if j is not None and j in livres_novos:
+            pares[i] = j
+            livres_novos.discard(j)
+
+    # 2. Mesmo nome na mesma matéria
+    por_chave = {(novos[j]["materia_cmp"], novos[j]["nome"]): j for j in livres_novos}
+    for i in restantes_antigos():
+        j = por_chave.get((antigos[i]["materia_cmp"], antigos[i]["nome"]))
+        if j is not None and j in livres_novos:
+            pares[i] = j
+            livres_novos.discard(j)
+
+    # 3. Mesmo nome em outra matéria (somente se o nome for único dos dois lados)
+    contagem_antigos: Dict[str, List[int]] = {}
+    for i in restantes_antigos():
+        contagem_antigos.setdefault(antigos[i]["nome"], []).append(i)
+    contagem_novos: Dict[str, List[int]] = {}
+    for j in livres_novos:
+        contagem_novos.setdefault(novos[j]["nome"], []).append(j)
+    for nome, idx_antigos in contagem_antigos.items():
+        idx_novos = contagem_novos.get(nome, [])
+        if len(idx_antigos) == 1 and len(idx_novos) == 1:
+            pares[idx_antigos[0]] = idx_novos[0]
+            livres_novos.discard(idx_novos[0])
+
+    # 4. Nome parecido sob o mesmo pai (renomeação de nós sem URL)
+    for i in restantes_antigos():
+        antigo = antigos[i]
+        pai_novo = pares.get(antigo["pai"]) if antigo["pai"] is not None else None
+        candidatos = [
+            j for j in livres_novos
+            if novos[j]["materia_cmp"] == antigo["materia_cmp"] and novos[j]["pai"] == pai_novo
+        ]
+        melhor, melhor_score = None, SIMILARIDADE_RENOMEACAO
+        for j in candidatos:
+            score = difflib.SequenceMatcher(None, antigo["nome"].lower(), novos[j]["nome"].lower()).ratio()
+            if score >= melhor_score:
+                melhor, melhor_score = j, score
+        if melhor is not None:
+            pares[i] = melhor
+            livres_novos.discard(melhor)
+
+    return pares
+
+
+def diff_catalogos(catalogo_antigo: List[Dict[str, Any]], catalogo_novo: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Retorna um dicionário com as listas 'adicionados', 'removidos', 'renomeados' e 'movidos',
+    as mudanças de matérias e o mapa 'renomeacoes' (nome antigo -> novo nome, sem ambiguidade).
+    """
+    materias_antigas = {m.get("slug") or m.get("nome"): m.get("nome") for m in catalogo_antigo if m.get("nome")}
+    materias_novas = {m.get("slug") or m.get("nome"): m.get("nome") for m in catalogo_novo if m.get("nome")}
+
+    materias_renomeadas = [
+        {"de": materias_antigas[slug], "para": materias_novas[slug]}
+        for slug in materias_antigas.keys() & materias_novas.keys()
+        if materias_antigas[slug] != materias_novas[slug]
+    ]
+    nome_atual = {r["de"]: r["para"] for r in materias_renomeadas}
+
+    antigos = _achatar(catalogo_antigo)
+    for r in antigos:
+        r["materia_cmp"] = nome_atual.get(r["materia"], r["materia"])
+    novos = _achatar(catalogo_novo)
+    pares = _parear(antigos, novos)
+    pareados_novos = set(pares.values())
+
+    def nome_pai(registros, idx):
+        return registros[idx]["nome"] if idx is not None else None
+
+    renomeados, movidos = [], []
+    for i, j in pares.items():
+        antigo, novo = antigos[i], novos[j]
+        if antigo["nome"] != novo["nome"]:
+            renomeados.append({"materia": novo["materia"], "de": antigo["nome"], "para": novo["nome"]})
+        pai_esperado = pares.get(antigo["pai"]) if antigo["pai"] is not None else None
+        if antigo["materia_cmp"] != novo["materia_cmp"] or pai_esperado != novo["pai"]:
+            movidos.append({
+                "nome": novo["nome"],
+                "de_materia": antigo["materia"], "para_materia": novo["materia"],
+                "de_pai": nome_pai(antigos, antigo["pai"]), "para_pai": nome_pai(novos, novo["pai"]),
+            })
+
+    # Mapa de renomeação usado nos caches: só vale se o nome antigo sumiu e aponta para um único destino
+    nomes_novos = {r["nome"] for r in novos} | set(materias_novas.values())
+    destinos: Dict[str, set] = {}
+    for r in renomeados:
+        destinos.setdefault(r["de"], set()).add(r["para"])
+    for r in materias_renomeadas:
+        destinos.setdefault(r["de"], set()).add(r["para"])
+    renomeacoes = {de: para.pop() for de, para in destinos.items() if len(para) == 1 and de not in nomes_novos}
+
+    return {
+        "materias": {
+            "adicionadas": sorted(materias_novas[s] for s in materias_novas.keys() - materias_antigas.keys()),
+            "removidas": sorted(materias_antigas[s] for s in materias_antigas.keys() - materias_novas.keys()),
+            "renomeadas": materias_renomeadas,
+        },
+        "adicionados": [{"materia": r["materia"], "nome": r["nome"]} for j, r in enumerate(novos) if j not in pareados_novos],
+        "removidos": [{"materia": r["materia"], "nome": r["nome"]} for i, r in enumerate(antigos) if i not in pares],
+        "renomeados": renomeados,
+        "movidos": movidos,
+        "inalterados": sum(
+            1 for i, j in pares.items()
+            if antigos[i]["nome"] == novos[j]["nome"] and antigos[i]["materia_cmp"] == novos[j]["materia_cmp"]
+        ),
+        "renomeacoes": renomeacoes,
+    }
+
+
+def aplicar_patch_embeddings(loader_antigo, loader_novo, log_callback: Callable[..., None], index_dir: str = INDEX_DIR, model_name: Optional[str] = None) -> Dict[str, int]:
+    """
+    Reaproveita as linhas de embedding de todo texto que já existia (no índice pré-computado
+    e/ou em cache/embeddings) e calcula somente os textos novos, em um único lote.
+    Os artefatos são regravados na ordem do catálogo novo.
+    """
+    import torch
+    from src.matching import (
+        MODELO_PADRAO, CACHE_DIR,
+        MATERIAS_EMBEDDINGS_CACHE, ASSUNTOS_EMBEDDINGS_CACHE, FALLBACK_EMBEDDINGS_CACHE,
+        ler_assinatura_embeddings, gravar_assinatura_embeddings
+    )
+
+    manifest = carregar_manifesto(index_dir) if index_dir else None
+    model_name = model_name or (manifest or {}).get("modelo") or MODELO_PADRAO
+
+    pool: Dict[str, Any] = {}
+
+    def absorver(nomes, tensor):
+        if tensor is not None and len(nomes) == len(tensor):
+            for nome, linha in zip(nomes, tensor.cpu()):
+                pool.setdefault(nome, linha)
+            return True
+        return False
+
+    # 1. Fontes de embeddings já calculados para o catálogo antigo
+    assinatura_antiga = assinatura_catalogo(loader_antigo.materias, loader_antigo.assuntos_por_materia)
+    indice = carregar_indice(index_dir, assinatura_antiga, model_name, log_callback) if manifest else None
+    if indice:
+        absorver(loader_antigo.materias, indice["materias_embeddings"])
+        absorver(loader_antigo.lista_completa_fallback, indice["fallback_embeddings"])
+
+    # O tamanho não basta: um catálogo reordenado ou renomeado com o mesmo total trocaria os vetores
+    cache_ok = False
+    assinatura_cache = ler_assinatura_embeddings()
+    cache_confere = assinatura_cache.get("assinatura") == assinatura_antiga and assinatura_cache.get("modelo") == model_name
+    if not cache_confere and os.path.exists(MATERIAS_EMBEDDINGS_CACHE):
+        log_callback("⚠️ cache/embeddings sem assinatura do catálogo antigo (ou de outro modelo). Será ignorado.")
+    elif os.path.exists(MATERIAS_EMBEDDINGS_CACHE) and os.path.exists(FALLBACK_EMBEDDINGS_CACHE):
+        with open(MATERIAS_EMBEDDINGS_CACHE, "rb") as f:
+            cache_ok = absorver(loader_antigo.materias, pickle.load(f))
+        with open(FALLBACK_EMBEDDINGS_CACHE, "rb") as f:
+            cache_ok = absorver(loader_antigo.lista_completa_fallback, pickle.load(f)) and cache_ok
+        if not cache_ok:
+            log_callback("⚠️ cache/embeddings não corresponde ao catálogo antigo. Será ignorado.")
+
+    if not indice and not cache_ok:
+        log_callback("ℹ️ Nenhum embedding do catálogo antigo encontrado. Nada a atualizar.")
+        return {"reaproveitados": 0, "calculados": 0}
+
+    # 2. Calcula apenas os textos inéditos
+    todos_nomes = list(dict.fromkeys(loader_novo.materias + loader_novo.lista_completa_fallback))
+    faltando = [n for n in todos_nomes if n not in pool]
+    reaproveitados = len(todos_nomes) - len(faltando)
+    log_callback(f"♻️ {reaproveitados} textos reaproveitados, {len(faltando)} a calcular.")
+    if faltando:
+        from sentence_transformers import SentenceTransformer
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        model = SentenceTransformer(model_name, device=device)
+        emb = model.encode(normalizar_lista(faltando), convert_to_tensor=True, show_progress_bar=True)
+        absorver(faltando, emb)
+
+    def montar(nomes):
+        return torch.stack([pool[n] for n in nomes]) if nomes else torch.empty(0)
+
+    materias_emb = montar(loader_novo.materias)
+    assuntos_emb = {m: montar(a) for m, a in loader_novo.assuntos_por_materia.items() if a}
+    fallback_emb = montar(loader_novo.lista_completa_fallback)
+
+    # 3. Regrava na ordem nova
+    assinatura_nova = assinatura_catalogo(loader_novo.materias, loader_novo.assuntos_por_materia)
+    if indice:
+        fallback_norm = normalizar_lista(loader_novo.lista_completa_fallback)
+        artefatos = {
+            "materias_embeddings": materias_emb,
+            "assuntos_embeddings": assuntos_emb,
+            "fallback_embeddings": fallback_emb,
+            "textos_normalizados": {
+                "materias": normalizar_lista(loader_novo.materias),
+                "assuntos": {m: normalizar_lista(l) for m, l in loader_novo.assuntos_por_materia.items()},
+                "fallback": fallback_norm,
+            },
+        }
+        salvar_indice(index_dir, artefatos, assinatura_nova, model_name, log_callback)
+        log_callback(f"✅ Índice pré-computado atualizado em {index_dir}")
+
+    if cache_ok:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for path, obj in ((MATERIAS_EMBEDDINGS_CACHE, materias_emb), (ASSUNTOS_EMBEDDINGS_CACHE, assuntos_emb), (FALLBACK_EMBEDDINGS_CACHE, fallback_emb)):
+            with open(path, "wb") as f:
+                pickle.dump(obj, f)
+        gravar_assinatura_embeddings(assinatura_nova, model_name)
+        log_callback(f"✅ Cache de embeddings atualizado em {CACHE_DIR}")
+
+    return {"reaproveitados": reaproveitados, "calculados": len(faltando)}
@@ -0,0 +1,162 @@
+# src/catalog_index.py
+"""
+Índice pré-computado do catálogo TEC (Matérias -> Assuntos).
+
+Gerado offline por `python data/gerar_lista_filtros.py indice` e lido pelo
+TextMatcher na inicialização. Assim o usuário final nunca precisa calcular
+os embeddings do catálogo na própria máquina.
+
+Para empacotar com o PyInstaller, inclua a pasta gerada:
+    --add-data "data/indice;data/indice"
+"""
+
+import os
+import json
+import pickle
+import hashlib
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Optional
+
+from data.data_loader import resource_path
+
+INDEX_DIR = resource_path("data/indice")
+MANIFEST_FILE = "manifest.json"
+VERSAO_INDICE = 1
+
+# chave do artefato -> nome do arquivo dentro da pasta do índice
+ARQUIVOS_INDICE = {
+    "materias_embeddings": "materias_embeddings.pkl",
+    "assuntos_embeddings": "assuntos_embeddings.pkl",
+    "fallback_embeddings": "fallback_embeddings.pkl",
+    "textos_normalizados": "textos_normalizados.json",
+}
+
+
+def assinatura_catalogo(lista_materias: List[str], dict_assuntos_por_materia: Dict[str, List[str]]) -> str:
+    """Hash estável do conteúdo do catálogo (ordem incluída, pois os embeddings são posicionais)."""
+    payload = json.dumps(
+        [lista_materias, [[m, dict_assuntos_por_materia.get(m, [])] for m in lista_materias]],
+        ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def hash_arquivo(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def construir_arvore(dict_assuntos_por_materia: Dict[str, List[str]], niveis_por_materia: Dict[str, List[int]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Reconstrói a hierarquia de assuntos de cada matéria a partir do campo 'nivel'.
+    Cada nó recebe o índice do pai dentro da própria matéria (None na raiz).
+    """
+    arvore = {}
+    for materia, assuntos in dict_assuntos_por_materia.items():
+        niveis = niveis_por_materia.get(materia, [0] * len(assuntos))
+        pilha = []  # (nivel, indice) dos ancestrais abertos
+        nos = []
+        for idx, (nome, nivel) in enumerate(zip(assuntos, niveis)):
+            while pilha and pilha[-1][0] >= nivel:
+                pilha.pop()
+            pai = pilha[-1][1] if pilha else None
+            nos.append({"nome": nome, "nivel": nivel, "pai": pai})
+            pilha.append((nivel, idx))
+        arvore[materia] = nos
+    return arvore
+
+
+def salvar_indice(out_dir: str, artefatos: Dict[str, Any], assinatura: str, model_name: str, log_callback: Callable[..., None]) -> Dict[str, Any]:
+    """Grava todos os artefatos e, por último, o manifesto com os hashes de cada arquivo."""
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Remove o manifesto antigo primeiro: um índice gravado pela metade nunca é considerado válido
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    arquivos = {}
+    for chave, nome_arquivo in ARQUIVOS_INDICE.items():
+        path = os.path.join(out_dir, nome_arquivo)
+        if nome_arquivo.endswith(".pkl"):
+            with open(path, "wb") as f:
+                pickle.dump(artefatos[chave], f)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(artefatos[chave], f, ensure_ascii=False)
+        arquivos[chave] = {"arquivo": nome_arquivo, "sha256": hash_arquivo(path)}
+        log_callback(f"   ✓ {nome_arquivo}")
+
+    fallback = artefatos["textos_normalizados"]["fallback"]
+    manifest = {
+        "versao_indice": VERSAO_INDICE,
+        "modelo": model_name,
+        "assinatura_catalogo": assinatura,
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "dimensao": int(artefatos["fallback_embeddings"].shape[-1]) if len(fallback) else 0,
+        "totais": {
+            "materias": len(artefatos["textos_normalizados"]["materias"]),
+            "assuntos": len(fallback),
+        },
+        "arquivos": arquivos,
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+    return manifest
+
+
+def carregar_manifesto(index_dir: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def carregar_indice(index_dir: str, assinatura: str, model_name: str, log_callback: Callable[..., None]) -> Optional[Dict[str, Any]]:
+    """
+    Retorna os artefatos do índice se ele existir e for compatível com o catálogo
+    e o modelo atuais. Qualquer divergência devolve None (o chamador recalcula).
+    """
+    try:
+        manifest = carregar_manifesto(index_dir)
+    except Exception as e:
+        log_callback(f"⚠️ Manifesto do índice ilegível: {e}")
+        return None
+    if manifest is None:
+        return None
+
+    if manifest.get("versao_indice") != VERSAO_INDICE:
+        log_callback("⚠️ Índice pré-computado de versão diferente. Ignorando.")
+        return None
+    if manifest.get("modelo") != model_name:
+        log_callback(f"⚠️ Índice gerado com outro modelo ({manifest.get('modelo')}). Ignorando.")
+        return None
+    if manifest.get("assinatura_catalogo") != assinatura:
+        log_callback("⚠️ Índice pré-computado desatualizado em relação ao catálogo. Ignorando.")
+        return None
+
+    artefatos = {"manifesto": manifest}
+    try:
+        for chave, info in manifest["arquivos"].items():
+            if chave not in ARQUIVOS_INDICE:
+                continue # Artefato de índices antigos que o matcher não usa mais
+            path = os.path.join(index_dir, info["arquivo"])
+            if hash_arquivo(path) != info["sha256"]:
+                log_callback(f"⚠️ Arquivo do índice corrompido: {info['arquivo']}. Ignorando índice.")
+                return None
+            if path.endswith(".pkl"):
+                with open(path, "rb") as f:
+                    artefatos[chave] = pickle.load(f)
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    artefatos[chave] = json.load(f)
+    except Exception as e:
+        log_callback(f"⚠️ Falha ao ler índice pré-computado: {e}")
+        return None
+
+    log_callback(f"⚡ Índice pré-computado carregado ({manifest['totais']['assuntos']} assuntos).")
+    return artefatos
@@ -0,0 +1,163 @@
+# src/evaluation.py
+"""
+Avaliação do matcher contra um conjunto rotulado (data/gold_set.json).
+
+Cada item do gold set é uma aula com os assuntos TEC esperados. As métricas
+usam o ranking por score devolvido pelo TextMatcher:
+  - precisão@k: acertos no top-k divididos por k (devolver menos que k não é premiado);
+  - recall@k:   fração dos esperados que aparece no top-k;
+  - MRR:        média de 1/posição do primeiro acerto;
+  - acerto@k:   fração de aulas com pelo menos um acerto no top-k;
+e a latência por consulta (p50/p95), para aceitar ou rejeitar otimizações com números.
+"""
+
+import json
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from data.data_loader import resource_path
+from src.cache_manager import CACHE_FILE
+from src.aula_preprocessing import PreprocessadorAulas
+
+GOLD_SET_FILE = resource_path("data/gold_set.json")
+METRICAS_GATE = ("precisao_k", "recall_k", "mrr", "acerto_k") # Métricas que não podem cair
+
+
+def carregar_gold_set(caminho: str = GOLD_SET_FILE) -> Dict[str, Any]:
+    with open(caminho, "r", encoding="utf-8") as f:
+        gold = json.load(f)
+    gold.setdefault("versao", 1)
+    gold.setdefault("itens", [])
+    return gold
+
+
+def salvar_gold_set(gold: Dict[str, Any], caminho: str = GOLD_SET_FILE):
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(gold, f, ensure_ascii=False, indent=2)
+
+
+def colher_do_cache(caminho_cache: str = CACHE_FILE, cursos: Optional[Iterable[str]] = None,
+                    termos_validos: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Converte as revisões salvas em matches_cache.json em itens do gold set.
+    Aulas sem termos são ignoradas (não há o que acertar); termos fora de
+    'termos_validos' (ex.: matérias inteiras ou assuntos removidos do catálogo) são descartados.
+    """
+    with open(caminho_cache, "r", encoding="utf-8") as f:
+        cache = json.load(f)
+    validos = set(termos_validos) if termos_validos is not None else None
+    cursos = set(cursos) if cursos else None
+
+    itens = []
+    for curso_id, aulas in cache.get("courses", {}).items():
+        if cursos and curso_id not in cursos:
+            continue
+        for aula, termos in (aulas or {}).items():
+            esperados = [t for t in termos if validos is None or t in validos]
+            if esperados:
+                itens.append({"aula": aula, "esperados": esperados, "materias": [], "fonte": f"cache:{curso_id}"})
+    return itens
+
+
+def mesclar_gold_set(gold: Dict[str, Any], novos: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
+    """Adiciona itens inéditos (pela aula); se algo entrou, incrementa a versão do gold set."""
+    existentes = {item["aula"] for item in gold["itens"]}
+    adicionados = 0
+    for item in novos:
+        if item["aula"] not in existentes:
+            gold["itens"].append(item)
+            existentes.add(item["aula"])
+            adicionados += 1
+    if adicionados:
+        gold["versao"] += 1
+    return gold, adicionados
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil pelo posto mais próximo: o menor valor com pelo menos p% dos valores até ele."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, max(0, math.ceil(p * len(ordenados) / 100) - 1))
+    return ordenados[k]
+
+
+def metricas_consulta(ranking: List[str], esperados: List[str], k: int) -> Dict[str, float]:
+    top = ranking[:k]
+    esperados_set = set(esperados)
+    acertos = [t for t in top if t in esperados_set]
+    rr = 0.0
+    for pos, termo in enumerate(ranking, 1):
+        if termo in esperados_set:
+            rr = 1.0 / pos
+            break
+    return {
+        "precisao_k": len(acertos) / k,
+        "recall_k": len(set(acertos)) / len(esperados_set) if esperados_set else 0.0,
+        "rr": rr,
+        "acerto_k": 1.0 if acertos else 0.0,
+    }
+
+
+def avaliar(matcher, itens: List[Dict[str, Any]], k: int = 3, modo: str = "hierarquico",
+            preprocessador: Optional[PreprocessadorAulas] = None, **parametros) -> Dict[str, Any]:
+    """
+    Roda o matcher aula a aula (para medir a latência de cada consulta) e agrega as métricas.
+    modo: 'hierarquico' ou 'filtrado' (usa as 'materias' do item; sem matérias, cai no hierárquico).
+    parametros: repassados ao método do matcher (thresholds, top_k_assuntos...).
+    """
+    preprocessador = preprocessador or PreprocessadorAulas()
+    detalhes = []
+    latencias = []
+
+    for item in itens:
+        consulta = preprocessador.limpar(item["aula"])[0]
+        inicio = time.perf_counter()
+        if modo == "filtrado" and item.get("materias"):
+            matches = matcher.find_best_matches_filtered_batch([consulta], target_materia=item["materias"], **parametros)[0]
+        else:
+            matches = matcher.find_best_matches_hierarquico_batch([consulta], **parametros)[0]
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+        latencias.append(latencia_ms)
+
+        # O matcher não garante ordem entre chunks: o ranking é sempre por score
+        ordenados = sorted(matches, key=lambda m: m["score"], reverse=True)
+        ranking = [m["termo"] for m in ordenados]
+        metricas = metricas_consulta(ranking, item["esperados"], k)
+        detalhes.append({
+            "aula": item["aula"],
+            "limpa": consulta,
+            "esperados": item["esperados"],
+            "encontrados": [{"termo": m["termo"], "score": round(m["score"], 4)} for m in ordenados[:k]],
+            "latencia_ms": round(latencia_ms, 2),
+            **metricas,
+        })
+
+    n = len(detalhes)
+    media = lambda chave: round(sum(d[chave] for d in detalhes) / n, 4) if n else 0.0
+    resumo = {
+        "n": n,
+        "k": k,
+        "modo": modo,
+        "parametros": parametros,
+        "precisao_k": media("precisao_k"),
+        "recall_k": media("recall_k"),
+        "mrr": media("rr"),
+        "acerto_k": media("acerto_k"),
+        "sem_match": sum(1 for d in detalhes if not d["encontrados"]),
+        "latencia_p50_ms": round(percentil(latencias, 50), 2),
+        "latencia_p95_ms": round(percentil(latencias, 95), 2),
+        "latencia_media_ms": round(sum(latencias) / n, 2) if n else 0.0,
+    }
+    return {"resumo": resumo, "detalhes": detalhes}
+
+
+def comparar_com_baseline(resumo: Dict[str, Any], baseline: Dict[str, Any], tolerancia: float = 0.0) -> List[str]:
+    """Lista as métricas de qualidade que caíram mais que 'tolerancia' (absoluta) em relação ao baseline."""
+    regressoes = []
+    for chave in METRICAS_GATE:
+        antes, depois = baseline.get(chave), resumo.get(chave)
+        if antes is not None and depois is not None and depois < antes - tolerancia:
+            regressoes.append(f"{chave}: {antes:.4f} -> {depois:.4f}")
+    return regressoes
@@ -0,0 +1,103 @@
+# src/gui/log_sink.py
+import os
+import queue
+import logging
+from logging.handlers import RotatingFileHandler
+
+LOG_DIR = "logs"
+LOG_FILE = os.path.join(LOG_DIR, "automacao.log")
+INTERVALO_DRENAGEM_MS = 100   # Frequência com que a fila é descarregada no widget
+MAX_MENSAGENS_POR_LOTE = 500  # Teto por ciclo, para não travar a GUI em rajadas enormes
+MAX_LINHAS_VISIVEIS = 5000    # Ring buffer do log_area (o histórico completo vai para o arquivo)
+ARQUIVO_MAX_BYTES = 5 * 1024 * 1024
+ARQUIVO_BACKUPS = 5
+
+
+class LogSink:
+    """
+    Destino único dos logs da GUI.
+
+    escrever() pode ser chamado de qualquer thread: só enfileira a mensagem e a
+    grava no arquivo rotativo. A thread do Tk drena a fila a cada
+    INTERVALO_DRENAGEM_MS com UM insert por lote e corta as linhas mais antigas
+    do widget acima de MAX_LINHAS_VISIVEIS.
+    """
+
+    def __init__(self, root, text_widget, log_dir: str = LOG_DIR):
+        self.root = root
+        self.text_widget = text_widget
+        self.fila = queue.SimpleQueue()
+        self._after_id = None
+
+        self.logger = logging.getLogger("automacao_tec")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            try:
+                os.makedirs(log_dir, exist_ok=True)
+                handler = RotatingFileHandler(
+                    os.path.join(log_dir, os.path.basename(LOG_FILE)),
+                    maxBytes=ARQUIVO_MAX_BYTES, backupCount=ARQUIVO_BACKUPS, encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s | %(message)s"))
+                self.logger.addHandler(handler)
+            except OSError as e:
+                # Sem arquivo, a GUI continua funcionando normalmente
+                self.fila.put(f"⚠️ Não foi possível abrir o arquivo de log: {e}")
+
+        self._agendar()
+
+    def escrever(self, msg: str):
+        """Thread-safe: nunca toca no Tk."""
+        self.fila.put(msg)
+        self.logger.info(msg)
+
+    def limpar(self):
+        self.text_widget.config(state="normal")
+        self.text_widget.delete("1.0", "end")
+        self.text_widget.config(state="disabled")
+
+    def parar(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        # Descarrega tudo o que ainda está na fila, lote a lote (sem o teto por ciclo)
+        while not self.fila.empty():
+            if not self._drenar(reagendar=False):
+                break
+        for handler in self.logger.handlers:
+            handler.flush()
+
+    def _agendar(self):
+        self._after_id = self.root.after(INTERVALO_DRENAGEM_MS, self._drenar)
+
+    def _drenar(self, reagendar: bool = True) -> bool:
+        """Insere até MAX_MENSAGENS_POR_LOTE mensagens. False se o widget já não existe."""
+        lote = []
+        try:
+            while len(lote) < MAX_MENSAGENS_POR_LOTE:
+                lote.append(self.fila.get_nowait())
+        except queue.Empty:
+            pass
+
+        if lote:
+            try:
+                # Só rola junto se o usuário já estava no fim (não "puxa" quem está lendo o histórico)
+                no_fim = self.text_widget.yview()[1] >= 0.999
+                self.text_widget.config(state="normal")
+                self.text_widget.insert("end", "\n".join(lote) + "\n")
+                excesso = int(self.text_widget.index("end-1c").split(".")[0]) - 1 - MAX_LINHAS_VISIVEIS
+                if excesso > 0:
+                    self.text_widget.delete("1.0", f"{excesso + 1}.0")
+                self.text_widget.config(state="disabled")
+                if no_fim:
+                    self.text_widget.see("end")
+            except Exception:
+                return False # Widget destruído (janela fechando)
+
+        if reagendar:
+            self._agendar()
+        return True
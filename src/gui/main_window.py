@@ -2,7 +2,6 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from ttkbootstrap.dialogs import Messagebox
-from ttkbootstrap.scrolled import ScrolledFrame
 from tkinter.scrolledtext import ScrolledText
 from tkinter import StringVar, VERTICAL, HORIZONTAL
 import threading
@@ -16,10 +15,17 @@ import re
 
 sys.path.append(os.getcwd())
 from data.data_loader import DataLoader
-from src.gui.review_window import ReviewWindow
+from src.gui.review_window import ReviewWindow, DEBOUNCE_BUSCA_MS
+from src.gui.virtual_list import ListaVirtual
+from src.search_index import IndiceBusca
+from src.gui.log_sink import LogSink
 from src.automation.orchestrator import Orchestrator
+from src.automation.browser_manager import BrowserManager
+from src.automation.tec_paralelo import MAX_ABAS
+from src.automation.tec_http import endpoints_verificados
 
 CONFIG_FILE = "user_settings.json"
+ALTURA_LINHA_MULTISELECT = 30 # Altura fixa de cada checkbox na lista virtual de matérias
 
 # Lista de Áreas (Carreiras) conforme site do TEC
 LISTA_AREAS_TEC = [
@@ -102,6 +108,17 @@ class App(ttk.Window):
         # Layout e Configurações
         self.create_layout()
         self.load_settings()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # Um navegador para a vida do app: abre em segundo plano enquanto o formulário é preenchido
+        self.navegador = BrowserManager(self.log, headless=False)
+        self.navegador.aquecer()
+
+    def _on_close(self):
+        # Descarrega o que ainda estiver na fila antes de fechar
+        self.navegador.parar()
+        self.log_sink.parar()
+        self.destroy()
 
     def _setup_scroll_system(self):
         """
@@ -278,6 +295,22 @@ class App(ttk.Window):
         for nivel, var in self.vars_escolaridade.items():
             ttk.Checkbutton(self.frame_escolaridade, text=nivel, variable=var, bootstyle="round-toggle").pack(side=LEFT, padx=5)
 
+        # Abas paralelas na criação dos cadernos (usa a sessão do TEC salva após o primeiro login)
+        ttk.Label(lbl_config, text="Abas paralelas no TEC:", font=("Helvetica", 9)).pack(anchor="w", pady=(5,0))
+        self.spin_abas = ttk.Spinbox(lbl_config, from_=1, to=MAX_ABAS, width=5, state="readonly")
+        self.spin_abas.set(1)
+        self.spin_abas.pack(anchor="w", pady=5)
+
+        self.var_reaproveitar = ttk.BooleanVar(value=True)
+        ttk.Checkbutton(lbl_config, text="Aplicar filtros comuns uma só vez", variable=self.var_reaproveitar,
+                        bootstyle="round-toggle").pack(anchor="w", pady=5)
+
+        # Só aparece com data/tec_endpoints.json conferido contra uma gravação real do TEC
+        self.var_tec_http = ttk.BooleanVar(value=False)
+        if endpoints_verificados():
+            ttk.Checkbutton(lbl_config, text="Criar cadernos via HTTP (experimental)", variable=self.var_tec_http,
+                            bootstyle="round-toggle").pack(anchor="w", pady=5)
+
         # --- 4. ÁREA DE AÇÃO ---
         frame_actions = ttk.Frame(control_panel, padding=(0, 10))
         frame_actions.pack(fill=X, pady=10)
@@ -285,6 +318,11 @@ class App(ttk.Window):
         self.btn_review = ttk.Button(frame_actions, text="🔍 1. Revisar Matches (IA)", bootstyle="info", command=self.start_review)
         self.btn_review.pack(fill=X, pady=5)
 
+        # Com revisão salva, relê o BO e manda à IA só as aulas novas/alteradas
+        self.var_atualizar = ttk.BooleanVar(value=False)
+        ttk.Checkbutton(frame_actions, text="Buscar aulas novas no BO (mantém a revisão)", variable=self.var_atualizar,
+                        bootstyle="round-toggle").pack(anchor="w", pady=(0, 5))
+
         self.btn_start = ttk.Button(frame_actions, text="▶ 2. INICIAR AUTOMAÇÃO", bootstyle="success", command=self.start_thread)
         self.btn_start.pack(fill=X, pady=5)
 
@@ -313,6 +351,9 @@ class App(ttk.Window):
         self.log_area = ScrolledText(log_panel, state="disabled", height=40)
         self.log_area.pack(fill=BOTH, expand=True)
 
+        # Fila drenada em lotes + arquivo rotativo em logs/
+        self.log_sink = LogSink(self, self.log_area)
+
     def open_materia_multiselect(self):
         """
         Abre janela modal para seleção múltipla com filtro e checkbox.
@@ -339,42 +380,57 @@ class App(ttk.Window):
         list_container = ttk.Frame(top, padding=10)
         list_container.pack(fill=BOTH, expand=True)
 
-        sf = ScrolledFrame(list_container, autohide=True)
-        sf.pack(fill=BOTH, expand=True)
-
-        # Variáveis de controle
-        check_vars = {}     # { "Nome da Matéria": IntVar }
-        check_widgets = []  # Lista de widgets checkbox criados
-
-        # Recupera seleção atual
+        # Recupera seleção atual (o estado vive num set, não nos widgets)
         current_selection = self.materia_selecionada if isinstance(self.materia_selecionada, list) else []
+        selecionadas = set(m for m in current_selection if m in todas_materias)
+
+        # Índice accent-insensitive compartilhado com o diálogo de revisão
+        indice = IndiceBusca(todas_materias)
+        visiveis = list(todas_materias) # Resultado do filtro atual (o que a lista mostra)
+
+        def criar_linha(parent):
+            row = ttk.Frame(parent)
+            row.var = ttk.IntVar(value=0)
+            row.materia = None
+            def alternar():
+                if row.var.get() == 1:
+                    selecionadas.add(row.materia)
+                else:
+                    selecionadas.discard(row.materia)
+            row.chk = ttk.Checkbutton(
+                row,
+                variable=row.var,
+                bootstyle="primary-round-toggle",
+                command=alternar
+            )
+            row.chk.pack(side=LEFT, padx=5)
+            return row
+
+        def preencher_linha(row, idx):
+            row.materia = visiveis[idx]
+            row.chk.configure(text=row.materia)
+            row.var.set(1 if row.materia in selecionadas else 0)
+
+        lista = ListaVirtual(list_container, total=len(visiveis), criar_linha=criar_linha,
+                             preencher_linha=preencher_linha, altura_linha=ALTURA_LINHA_MULTISELECT)
+        lista.pack(fill=BOTH, expand=True)
 
         def populate_list(filter_text=""):
-            # 1. Limpa a visualização anterior
-            for widget in check_widgets:
-                widget.destroy()
-            check_widgets.clear()
-            
-            filter_text = filter_text.lower()
-            
-            # 2. Cria os checkboxes filtrados
-            for mat in todas_materias:
-                if filter_text in mat.lower():
-                    if mat not in check_vars:
-                        is_selected = 1 if mat in current_selection else 0
-                        check_vars[mat] = ttk.IntVar(value=is_selected)
-                    
-                    chk = ttk.Checkbutton(
-                        sf, 
-                        text=mat, 
-                        variable=check_vars[mat],
-                        bootstyle="primary-round-toggle"
-                    )
-                    chk.pack(anchor=W, pady=2, padx=5)
-                    check_widgets.append(chk)
-
-        search_var.trace("w", lambda *args: populate_list(search_var.get()))
-        populate_list()
+            if filter_text.strip():
+                visiveis[:] = indice.buscar(filter_text, limite=len(todas_materias))
+            else:
+                visiveis[:] = todas_materias
+            lista.atualizar(total=len(visiveis))
+            lista.rolar_para(0)
+
+        # Debounce: só filtra quando o usuário para de digitar
+        pendente = {"id": None}
+        def on_search_change(*args):
+            if pendente["id"] is not None:
+                top.after_cancel(pendente["id"])
+            pendente["id"] = top.after(DEBOUNCE_BUSCA_MS, lambda: populate_list(search_var.get()))
+
+        search_var.trace_add("write", on_search_change)
 
         # --- RODAPÉ ---
         footer_frame = ttk.Frame(top, padding=15, bootstyle="light")
@@ -382,7 +438,7 @@ class App(ttk.Window):
 
         def confirm_selection():
             # Coleta tudo que está marcado
-            selected_items = [m for m, var in check_vars.items() if var.get() == 1]
+            selected_items = [m for m in todas_materias if m in selecionadas]
             
             self.materia_selecionada = selected_items
             
@@ -400,9 +456,7 @@ class App(ttk.Window):
 
     def clear_logs(self):
         """Limpa a área de logs"""
-        self.log_area.config(state="normal")
-        self.log_area.delete("1.0", "end")
-        self.log_area.config(state="disabled")
+        self.log_sink.limpar()
 
     def start_review(self):
         if not self.entry_url.get().strip():
@@ -417,6 +471,7 @@ class App(ttk.Window):
             return
 
         config = self._get_config_dict()
+        atualizar = self.var_atualizar.get()
         self.btn_review.config(state="disabled")
         
         # Display visual amigável (truncado se for muito longo)
@@ -427,8 +482,8 @@ class App(ttk.Window):
         
         def review_worker():
             try:
-                orc = Orchestrator(config, self.log, headless=False)
-                data = orc.fetch_and_preview_matches()
+                orc = Orchestrator(config, self.log, headless=False, navegador=self.navegador)
+                data = orc.fetch_and_preview_matches(atualizar=atualizar)
                 # Passa a lista completa para o método de abertura de janela
                 self.after(0, lambda: self._open_review_window(data, orc.cache_manager, orc.data_loader, self.materia_selecionada))
             except Exception as e:
@@ -461,10 +516,9 @@ class App(ttk.Window):
         filtros_focados = sorted(list(set(filtros_focados)))
 
         def on_save_review(reviewed_data):
-            count = 0
-            for aula, filtros in reviewed_data.items():
-                cache_mgr.set(aula, filtros)
-                count += 1
+            # A revisão traz o curso inteiro: aulas que saíram do BO deixam o cache
+            cache_mgr.substituir_curso(reviewed_data)
+            count = len(reviewed_data)
             cache_mgr.save_cache()
             self.log(f"✅ {count} aulas salvas no cache!")
             Messagebox.show_info("Revisão Salva! Clique em 'INICIAR AUTOMAÇÃO' para gerar os cadernos.", "Sucesso")
@@ -478,13 +532,8 @@ class App(ttk.Window):
         setattr(self, f"entry_{attr_name}", entry)
 
     def log(self, msg):
-        self.after(0, lambda: self._log_impl(msg))
-
-    def _log_impl(self, msg):
-        self.log_area.config(state="normal")
-        self.log_area.insert("end", msg + "\n")
-        self.log_area.see("end")
-        self.log_area.config(state="disabled")
+        # Chamado de threads de automação: só enfileira (o LogSink drena na thread do Tk)
+        self.log_sink.escrever(msg)
 
     def save_settings(self):
         settings = self._get_config_dict()
@@ -543,6 +592,12 @@ class App(ttk.Window):
                     if key in self.vars_escolaridade: self.vars_escolaridade[key].set(val)
             if "area_carreira" in settings and settings["area_carreira"] in LISTA_AREAS_TEC:
                 self.combo_area.set(settings["area_carreira"])
+            if settings.get("abas_paralelas"):
+                self.spin_abas.set(min(int(settings["abas_paralelas"]), MAX_ABAS))
+            if "reaproveitar_filtros" in settings:
+                self.var_reaproveitar.set(bool(settings["reaproveitar_filtros"]))
+            if "tec_http" in settings and endpoints_verificados():
+                self.var_tec_http.set(bool(settings["tec_http"]))
                 
         except: pass
 
@@ -566,7 +621,10 @@ class App(ttk.Window):
             "escolaridade": ",".join(escolaridades_selecionadas),
             "escolaridades": escolaridades_selecionadas,
             "materia_selecionada": self.materia_selecionada, # Retorna a LISTA
-            "area_carreira": self.combo_area.get()
+            "area_carreira": self.combo_area.get(),
+            "abas_paralelas": int(self.spin_abas.get() or 1),
+            "reaproveitar_filtros": self.var_reaproveitar.get(),
+            "tec_http": self.var_tec_http.get()
         }
 
     def start_thread(self):
@@ -593,7 +651,7 @@ class App(ttk.Window):
             self.log("🚀 FASE 2: INICIANDO GERAÇÃO NO TEC")
             self.log("="*40)
             
-            orc = Orchestrator(config, self.log, headless=False)
+            orc = Orchestrator(config, self.log, headless=False, navegador=self.navegador)
             
             result = orc.run_tec_automation()
             if isinstance(result, tuple):
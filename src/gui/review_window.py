@@ -4,8 +4,26 @@ from ttkbootstrap.constants import *
 from ttkbootstrap.dialogs import Messagebox
 from typing import List, Dict, Callable
 import traceback
+import math
+from src.search_index import IndiceBusca
+from src.gui.virtual_list import ListaVirtual
+
+DEBOUNCE_BUSCA_MS = 120 # Espera entre teclas antes de consultar o índice
+
+# Geometria fixa dos cards (permite calcular a altura de cada aula sem criar widgets)
+CHIPS_POR_LINHA = 2
+ALTURA_BASE_LINHA = 76   # Margens + título do Labelframe + padding
+ALTURA_LINHA_CHIPS = 40  # Uma linha de chips
+MAX_CHARS_CHIP = 70
+MAX_CHARS_TITULO = 140
 
 class ReviewWindow(ttk.Toplevel):
+    """
+    Janela de revisão. As edições vivem em self.modelo (lista simples de dicts);
+    só as aulas visíveis viram widgets (ListaVirtual), então abrir um curso de
+    500 aulas custa o mesmo que abrir um de 10.
+    """
+
     def __init__(self, parent, data: List[Dict], all_filters: List[str], current_materia_filters: List[str], on_save: Callable):
         super().__init__(title="Revisão de Matches - Human in the Loop", master=parent)
         self.geometry("1100x850") # Ligeiramente maior para melhor respiro
@@ -13,9 +31,20 @@ class ReviewWindow(ttk.Toplevel):
         self.data = data 
         self.all_filters = sorted(list(set(all_filters))) if all_filters else []
         self.current_materia_filters = sorted(list(set(current_materia_filters))) if current_materia_filters else self.all_filters
+        self._indice_busca = None # Construído na primeira abertura do diálogo de adição
 
         self.on_save_callback = on_save
-        self.result_map = {} 
+
+        # Modelo de dados: [{'aula': str, 'matches': [{'termo', 'score', 'origem'}], 'nova': bool}] sem termos repetidos
+        # 'nova': aula que apareceu/mudou no BO desde a última revisão (destacada)
+        self.modelo = []
+        for item in data:
+            matches = []
+            for m in item['matches']:
+                if m['termo'] not in [x['termo'] for x in matches]:
+                    matches.append(m)
+            self.modelo.append({'aula': item['aula'], 'matches': matches, 'nova': item.get('nova', False)})
+        self.total_novas = sum(1 for item in self.modelo if item['nova'])
 
         self.create_ui()
         self.focus_force()
@@ -30,7 +59,10 @@ class ReviewWindow(ttk.Toplevel):
         title_frame.pack(side=LEFT)
         
         ttk.Label(title_frame, text="Revisão de Assuntos", font=("Segoe UI", 16, "bold"), bootstyle="inverse-primary").pack(anchor=W)
-        ttk.Label(title_frame, text=f"Total de Aulas: {len(self.data)}", font=("Segoe UI", 10), bootstyle="inverse-primary").pack(anchor=W)
+        total = f"Total de Aulas: {len(self.modelo)}"
+        if self.total_novas:
+            total += f" ({self.total_novas} nova(s) desde a última revisão)"
+        ttk.Label(title_frame, text=total, font=("Segoe UI", 10), bootstyle="inverse-primary").pack(anchor=W)
 
         legend = ttk.Frame(header, bootstyle="primary")
         legend.pack(side=RIGHT, anchor="center")
@@ -40,6 +72,8 @@ class ReviewWindow(ttk.Toplevel):
         self._add_badge(legend, "IA (Alta Confiança)", "success")
         self._add_badge(legend, "IA (Baixa Confiança)", "warning")
         self._add_badge(legend, "Manual / Cache", "info")
+        if self.total_novas:
+            self._add_badge(legend, "🆕 Aula Nova", "danger")
 
         # --- 2. ÁREA DE CONTEÚDO ---
         # Container principal com padding para não colar nas bordas da janela
@@ -50,39 +84,15 @@ class ReviewWindow(ttk.Toplevel):
         scroll_container = ttk.Labelframe(container, text=" Lista de Aulas ", bootstyle="secondary", padding=2)
         scroll_container.pack(fill=BOTH, expand=True)
 
-        scroll_container.grid_rowconfigure(0, weight=1)
-        scroll_container.grid_columnconfigure(0, weight=1)
-
-        self.canvas = ttk.Canvas(scroll_container, highlightthickness=0)
-        self.canvas.grid(row=0, column=0, sticky="nsew")
-
-        # Barras de Rolagem com estilo 'round'
-        vsb = ttk.Scrollbar(scroll_container, orient=VERTICAL, command=self.canvas.yview, bootstyle="round")
-        vsb.grid(row=0, column=1, sticky="ns", padx=(2,0))
-        
-        hsb = ttk.Scrollbar(scroll_container, orient=HORIZONTAL, command=self.canvas.xview, bootstyle="round")
-        hsb.grid(row=1, column=0, sticky="ew", pady=(2,0))
-
-        self.canvas.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-        self.scroll_frame = ttk.Frame(self.canvas)
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.scroll_frame, anchor="nw")
-
-        # Eventos
-        self.scroll_frame.bind("<Configure>", self._on_frame_configure)
-        self.canvas.bind("<Configure>", self._on_canvas_configure)
-        
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
-        self.canvas.bind_all("<Shift-MouseWheel>", self._on_shift_mousewheel)
-        self.canvas.bind_all("<Button-4>", self._on_mousewheel)
-        self.canvas.bind_all("<Button-5>", self._on_mousewheel)
-
-        # Criação das Linhas
-        # Adicionei um espaçador inicial
-        ttk.Frame(self.scroll_frame, height=10).pack()
-        for i, item in enumerate(self.data):
-            self._create_row(self.scroll_frame, i, item)
-        ttk.Frame(self.scroll_frame, height=10).pack()
+        # Lista virtualizada: só as linhas visíveis são materializadas e recicladas ao rolar
+        self.lista = ListaVirtual(
+            scroll_container,
+            total=len(self.modelo),
+            criar_linha=self._criar_linha,
+            preencher_linha=self._preencher_linha,
+            altura_linha=self._altura_linha
+        )
+        self.lista.pack(fill=BOTH, expand=True)
 
         # --- 3. FOOTER ---
         # Separador visual antes do footer
@@ -95,32 +105,6 @@ class ReviewWindow(ttk.Toplevel):
         ttk.Button(footer, text="SALVAR E FECHAR", bootstyle="success", width=20, command=self.save_and_close).pack(side=RIGHT, padx=10)
         ttk.Button(footer, text="Cancelar", bootstyle="danger-outline", width=15, command=self.destroy).pack(side=RIGHT)
 
-    # --- Funções de Controle do Canvas/Scroll (MANTIDAS) ---
-    def _on_frame_configure(self, event):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-    def _on_canvas_configure(self, event):
-        min_width = self.scroll_frame.winfo_reqwidth()
-        if event.width >= min_width:
-            self.canvas.itemconfig(self.canvas_window, width=event.width)
-        else:
-            self.canvas.itemconfig(self.canvas_window, width=min_width)
-
-    def _on_mousewheel(self, event):
-        if self.canvas.winfo_exists():
-             if self.canvas.bbox("all")[3] > self.canvas.winfo_height():
-                if event.num == 5 or event.delta == -120:
-                    self.canvas.yview_scroll(1, "units")
-                elif event.num == 4 or event.delta == 120:
-                    self.canvas.yview_scroll(-1, "units")
-
-    def _on_shift_mousewheel(self, event):
-        if self.canvas.winfo_exists():
-            if event.num == 5 or event.delta == -120:
-                self.canvas.xview_scroll(1, "units")
-            elif event.num == 4 or event.delta == 120:
-                self.canvas.xview_scroll(-1, "units")
-
     # --- Lógica Visual Melhorada ---
     def _add_badge(self, parent, text, style):
         # Badge visualmente mais agradável (pílula)
@@ -128,21 +112,22 @@ class ReviewWindow(ttk.Toplevel):
         frame.pack(side="left", padx=5)
         ttk.Label(frame, text=text, bootstyle=f"inverse-{style}", font=("Segoe UI", 8, "bold")).pack()
 
-    def _create_row(self, parent, idx, item):
-        # Card da linha com borda 'info' para destaque sutil
-        row_frame = ttk.Labelframe(
-            parent, 
-            text=f" Aula: {item['aula']} ", 
-            padding=(15, 10), 
-            bootstyle="info" 
-        )
-        row_frame.pack(fill=X, pady=8, padx=10) # Mais espaçamento vertical entre cards
-        
-        container = ttk.Frame(row_frame)
-        container.pack(fill=X)
+    def _altura_linha(self, idx):
+        linhas_chips = max(1, math.ceil(len(self.modelo[idx]['matches']) / CHIPS_POR_LINHA))
+        return ALTURA_BASE_LINHA + linhas_chips * ALTURA_LINHA_CHIPS
+
+    def _criar_linha(self, parent):
+        """Cria um card de aula vazio; o conteúdo é ligado depois por _preencher_linha."""
+        # Frame externo faz o papel do antigo pack(pady=8, padx=10) entre os cards
+        outer = ttk.Frame(parent, padding=(10, 8))
+        card = ttk.Labelframe(outer, padding=(15, 10), bootstyle="info")
+        card.pack(fill=BOTH, expand=True)
+
+        container = ttk.Frame(card)
+        container.pack(fill=BOTH, expand=True)
         
         tags_frame = ttk.Frame(container)
-        tags_frame.pack(side="left", fill=X, expand=True)
+        tags_frame.pack(side="left", fill=BOTH, expand=True)
         
         # Botão de adicionar mais sutil e alinhado
         btn_add = ttk.Button(
@@ -150,20 +135,56 @@ class ReviewWindow(ttk.Toplevel):
             text="+ Adicionar Assunto", 
             bootstyle="link", 
             cursor="hand2",
-            command=lambda f=tags_frame, a=item['aula']: self.add_filter_dialog(f, a)
+            command=lambda: self.add_filter_dialog(outer.idx)
         )
         btn_add.pack(side="right", anchor="center")
 
-        self.result_map[item['aula']] = []
-        
-        # Se não houver matches, mostrar um texto explicativo
-        if not item['matches']:
-            ttk.Label(tags_frame, text="Nenhum assunto identificado.", bootstyle="secondary", font=("Segoe UI", 9, "italic")).pack(side=LEFT)
+        outer.idx = None
+        outer.card = card
+        outer.tags_frame = tags_frame
+        outer.lbl_vazio = ttk.Label(tags_frame, text="Nenhum assunto identificado.", bootstyle="secondary", font=("Segoe UI", 9, "italic"))
+        outer.chips = []
+        return outer
 
-        for match in item['matches']:
-            self._add_tag_widget(tags_frame, item['aula'], match)
+    def _criar_chip(self, row):
+        # Tag estilo "Chip" / "Pill"
+        # Usando Frame colorido com padding interno maior
+        chip = ttk.Frame(row.tags_frame, padding=(10, 5))
+        chip.lbl = ttk.Label(chip, font=("Segoe UI", 9))
+        chip.lbl.pack(side="left", padx=(0, 5))
+        # Botão de fechar (X) com cursor de mão e fonte maior
+        chip.btn_del = ttk.Label(chip, text="×", font=("Arial", 12, "bold"), cursor="hand2")
+        chip.btn_del.pack(side="right")
+        chip.btn_del.bind("<Button-1>", lambda e: self._remover_termo(row.idx, chip.termo))
+        chip.termo = None
+        return chip
 
-    def _add_tag_widget(self, parent, aula_key, match_data):
+    def _preencher_linha(self, row, idx):
+        item = self.modelo[idx]
+        row.idx = idx
+        titulo = item['aula'] if len(item['aula']) <= MAX_CHARS_TITULO else item['aula'][:MAX_CHARS_TITULO - 3] + "..."
+        if item['nova']:
+            row.card.configure(text=f" 🆕 Aula: {titulo} ", bootstyle="danger")
+        else:
+            row.card.configure(text=f" Aula: {titulo} ", bootstyle="info")
+
+        matches = item['matches']
+        if matches:
+            row.lbl_vazio.grid_remove()
+        else:
+            row.lbl_vazio.grid(row=0, column=0, sticky=W)
+
+        # Reaproveita os chips já criados para esta linha; cria só o que faltar
+        while len(row.chips) < len(matches):
+            row.chips.append(self._criar_chip(row))
+        for i, chip in enumerate(row.chips):
+            if i < len(matches):
+                self._configurar_chip(chip, matches[i])
+                chip.grid(row=i // CHIPS_POR_LINHA, column=i % CHIPS_POR_LINHA, sticky=W, padx=4, pady=4)
+            else:
+                chip.grid_remove()
+
+    def _configurar_chip(self, chip, match_data):
         score = match_data.get('score', 0)
         origem = match_data.get('origem', 'IA')
         
@@ -175,35 +196,27 @@ class ReviewWindow(ttk.Toplevel):
             style = "warning"
             
         term = match_data['termo']
-        
-        # Tag estilo "Chip" / "Pill"
-        # Usando Frame colorido com padding interno maior
-        tag = ttk.Frame(parent, bootstyle=style, padding=(10, 5)) 
-        tag.pack(side="left", padx=4, pady=4)
-        
-        txt = f"{term} ({int(score*100)}%)" if score > 0 else term
-        
-        # Texto da tag
-        ttk.Label(tag, text=txt, bootstyle=f"inverse-{style}", font=("Segoe UI", 9)).pack(side="left", padx=(0, 5))
-        
-        # Separador vertical sutil (opcional, aqui feito com padding)
-        
-        # Botão de fechar (X) com cursor de mão e fonte maior
-        btn_del = ttk.Label(tag, text="×", bootstyle=f"inverse-{style}", font=("Arial", 12, "bold"), cursor="hand2")
-        btn_del.pack(side="right")
-        
-        def remove_tag(e):
-            tag.destroy()
-            self.result_map[aula_key] = [m for m in self.result_map[aula_key] if m['termo'] != term]
-            
-        btn_del.bind("<Button-1>", remove_tag)
-        # Permite clicar no frame inteiro para deletar se quiser (opcional, removi para evitar clicks acidentais)
-        
-        current_terms = [x['termo'] for x in self.result_map[aula_key]]
-        if term not in current_terms:
-            self.result_map[aula_key].append(match_data)
+        exibido = term if len(term) <= MAX_CHARS_CHIP else term[:MAX_CHARS_CHIP - 3] + "..."
+        txt = f"{exibido} ({int(score*100)}%)" if score > 0 else exibido
+
+        chip.termo = term
+        chip.configure(bootstyle=style)
+        chip.lbl.configure(text=txt, bootstyle=f"inverse-{style}")
+        chip.btn_del.configure(bootstyle=f"inverse-{style}")
+
+    def _remover_termo(self, idx, termo):
+        item = self.modelo[idx]
+        item['matches'] = [m for m in item['matches'] if m['termo'] != termo]
+        self.lista.atualizar_item(idx)
 
-    def add_filter_dialog(self, parent_tags, aula_key):
+    def _adicionar_termo(self, idx, match_data):
+        item = self.modelo[idx]
+        if match_data['termo'] not in [m['termo'] for m in item['matches']]:
+            item['matches'].append(match_data)
+            self.lista.atualizar_item(idx)
+
+    def add_filter_dialog(self, idx):
+        aula_key = self.modelo[idx]['aula']
         top = ttk.Toplevel(title="Adicionar Filtro", master=self)
         top.geometry("600x300")
         
@@ -222,14 +235,25 @@ class ReviewWindow(ttk.Toplevel):
         cb = ttk.Combobox(content, values=self.current_materia_filters, height=10, font=("Segoe UI", 10))
         cb.pack(fill=X, pady=(0, 20))
         
-        def on_type(event):
+        if self._indice_busca is None:
+            # Assuntos da(s) matéria(s) selecionada(s) aparecem primeiro nos resultados
+            self._indice_busca = IndiceBusca(self.all_filters, prioritarios=self.current_materia_filters)
+
+        pendente = {"id": None}
+
+        def atualizar_sugestoes():
+            pendente["id"] = None
             typed = cb.get()
-            if typed == '':
+            if typed.strip() == '':
                 cb['values'] = self.current_materia_filters
             else:
-                typed_lower = typed.lower()
-                matches = [f for f in self.all_filters if typed_lower in f.lower()][:50]
-                cb['values'] = matches
+                cb['values'] = self._indice_busca.buscar(typed, limite=50)
+
+        def on_type(event):
+            # Debounce: só consulta quando o usuário dá uma pausa na digitação
+            if pendente["id"] is not None:
+                cb.after_cancel(pendente["id"])
+            pendente["id"] = cb.after(DEBOUNCE_BUSCA_MS, atualizar_sugestoes)
 
         cb.bind('<KeyRelease>', on_type)
 
@@ -237,7 +261,7 @@ class ReviewWindow(ttk.Toplevel):
             val = cb.get()
             if val:
                 match_data = {'termo': val, 'score': 1.0, 'origem': 'Manual'}
-                self._add_tag_widget(parent_tags, aula_key, match_data)
+                self._adicionar_termo(idx, match_data)
                 top.destroy()
         
         btn_frame = ttk.Frame(content)
@@ -251,8 +275,8 @@ class ReviewWindow(ttk.Toplevel):
     def save_and_close(self):
         try:
             final_data = {}
-            for aula, matches in self.result_map.items():
-                final_data[aula] = [m['termo'] for m in matches]
+            for item in self.modelo:
+                final_data[item['aula']] = [m['termo'] for m in item['matches']]
             
             self.destroy()
             self.on_save_callback(final_data)
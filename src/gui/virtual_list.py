@@ -0,0 +1,144 @@
+# src/gui/virtual_list.py
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from tkinter import VERTICAL
+from bisect import bisect_right
+from typing import Callable, Dict, List, Union
+
+
+class ListaVirtual(ttk.Frame):
+    """
+    Lista rolável que só cria widgets para as linhas VISÍVEIS.
+
+    Os dados ficam num modelo externo; a lista só conhece o total de itens e a
+    altura de cada um. Ao rolar, as linhas que saem da tela voltam para um pool
+    e são religadas (preencher_linha) aos índices que entram. O custo de abrir
+    é o mesmo para 10 ou 1000 itens.
+
+    criar_linha(parent) -> widget       cria uma linha "vazia" (chamado só quando o pool precisa crescer)
+    preencher_linha(widget, idx)        liga a linha ao item idx do modelo
+    altura_linha: int ou idx -> int     altura em pixels de cada item
+    """
+
+    def __init__(self, parent, total: int, criar_linha: Callable, preencher_linha: Callable,
+                 altura_linha: Union[int, Callable[[int], int]], **kwargs):
+        super().__init__(parent, **kwargs)
+        self.criar_linha = criar_linha
+        self.preencher_linha = preencher_linha
+        self.altura_linha = altura_linha if callable(altura_linha) else (lambda idx, h=altura_linha: h)
+        self.total = total
+
+        # Tag própria para rotear a rodinha do mouse de qualquer widget da lista
+        self.tag_rolagem = f"ListaVirtual{id(self)}"
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.canvas = ttk.Canvas(self, highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        vsb = ttk.Scrollbar(self, orient=VERTICAL, command=self._on_scrollbar, bootstyle="round")
+        vsb.grid(row=0, column=1, sticky="ns", padx=(2, 0))
+        self.scrollbar = vsb
+        self.canvas.configure(yscrollcommand=self._on_yscroll, yscrollincrement=20)
+
+        self._offsets: List[int] = [0] # offsets[i] = topo do item i; offsets[-1] = altura total
+        self._visiveis: Dict[int, tuple] = {} # idx -> (widget, item_canvas)
+        self._livres: List[tuple] = []
+
+        self.canvas.bind("<Configure>", lambda e: self._renderizar())
+        self.registrar_rolagem(self.canvas)
+        self.bind_class(self.tag_rolagem, "<MouseWheel>", self._on_mousewheel)
+        self.bind_class(self.tag_rolagem, "<Button-4>", self._on_mousewheel)
+        self.bind_class(self.tag_rolagem, "<Button-5>", self._on_mousewheel)
+
+        self._recalcular_offsets()
+
+    # --- API ---
+    def atualizar(self, total: int = None):
+        """Chame após mudar o modelo (itens adicionados/removidos ou alturas alteradas)."""
+        if total is not None:
+            self.total = total
+        self._recalcular_offsets()
+        for idx in list(self._visiveis):
+            self._liberar(idx)
+        self._renderizar()
+
+    def atualizar_item(self, idx: int):
+        """Re-preenche um único item (mesma altura ou não) sem recriar as outras linhas."""
+        altura_antiga = self._offsets[idx + 1] - self._offsets[idx]
+        if self.altura_linha(idx) != altura_antiga:
+            self.atualizar()
+        elif idx in self._visiveis:
+            self.preencher_linha(self._visiveis[idx][0], idx)
+            self.registrar_rolagem(self._visiveis[idx][0])
+
+    def rolar_para(self, idx: int):
+        if self.total and self._offsets[-1]:
+            self.canvas.yview_moveto(self._offsets[idx] / self._offsets[-1])
+
+    def registrar_rolagem(self, widget):
+        """Faz a rodinha do mouse sobre 'widget' (e filhos) rolar esta lista."""
+        if self.tag_rolagem not in widget.bindtags():
+            widget.bindtags((self.tag_rolagem,) + widget.bindtags())
+        for filho in widget.winfo_children():
+            self.registrar_rolagem(filho)
+
+    # --- Internos ---
+    def _recalcular_offsets(self):
+        offsets = [0]
+        for i in range(self.total):
+            offsets.append(offsets[-1] + self.altura_linha(i))
+        self._offsets = offsets
+        self.canvas.configure(scrollregion=(0, 0, 0, offsets[-1]))
+
+    def _liberar(self, idx):
+        widget, item = self._visiveis.pop(idx)
+        self.canvas.coords(item, 0, -10000) # Fora da área rolável até ser reutilizada
+        self._livres.append((widget, item))
+
+    def _obter_linha(self):
+        if self._livres:
+            return self._livres.pop()
+        widget = self.criar_linha(self.canvas)
+        item = self.canvas.create_window(0, 0, window=widget, anchor="nw")
+        return widget, item
+
+    def _renderizar(self):
+        if not self.winfo_exists():
+            return
+        altura_visivel = self.canvas.winfo_height()
+        largura = self.canvas.winfo_width()
+        topo = self.canvas.canvasy(0)
+        primeiro = max(0, bisect_right(self._offsets, topo) - 1)
+        ultimo = min(self.total - 1, bisect_right(self._offsets, topo + altura_visivel) - 1)
+        desejados = set(range(primeiro, ultimo + 1)) if self.total else set()
+
+        for idx in [i for i in self._visiveis if i not in desejados]:
+            self._liberar(idx)
+
+        for idx in sorted(desejados - self._visiveis.keys()):
+            widget, item = self._obter_linha()
+            self.preencher_linha(widget, idx)
+            self.registrar_rolagem(widget)
+            self.canvas.coords(item, 0, self._offsets[idx])
+            self.canvas.itemconfigure(item, width=largura,
+                                      height=self._offsets[idx + 1] - self._offsets[idx])
+            self._visiveis[idx] = (widget, item)
+
+        # Redimensionamento horizontal da janela
+        for widget, item in self._visiveis.values():
+            self.canvas.itemconfigure(item, width=largura)
+
+    def _on_yscroll(self, primeiro, ultimo):
+        self.scrollbar.set(primeiro, ultimo)
+        self._renderizar()
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+
+    def _on_mousewheel(self, event):
+        if self._offsets[-1] > self.canvas.winfo_height():
+            if event.num == 5 or event.delta < 0:
+                self.canvas.yview_scroll(1, "units")
+            elif event.num == 4 or event.delta > 0:
+                self.canvas.yview_scroll(-1, "units")
+        return "break" # Não deixa a janela principal rolar junto
@@ -1,50 +1,119 @@
 import torch
 import os
+import json
 import pickle
-import re
-import unicodedata
+import hashlib
+import threading
 from sentence_transformers import SentenceTransformer, util
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Union, Optional
+from src.catalog_index import (
+    INDEX_DIR, assinatura_catalogo, carregar_indice, salvar_indice
+)
+from src.text_normalization import normalizar_texto, normalizar_lista
+from src.aula_preprocessing import PreprocessadorAulas
+from src.telemetry import Telemetria
+from src.score_sweep import GravacaoScores, TOP_N_GRAVACAO
 
 CACHE_DIR = "cache/embeddings"
 MATERIAS_EMBEDDINGS_CACHE = os.path.join(CACHE_DIR, "materias_embeddings_v6.pkl")
 ASSUNTOS_EMBEDDINGS_CACHE = os.path.join(CACHE_DIR, "assuntos_embeddings_v6.pkl")
 FALLBACK_EMBEDDINGS_CACHE = os.path.join(CACHE_DIR, "fallback_embeddings_v6.pkl")
+CATALOGO_NORMALIZADO_CACHE = os.path.join(CACHE_DIR, "catalogo_normalizado_v6.pkl")
+# Catálogo e modelo que geraram os embeddings em cache (o catalog_diff só reaproveita linhas que batem)
+ASSINATURA_EMBEDDINGS_CACHE = os.path.join(CACHE_DIR, "assinatura_embeddings_v6.json")
+
+MODELO_PADRAO = 'BAAI/bge-m3'
+
+# Tratamento de assuntos com 0 questões no TEC: 'excluir', 'rebaixar' ou 'ignorar'
+POLITICA_ASSUNTOS_VAZIOS = 'excluir'
+PENALIDADE_ASSUNTO_VAZIO = 0.10 # Subtraída do score no modo 'rebaixar'
+
+# Parâmetros padrão das buscas em lote (também entram na assinatura dos matches salvos)
+TOP_K_ASSUNTOS = 3
+LIMIAR_MATERIA = 0.55
+LIMIAR_ASSUNTO = 0.60
+LIMIAR_FALLBACK = 0.60
+
+def ler_assinatura_embeddings() -> Dict[str, Any]:
+    try:
+        with open(ASSINATURA_EMBEDDINGS_CACHE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def gravar_assinatura_embeddings(assinatura: str, model_name: str):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(ASSINATURA_EMBEDDINGS_CACHE, "w", encoding="utf-8") as f:
+        json.dump({"assinatura": assinatura, "modelo": model_name}, f)
 
-PADROES_AULAS_ESPECIAIS = [
-    r"apresentação\s+do\s+curso", r"aula\s+00", r"aula\s+inicial",
-    r"introdução\s+ao\s+curso", r"revisão\s+acelerada", r"revisão\s+final",
-    r"resumo", r"videoaula", r"exercícios\s+gerais",
-]
 
 class TextMatcher:
-    def __init__(self, log_callback, lista_materias, dict_assuntos_por_materia, lista_completa_fallback, model_name='BAAI/bge-m3'):
+    def __init__(self, log_callback, lista_materias, dict_assuntos_por_materia, lista_completa_fallback, model_name=MODELO_PADRAO,
+                 index_dir: Optional[str] = INDEX_DIR, usar_cache: bool = True,
+                 questoes_por_materia: Optional[Dict[str, List[Optional[int]]]] = None, politica_vazios: str = POLITICA_ASSUNTOS_VAZIOS,
+                 preprocessador: Optional[PreprocessadorAulas] = None, telemetria: Optional[Telemetria] = None):
+        """
+        index_dir: pasta do índice pré-computado (data/gerar_lista_filtros.py indice). None ignora o índice.
+        usar_cache: se False, não lê nem grava os embeddings em cache/embeddings (usado na geração do índice).
+        questoes_por_materia: contagens do DataLoader; assuntos com 0 questões são tratados conforme politica_vazios.
+        preprocessador: regras de aulas especiais (data/regras_aulas.json); criado se não for informado.
+        telemetria: spans de carga e de cada encode (src/telemetry.py).
+        """
         self.log = log_callback
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.model_name = model_name
+        self.usar_cache = usar_cache
+        self.preprocessador = preprocessador or PreprocessadorAulas()
+        self.telemetria = telemetria or Telemetria.nula()
+        # Gravação de scores por thread (iniciar_gravacao): o scheduler divide um matcher entre vários workers
+        self._local = threading.local()
         
         try:
-            self.model = SentenceTransformer(model_name, device=self.device)
+            with self.telemetria.span("matcher.carregar_modelo", modelo=model_name, device=self.device):
+                self.model = SentenceTransformer(model_name, device=self.device)
         except Exception as e:
             self.log(f"❌ Erro ao carregar IA: {e}")
             raise
 
         self.lista_materias = lista_materias
-        self.lista_materias_normalizadas = [self._normalizar_texto(m) for m in lista_materias]
         self.dict_assuntos_por_materia = dict_assuntos_por_materia
-        self.dict_assuntos_normalizados = {m: [self._normalizar_texto(a) for a in l] for m, l in dict_assuntos_por_materia.items()}
         self.lista_completa_fallback = lista_completa_fallback
-        self.lista_fallback_normalizada = [self._normalizar_texto(f) for f in lista_completa_fallback]
+        self.assinatura = assinatura_catalogo(lista_materias, dict_assuntos_por_materia)
+        self._montar_ajustes_vazios(questoes_por_materia, politica_vazios)
+
+        with self.telemetria.span("matcher.carregar_catalogo") as span:
+            indice = carregar_indice(index_dir, self.assinatura, model_name, self.log) if index_dir else None
+            span.set(fonte="indice" if indice else "cache")
+            if indice:
+                textos = indice["textos_normalizados"]
+                self.lista_materias_normalizadas = textos["materias"]
+                self.dict_assuntos_normalizados = textos["assuntos"]
+                self.lista_fallback_normalizada = textos["fallback"]
+                self.materias_embeddings = indice["materias_embeddings"].to(self.device)
+                self.assuntos_embeddings_por_materia = {m: e.to(self.device) for m, e in indice["assuntos_embeddings"].items()}
+                self.fallback_embeddings = indice["fallback_embeddings"].to(self.device)
+                return
 
-        self.materias_embeddings = self._load_or_compute_embeddings(self.lista_materias_normalizadas, MATERIAS_EMBEDDINGS_CACHE, "matérias")
-        self.assuntos_embeddings_por_materia = {}
-        self._carregar_cache_assuntos()
-        self.fallback_embeddings = self._load_or_compute_embeddings(self.lista_fallback_normalizada, FALLBACK_EMBEDDINGS_CACHE, "fallback")
+            self._carregar_catalogo_normalizado()
 
-    def find_best_matches_filtered_batch(self, query_texts: List[str], target_materia: Union[str, List[str]], top_k_assuntos: int = 3, threshold_assunto: float = 0.60) -> List[List[Dict[str, Any]]]:
+            cache_confere = self.usar_cache and self._validar_cache_embeddings()
+            self.materias_embeddings = self._load_or_compute_embeddings(self.lista_materias_normalizadas, MATERIAS_EMBEDDINGS_CACHE, "matérias")
+            self.assuntos_embeddings_por_materia = {}
+            self._carregar_cache_assuntos()
+            self.fallback_embeddings = self._load_or_compute_embeddings(self.lista_fallback_normalizada, FALLBACK_EMBEDDINGS_CACHE, "fallback")
+            if self.usar_cache and not cache_confere:
+                # Só agora os três arquivos correspondem ao catálogo atual
+                gravar_assinatura_embeddings(self.assinatura, self.model_name)
+
+    def find_best_matches_filtered_batch(self, query_texts: List[str], target_materia: Union[str, List[str]], top_k_assuntos: int = TOP_K_ASSUNTOS, threshold_assunto: float = LIMIAR_ASSUNTO,
+                                         pular: Optional[List[bool]] = None) -> List[List[Dict[str, Any]]]:
         """
         Retorna lista de listas contendo dicts: {'termo': str, 'score': float, 'origem': str}
         Suporta String única ou Lista de Strings para target_materia.
         Concatena embeddings de múltiplas matérias para busca unificada.
+        pular: aulas especiais já detectadas pelo PreprocessadorAulas (uma flag por query);
+               se None, o matcher aplica as regras de pulo ele mesmo.
         """
         
         # 1. Normalização: Garante que target_materia seja sempre uma lista
@@ -57,6 +126,7 @@ class TextMatcher:
         # 2. Coleta de dados (Tensores e Textos) das matérias solicitadas
         tensors_to_cat = []
         texts_to_cat = []
+        ajustes_to_cat = []
 
         for materia in materias_alvo:
             # Verifica se a matéria existe nos dicionários carregados
@@ -68,17 +138,19 @@ class TextMatcher:
                 if emb is not None and len(txt) > 0:
                     tensors_to_cat.append(emb)
                     texts_to_cat.extend(txt)
+                    ajustes_to_cat.append(self._ajuste_materia(materia, len(txt)))
         
         # 3. Fallback se nenhuma matéria válida for encontrada
         if not tensors_to_cat:
             # Se a lista estiver vazia ou as matérias não existirem, tenta o hierárquico
-            return self.find_best_matches_hierarquico_batch(query_texts)
+            return self.find_best_matches_hierarquico_batch(query_texts, pular=pular)
 
         # 4. Concatenação dos Embeddings
         try:
             # Junta todos os tensores das matérias selecionadas em um único tensor grande
             assuntos_emb = torch.cat(tensors_to_cat, dim=0)
             assuntos_txt = texts_to_cat
+            assuntos_ajuste = torch.cat(ajustes_to_cat, dim=0) if self.ajustes_ativos else None
         except Exception as e:
             self.log(f"❌ Erro ao concatenar embeddings para multiseleção: {e}")
             return [[] for _ in query_texts]
@@ -86,20 +158,27 @@ class TextMatcher:
         # 5. Processamento das Queries
         lista_resultados = []
         
-        for query in query_texts:
-            if self._e_aula_especial(query):
+        for query, especial in zip(query_texts, self._flags_pulo(query_texts, pular)):
+            if especial:
+                self.telemetria.contar("matcher.aulas_especiais")
+                self._gravar(query, "filtrado", especial=True)
                 lista_resultados.append([])
                 continue
 
             query_norm = self._normalizar_texto(query)
             chunks = self._quebrar_texto_longo(query_norm)
             matches_aula = [] # Lista de dicts
+            chunks_gravados = []
 
             for chunk in chunks:
-                query_emb = self.model.encode(chunk, convert_to_tensor=True, device=self.device)
+                query_emb = self._encode(chunk)
                 
                 # Compara contra o tensor unificado de todas as matérias selecionadas
                 cos_scores = util.cos_sim(query_emb, assuntos_emb)[0]
+                if assuntos_ajuste is not None:
+                    cos_scores = cos_scores + assuntos_ajuste
+                if self.gravacao is not None:
+                    chunks_gravados.append(self._top_candidatos(cos_scores, assuntos_txt))
                 
                 # Pega os Top K globais
                 top_indices = torch.topk(cos_scores, k=min(top_k_assuntos, len(assuntos_txt)))
@@ -116,14 +195,19 @@ class TextMatcher:
             # Remove duplicatas mantendo a maior nota
             matches_aula = self._deduplicar_matches(matches_aula)
             lista_resultados.append(matches_aula)
+            self._gravar(query, "filtrado", materias=materias_alvo, chunks=chunks_gravados)
             
         return lista_resultados
 
-    def find_best_matches_hierarquico_batch(self, query_texts: List[str], top_k_assuntos: int = 3, threshold_materia: float = 0.55, threshold_assunto: float = 0.60, threshold_fallback: float = 0.60) -> List[List[Dict[str, Any]]]:
+    def find_best_matches_hierarquico_batch(self, query_texts: List[str], top_k_assuntos: int = TOP_K_ASSUNTOS, threshold_materia: float = LIMIAR_MATERIA,
+                                            threshold_assunto: float = LIMIAR_ASSUNTO, threshold_fallback: float = LIMIAR_FALLBACK,
+                                            pular: Optional[List[bool]] = None) -> List[List[Dict[str, Any]]]:
         lista_resultados = []
         
-        for query in query_texts:
-            if self._e_aula_especial(query):
+        for query, especial in zip(query_texts, self._flags_pulo(query_texts, pular)):
+            if especial:
+                self.telemetria.contar("matcher.aulas_especiais")
+                self._gravar(query, "hierarquico", especial=True)
                 lista_resultados.append([])
                 continue
                 
@@ -131,19 +215,26 @@ class TextMatcher:
             matches_aula = []
             
             # 1. Tenta achar a matéria principal
-            q_emb = self.model.encode(query_norm, convert_to_tensor=True, device=self.device)
+            q_emb = self._encode(query_norm)
             cos_mat = util.cos_sim(q_emb, self.materias_embeddings)[0]
             best_mat_idx = torch.argmax(cos_mat).item()
             best_mat_score = cos_mat[best_mat_idx].item()
             
             found_in_materia = False
-            if best_mat_score >= threshold_materia:
+            gravados = {"assuntos": [], "fallback": []}
+            # Gravando, os candidatos da matéria são coletados mesmo abaixo do threshold
+            if best_mat_score >= threshold_materia or self.gravacao is not None:
                 materia_nome = self.lista_materias[best_mat_idx]
                 ass_emb = self.assuntos_embeddings_por_materia.get(materia_nome)
                 ass_txt = self.dict_assuntos_por_materia.get(materia_nome, [])
                 
                 if ass_emb is not None:
                     cos_ass = util.cos_sim(q_emb, ass_emb)[0]
+                    if self.ajustes_ativos:
+                        cos_ass = cos_ass + self._ajuste_materia(materia_nome, len(ass_txt))
+                    if self.gravacao is not None:
+                        gravados["assuntos"] = self._top_candidatos(cos_ass, ass_txt)
+                if ass_emb is not None and best_mat_score >= threshold_materia:
                     top_vals, top_idxs = torch.topk(cos_ass, k=min(top_k_assuntos, len(ass_txt)))
                     for s, i in zip(top_vals, top_idxs):
                         sc = s.item()
@@ -156,8 +247,13 @@ class TextMatcher:
                             found_in_materia = True
             
             # 2. Se não achou na matéria, tenta no geral (fallback)
-            if not found_in_materia:
+            if not found_in_materia or self.gravacao is not None:
                 cos_fall = util.cos_sim(q_emb, self.fallback_embeddings)[0]
+                if self.ajuste_fallback is not None:
+                    cos_fall = cos_fall + self.ajuste_fallback
+                if self.gravacao is not None:
+                    gravados["fallback"] = self._top_candidatos(cos_fall, self.lista_completa_fallback)
+            if not found_in_materia:
                 top_vals, top_idxs = torch.topk(cos_fall, k=min(top_k_assuntos, len(self.lista_completa_fallback)))
                 for s, i in zip(top_vals, top_idxs):
                     sc = s.item()
@@ -169,9 +265,82 @@ class TextMatcher:
                         })
                         
             lista_resultados.append(self._deduplicar_matches(matches_aula))
+            self._gravar(query, "hierarquico", materia=self.lista_materias[best_mat_idx],
+                         score_materia=best_mat_score, **gravados)
             
         return lista_resultados
 
+    # Gravação de scores (src/score_sweep.py)
+    @property
+    def gravacao(self) -> Optional[GravacaoScores]:
+        return getattr(self._local, "gravacao", None)
+
+    def iniciar_gravacao(self, top_n: int = TOP_N_GRAVACAO) -> GravacaoScores:
+        """
+        Passa a guardar os top-N candidatos de cada consulta para varrer thresholds depois.
+        Vale só para a thread que chamou: workers de matching paralelos não se misturam nem se desligam.
+        """
+        self._local.gravacao = GravacaoScores(top_n, self.model_name, self.assinatura)
+        return self._local.gravacao
+
+    def parar_gravacao(self) -> Optional[GravacaoScores]:
+        gravacao, self._local.gravacao = self.gravacao, None
+        return gravacao
+
+    def _top_candidatos(self, scores, textos) -> List[list]:
+        vals, idxs = torch.topk(scores, k=min(self.gravacao.top_n, len(textos)))
+        # Assuntos excluídos (-inf) nunca passam em threshold nenhum: não precisam ser guardados
+        return [[textos[i.item()], v.item()] for v, i in zip(vals, idxs) if v.item() != float('-inf')]
+
+    def _gravar(self, consulta: str, modo: str, especial: bool = False, **dados):
+        if self.gravacao is not None:
+            self.gravacao.registrar({"consulta": consulta, "modo": modo, "especial": especial, **dados})
+
+    def _montar_ajustes_vazios(self, questoes_por_materia, politica):
+        """
+        Pré-calcula, por matéria, um vetor somado aos scores de similaridade:
+        0 para assuntos com questões e -inf (excluir) ou -PENALIDADE (rebaixar) para os vazios.
+        Evita que o TEC responda "0 questões encontradas" só depois da ida ao navegador.
+        """
+        self.ajustes_por_materia = {}
+        self.ajuste_fallback = None
+        self.ajustes_ativos = bool(questoes_por_materia) and politica != 'ignorar'
+        self.assinatura_ajustes = "sem_ajustes"
+        if not self.ajustes_ativos:
+            return
+
+        valor = float('-inf') if politica == 'excluir' else -PENALIDADE_ASSUNTO_VAZIO
+        partes_fallback = []
+        for materia, assuntos in self.dict_assuntos_por_materia.items():
+            qs = questoes_por_materia.get(materia) or []
+            if len(qs) == len(assuntos):
+                ajuste = torch.tensor([valor if q == 0 else 0.0 for q in qs], device=self.device)
+            else:
+                ajuste = torch.zeros(len(assuntos), device=self.device)
+            self.ajustes_por_materia[materia] = ajuste
+            partes_fallback.append(ajuste)
+
+        # A lista de fallback do DataLoader é a concatenação dos assuntos de cada matéria, na mesma ordem
+        if partes_fallback and sum(len(p) for p in partes_fallback) == len(self.lista_completa_fallback):
+            self.ajuste_fallback = torch.cat(partes_fallback)
+
+        # O que de fato muda os scores: política, penalidade e quais assuntos estão vazios
+        mapa_vazios = {m: [i for i, v in enumerate(a.tolist()) if v != 0] for m, a in sorted(self.ajustes_por_materia.items())}
+        base = json.dumps([politica, PENALIDADE_ASSUNTO_VAZIO, mapa_vazios], ensure_ascii=False)
+        self.assinatura_ajustes = hashlib.sha1(base.encode("utf-8")).hexdigest()[:16]
+
+        vazios = sum(int((a != 0).sum().item()) for a in self.ajustes_por_materia.values())
+        acao = "excluídos" if politica == 'excluir' else "rebaixados"
+        self.log(f"🧮 {vazios} assuntos sem questões serão {acao} do matching.")
+
+    def _ajuste_materia(self, materia, tamanho):
+        ajuste = self.ajustes_por_materia.get(materia)
+        return ajuste if ajuste is not None else torch.zeros(tamanho, device=self.device)
+
+    def _encode(self, texto: str):
+        with self.telemetria.span("matcher.encode", chars=len(texto)):
+            return self.model.encode(texto, convert_to_tensor=True, device=self.device)
+
     def _deduplicar_matches(self, matches: List[Dict]) -> List[Dict]:
         """Remove duplicatas de termos mantendo o de maior score."""
         seen = {}
@@ -182,23 +351,88 @@ class TextMatcher:
         return list(seen.values())
 
     # Utils
-    def _normalizar_texto(self, t): return unicodedata.normalize('NFD', t).encode('ascii', 'ignore').decode('utf-8').lower() if t else ""
-    def _e_aula_especial(self, t): return any(re.search(p, self._normalizar_texto(t), re.IGNORECASE) for p in PADROES_AULAS_ESPECIAIS)
+    @staticmethod
+    def _normalizar_texto(t): return normalizar_texto(t)
+    def _e_aula_especial(self, t): return self.preprocessador.regra_pulo(t) is not None
+
+    def _flags_pulo(self, query_texts: List[str], pular: Optional[List[bool]]) -> List[bool]:
+        # Quem já passou o curso pelo PreprocessadorAulas manda as flags: as regras não rodam de novo
+        if pular is not None:
+            return pular
+        return [self._e_aula_especial(q) for q in query_texts]
     def _quebrar_texto_longo(self, t, m=50): w=t.split(); return [' '.join(w[i:i+m]) for i in range(0, len(w), m-m//4)] if len(w)>m else [t]
     
+    def _carregar_catalogo_normalizado(self):
+        """Textos normalizados do catálogo, persistidos junto dos embeddings (validados pela assinatura)."""
+        if self.usar_cache and os.path.exists(CATALOGO_NORMALIZADO_CACHE):
+            try:
+                with open(CATALOGO_NORMALIZADO_CACHE, 'rb') as f: salvo = pickle.load(f)
+                if salvo.get("assinatura") == self.assinatura:
+                    self.lista_materias_normalizadas = salvo["materias"]
+                    self.dict_assuntos_normalizados = salvo["assuntos"]
+                    self.lista_fallback_normalizada = salvo["fallback"]
+                    return
+            except Exception as e:
+                self.log(f"⚠️ Cache de textos normalizados ilegível: {e}")
+
+        self.lista_materias_normalizadas = normalizar_lista(self.lista_materias)
+        self.dict_assuntos_normalizados = {m: normalizar_lista(l) for m, l in self.dict_assuntos_por_materia.items()}
+        self.lista_fallback_normalizada = normalizar_lista(self.lista_completa_fallback)
+        if self.usar_cache:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(CATALOGO_NORMALIZADO_CACHE, 'wb') as f:
+                pickle.dump({
+                    "assinatura": self.assinatura,
+                    "materias": self.lista_materias_normalizadas,
+                    "assuntos": self.dict_assuntos_normalizados,
+                    "fallback": self.lista_fallback_normalizada,
+                }, f)
+
+    def _validar_cache_embeddings(self) -> bool:
+        """
+        True se os embeddings em cache/embeddings são deste catálogo e modelo. Senão, apaga os
+        três arquivos (matérias, assuntos e fallback) para que sejam recalculados juntos.
+        """
+        salvo = ler_assinatura_embeddings()
+        if salvo.get("assinatura") == self.assinatura and salvo.get("modelo") == self.model_name:
+            return True
+        arquivos = [p for p in (MATERIAS_EMBEDDINGS_CACHE, ASSUNTOS_EMBEDDINGS_CACHE, FALLBACK_EMBEDDINGS_CACHE) if os.path.exists(p)]
+        if arquivos:
+            self.log("♻️ Embeddings em cache são de outro catálogo ou modelo; recalculando.")
+            for path in arquivos:
+                os.remove(path)
+        return False
+
     def _load_or_compute_embeddings(self, texts, path, desc):
-        if os.path.exists(path):
-            with open(path, 'rb') as f: return pickle.load(f)
+        if self.usar_cache and os.path.exists(path):
+            with open(path, 'rb') as f: return pickle.load(f).to(self.device)
         self.log(f"Calculando embeddings para {desc}...")
         emb = self.model.encode(texts, convert_to_tensor=True, show_progress_bar=True).cpu()
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, 'wb') as f: pickle.dump(emb, f)
+        if self.usar_cache:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f: pickle.dump(emb, f)
         return emb.to(self.device)
 
     def _carregar_cache_assuntos(self):
-        if os.path.exists(ASSUNTOS_EMBEDDINGS_CACHE):
+        if self.usar_cache and os.path.exists(ASSUNTOS_EMBEDDINGS_CACHE):
             with open(ASSUNTOS_EMBEDDINGS_CACHE, 'rb') as f: self.assuntos_embeddings_por_materia = pickle.load(f)
         else:
             for m, a in self.dict_assuntos_normalizados.items():
                 if a: self.assuntos_embeddings_por_materia[m] = self.model.encode(a, convert_to_tensor=True, show_progress_bar=False)
-            with open(ASSUNTOS_EMBEDDINGS_CACHE, 'wb') as f: pickle.dump(self.assuntos_embeddings_por_materia, f)
\ No newline at end of file
+            if self.usar_cache:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with open(ASSUNTOS_EMBEDDINGS_CACHE, 'wb') as f: pickle.dump(self.assuntos_embeddings_por_materia, f)
+
+    def exportar_indice(self, out_dir: str) -> Dict[str, Any]:
+        """Grava todos os artefatos deste matcher como índice pré-computado (ver src/catalog_index.py)."""
+        artefatos = {
+            "materias_embeddings": self.materias_embeddings.cpu(),
+            "assuntos_embeddings": {m: e.cpu() for m, e in self.assuntos_embeddings_por_materia.items()},
+            "fallback_embeddings": self.fallback_embeddings.cpu(),
+            "textos_normalizados": {
+                "materias": self.lista_materias_normalizadas,
+                "assuntos": self.dict_assuntos_normalizados,
+                "fallback": self.lista_fallback_normalizada,
+            },
+        }
+        return salvar_indice(out_dir, artefatos, self.assinatura, self.model_name, self.log)
@@ -0,0 +1,103 @@
+# src/notebook_estimator.py
+"""
+Estimativa offline do tamanho de cada caderno, a partir das contagens de
+questões do catálogo (materias_assuntos_tec.json), antes de abrir o TEC.
+
+O valor é um TETO: o catálogo não conhece os filtros de Banca/Ano/Escolaridade,
+que só reduzem o total. Um teto 0, porém, garante que o TEC responderia
+"0 questões encontradas" — e esse caderno pode ser pulado sem ida ao navegador.
+"""
+
+from typing import List, Dict, Any, Optional
+
+from src.catalog_index import construir_arvore
+
+
+class EstimadorCadernos:
+    def __init__(self, data_loader):
+        self.materias = set(data_loader.materias)
+        self.arvore = construir_arvore(data_loader.assuntos_por_materia, data_loader.niveis_por_materia)
+        self.questoes = data_loader.questoes_por_materia
+        self.comentadas = data_loader.comentadas_por_materia
+
+        # nome do assunto -> [(matéria, índice)] (o mesmo nome pode existir em várias matérias)
+        self.posicoes: Dict[str, List[tuple]] = {}
+        for materia, nos in self.arvore.items():
+            for idx, no in enumerate(nos):
+                self.posicoes.setdefault(no["nome"], []).append((materia, idx))
+
+    def _total_materia(self, materia: str, contagens: Dict[str, List[Optional[int]]]) -> Optional[int]:
+        # O campo 'questoes' da própria matéria não é confiável no JSON; soma as raízes da árvore
+        raizes = [contagens[materia][i] for i, no in enumerate(self.arvore.get(materia, [])) if no["pai"] is None]
+        if any(q is None for q in raizes):
+            return None
+        return sum(raizes)
+
+    def _resolver(self, termo: str, materias_preferidas: List[str]) -> Optional[tuple]:
+        posicoes = self.posicoes.get(termo)
+        if not posicoes:
+            return None
+        for pos in posicoes:
+            if pos[0] in materias_preferidas:
+                return pos
+        return posicoes[0]
+
+    def _ancestrais(self, materia: str, idx: int) -> List[int]:
+        nos = self.arvore[materia]
+        pai = nos[idx]["pai"]
+        ancestrais = []
+        while pai is not None:
+            ancestrais.append(pai)
+            pai = nos[pai]["pai"]
+        return ancestrais
+
+    def estimar(self, termos: List[str], materias_preferidas: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Estima o teto de questões de um caderno com os filtros 'termos' (assuntos e/ou matérias).
+        Assuntos cujo ancestral também foi escolhido não são somados de novo (o TEC faz a união).
+        """
+        materias_preferidas = materias_preferidas or []
+        materias_escolhidas = [t for t in termos if t in self.materias]
+        resolvidos = {}
+        desconhecidos = []
+        for termo in termos:
+            if termo in self.materias:
+                continue
+            pos = self._resolver(termo, materias_preferidas)
+            if pos is None:
+                desconhecidos.append(termo)
+            elif pos[0] not in materias_escolhidas:
+                resolvidos[pos] = termo
+
+        questoes = comentadas = 0
+        incerto = bool(desconhecidos)
+        detalhes = []
+        for materia in materias_escolhidas:
+            q, c = self._total_materia(materia, self.questoes), self._total_materia(materia, self.comentadas)
+            incerto = incerto or q is None
+            questoes += q or 0
+            comentadas += c or 0
+            detalhes.append({"termo": materia, "questoes": q})
+
+        for (materia, idx), termo in resolvidos.items():
+            if any((materia, a) in resolvidos for a in self._ancestrais(materia, idx)):
+                continue
+            q, c = self.questoes[materia][idx], self.comentadas[materia][idx]
+            incerto = incerto or q is None
+            questoes += q or 0
+            comentadas += c or 0
+            detalhes.append({"termo": termo, "questoes": q})
+
+        return {
+            "questoes_max": questoes,
+            "comentadas_max": comentadas,
+            # Só afirmamos "vazio" quando todas as contagens são conhecidas
+            "vazio": questoes == 0 and not incerto and bool(termos),
+            "incerto": incerto,
+            "detalhes": detalhes,
+            "desconhecidos": desconhecidos,
+        }
+
+    def estimar_tarefas(self, tarefas: List[Dict[str, Any]], materias_preferidas: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Aplica estimar() a cada tarefa no formato do CacheManager ({'nome_caderno', 'materias'})."""
+        return {t["nome_caderno"]: self.estimar(t.get("materias") or [], materias_preferidas) for t in tarefas}
@@ -3,10 +3,12 @@
 import os
 from datetime import datetime
 from typing import List, Dict, Any, Callable
+from src.telemetry import Telemetria
 
 class ReportGenerator:
-    def __init__(self, log_callback: Callable[..., None]):
+    def __init__(self, log_callback: Callable[..., None], telemetria: Telemetria = None):
         self.log = log_callback
+        self.telemetria = telemetria or Telemetria.nula()
         self.template_path = os.path.join("templates", "template_relatorio.html") # Usando HTML puro agora
         self.output_dir = "relatorios"
         os.makedirs(self.output_dir, exist_ok=True)
@@ -15,6 +17,12 @@ class ReportGenerator:
         """
         Gera um relatório HTML rico com os resultados.
         """
+        with self.telemetria.span("relatorio.gerar", cadernos=len(resultados)) as span:
+            filepath = self._gerar_html(user_data, resultados)
+            span.set(ok=filepath is not None)
+            return filepath
+
+    def _gerar_html(self, user_data: Dict[str, Any], resultados: List[Dict[str, Any]]) -> str:
         self.log("Gerador de Relatório HTML inicializado.")
         self.log("Iniciando geração do relatório em HTML...")
 
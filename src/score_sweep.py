@@ -0,0 +1,139 @@
+# src/score_sweep.py
+"""
+Gravação dos scores do matcher e varredura de thresholds sem rodar o modelo de novo.
+
+Com a gravação ligada (TextMatcher.iniciar_gravacao), cada consulta guarda os
+top-N candidatos com score de cada etapa de decisão:
+  - hierárquico: a melhor matéria e seu score, os top-N assuntos dessa matéria
+    e os top-N do fallback global (sempre, mesmo que a execução não tenha caído nele);
+  - filtrado: os top-N do tensor unificado, chunk a chunk.
+
+recomputar_* reproduz exatamente a lógica de decisão do matcher para qualquer
+combinação de thresholds e top_k <= N, em microssegundos por consulta.
+"""
+
+import os
+import json
+import itertools
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.evaluation import metricas_consulta
+
+TOP_N_GRAVACAO = 20 # Candidatos guardados por etapa (limita o top_k da varredura)
+SCORES_DIR = os.path.join("cache", "scores")
+VERSAO_GRAVACAO = 1
+
+
+class GravacaoScores:
+    def __init__(self, top_n: int = TOP_N_GRAVACAO, modelo: str = "", assinatura: str = ""):
+        self.top_n = top_n
+        self.modelo = modelo
+        self.assinatura = assinatura
+        self.consultas: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def registrar(self, registro: Dict[str, Any]):
+        with self._lock:
+            self.consultas.append(registro)
+
+    def salvar(self, caminho: str):
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({
+                "versao": VERSAO_GRAVACAO, "top_n": self.top_n, "modelo": self.modelo,
+                "assinatura": self.assinatura, "consultas": self.consultas
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def carregar(cls, caminho: str) -> "GravacaoScores":
+        with open(caminho, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        if dados.get("versao") != VERSAO_GRAVACAO:
+            raise ValueError(f"Gravação de scores em versão incompatível: {dados.get('versao')}")
+        g = cls(dados["top_n"], dados.get("modelo", ""), dados.get("assinatura", ""))
+        g.consultas = dados["consultas"]
+        return g
+
+
+def _deduplicar(matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Mesma regra do TextMatcher._deduplicar_matches: fica o maior score de cada termo
+    vistos = {}
+    for m in matches:
+        if m["termo"] not in vistos or m["score"] > vistos[m["termo"]]["score"]:
+            vistos[m["termo"]] = m
+    return list(vistos.values())
+
+
+def recomputar_hierarquico(registro: Dict[str, Any], top_k_assuntos: int = 3, threshold_materia: float = 0.55,
+                           threshold_assunto: float = 0.60, threshold_fallback: float = 0.60) -> List[Dict[str, Any]]:
+    matches = []
+    achou_na_materia = False
+    if registro["score_materia"] >= threshold_materia:
+        for termo, score in registro["assuntos"][:top_k_assuntos]:
+            if score >= threshold_assunto:
+                matches.append({"termo": termo, "score": score, "origem": "Hierárquico"})
+                achou_na_materia = True
+    if not achou_na_materia:
+        for termo, score in registro["fallback"][:top_k_assuntos]:
+            if score >= threshold_fallback:
+                matches.append({"termo": termo, "score": score, "origem": "Fallback"})
+    return _deduplicar(matches)
+
+
+def recomputar_filtrado(registro: Dict[str, Any], top_k_assuntos: int = 3, threshold_assunto: float = 0.60) -> List[Dict[str, Any]]:
+    matches = []
+    for chunk in registro["chunks"]:
+        for termo, score in chunk[:top_k_assuntos]:
+            if score >= threshold_assunto:
+                matches.append({"termo": termo, "score": score, "origem": "Filtro IA (Multi)"})
+    return _deduplicar(matches)
+
+
+def recomputar(registro: Dict[str, Any], **parametros) -> List[Dict[str, Any]]:
+    if registro["especial"]:
+        return []
+    if registro["modo"] == "filtrado":
+        parametros = {k: v for k, v in parametros.items() if k in ("top_k_assuntos", "threshold_assunto")}
+        return recomputar_filtrado(registro, **parametros)
+    return recomputar_hierarquico(registro, **parametros)
+
+
+def varrer(gravacao: GravacaoScores, grade: Dict[str, Iterable[Any]],
+           esperados_por_consulta: Optional[Dict[str, List[str]]] = None, k: int = 3) -> List[Dict[str, Any]]:
+    """
+    Recalcula os matches para cada combinação da grade (ex.: {"threshold_assunto": [0.55, 0.6], "top_k_assuntos": [1, 3]})
+    e devolve, por combinação, as contagens de match e — se houver rótulos — as métricas do gold set.
+    """
+    chaves = list(grade)
+    if max(grade.get("top_k_assuntos", [0])) > gravacao.top_n:
+        raise ValueError(f"top_k_assuntos maior que o top-N gravado ({gravacao.top_n}).")
+
+    linhas = []
+    for valores in itertools.product(*(grade[c] for c in chaves)):
+        parametros = dict(zip(chaves, valores))
+        com_match = total = 0
+        soma = {"precisao_k": 0.0, "recall_k": 0.0, "rr": 0.0, "acerto_k": 0.0}
+        rotuladas = 0
+        for registro in gravacao.consultas:
+            matches = recomputar(registro, **parametros)
+            total += len(matches)
+            com_match += bool(matches)
+            esperados = (esperados_por_consulta or {}).get(registro["consulta"])
+            if esperados:
+                ranking = [m["termo"] for m in sorted(matches, key=lambda m: m["score"], reverse=True)]
+                for chave, valor in metricas_consulta(ranking, esperados, k).items():
+                    soma[chave] += valor
+                rotuladas += 1
+
+        linha = {"parametros": parametros, "consultas": len(gravacao.consultas),
+                 "com_match": com_match, "total_matches": total}
+        if rotuladas:
+            linha.update({
+                "precisao_k": round(soma["precisao_k"] / rotuladas, 4),
+                "recall_k": round(soma["recall_k"] / rotuladas, 4),
+                "mrr": round(soma["rr"] / rotuladas, 4),
+                "acerto_k": round(soma["acerto_k"] / rotuladas, 4),
+            })
+        linhas.append(linha)
+    return linhas
@@ -0,0 +1,102 @@
+# src/search_index.py
+"""
+Índice de busca para autocomplete sobre nomes de matérias/assuntos.
+
+Construído uma única vez sobre os nomes normalizados (sem acento, minúsculas):
+  - trie compacta de palavras: vocabulário ordenado + bisect, onde cada prefixo
+    digitado vira um intervalo contíguo de palavras;
+  - índice invertido de trigramas, para achar ocorrências no meio das palavras.
+
+"licitacao" encontra "Licitação", e os resultados vêm ranqueados:
+prioritários (ex.: assuntos da matéria selecionada) primeiro, depois nomes que
+começam com o texto, nomes em que todas as palavras digitadas são prefixos e,
+por fim, ocorrências no meio do nome.
+"""
+
+import re
+import heapq
+from bisect import bisect_left
+from functools import lru_cache
+from typing import List, Dict, Set, Iterable, Optional
+
+from src.text_normalization import normalizar_texto, normalizar_lista
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+TAMANHO_NGRAMA = 3
+
+
+class IndiceBusca:
+    def __init__(self, nomes: Iterable[str], prioritarios: Optional[Iterable[str]] = None):
+        self.nomes: List[str] = list(dict.fromkeys(nomes))
+        self.chaves: List[str] = normalizar_lista(self.nomes)
+        prioritarios = set(prioritarios or [])
+        self._prioritario = [n in prioritarios for n in self.nomes]
+
+        ids_por_palavra: Dict[str, Set[int]] = {}
+        self._ngramas: Dict[str, Set[int]] = {}
+        for i, chave in enumerate(self.chaves):
+            for palavra in _TOKEN_RE.findall(chave):
+                ids_por_palavra.setdefault(palavra, set()).add(i)
+            for g in self._gerar_ngramas(chave):
+                self._ngramas.setdefault(g, set()).add(i)
+
+        self._vocabulario: List[str] = sorted(ids_por_palavra)
+        self._ids_por_palavra = ids_por_palavra
+        # Memo por instância dos prefixos já expandidos (digitação repete os mesmos prefixos)
+        self._ids_por_prefixo = lru_cache(maxsize=512)(self._expandir_prefixo)
+
+    @staticmethod
+    def _gerar_ngramas(texto: str) -> Set[str]:
+        return {texto[i:i + TAMANHO_NGRAMA] for i in range(len(texto) - TAMANHO_NGRAMA + 1)}
+
+    def _expandir_prefixo(self, prefixo: str) -> frozenset:
+        """Todos os ids cujos nomes têm alguma palavra começando com 'prefixo'."""
+        inicio = bisect_left(self._vocabulario, prefixo)
+        ids: Set[int] = set()
+        for palavra in self._vocabulario[inicio:]:
+            if not palavra.startswith(prefixo):
+                break
+            ids |= self._ids_por_palavra[palavra]
+        return frozenset(ids)
+
+    def _por_prefixos(self, palavras: List[str]) -> Set[int]:
+        conjuntos = sorted((self._ids_por_prefixo(p) for p in palavras), key=len)
+        if not conjuntos:
+            return set()
+        resultado = set(conjuntos[0])
+        for c in conjuntos[1:]:
+            resultado &= c
+            if not resultado:
+                break
+        return resultado
+
+    def _por_substring(self, consulta: str) -> Set[int]:
+        if len(consulta) < TAMANHO_NGRAMA:
+            return set()
+        conjuntos = sorted((self._ngramas.get(g, set()) for g in self._gerar_ngramas(consulta)), key=len)
+        if not conjuntos or not conjuntos[0]:
+            return set()
+        candidatos = set(conjuntos[0]).intersection(*conjuntos[1:])
+        # Trigramas só garantem candidatos: confirma a ocorrência contígua
+        return {i for i in candidatos if consulta in self.chaves[i]}
+
+    def buscar(self, consulta: str, limite: int = 50) -> List[str]:
+        q = normalizar_texto(consulta).strip()
+        if not q:
+            return []
+        palavras = _TOKEN_RE.findall(q)
+        por_prefixo = self._por_prefixos(palavras)
+        por_substring = self._por_substring(q)
+
+        def ordem(i):
+            chave = self.chaves[i]
+            if chave.startswith(q):
+                tipo = 0
+            elif i in por_prefixo:
+                tipo = 1
+            else:
+                tipo = 2
+            return (not self._prioritario[i], tipo, len(chave), chave)
+
+        melhores = heapq.nsmallest(limite, por_prefixo | por_substring, key=ordem)
+        return [self.nomes[i] for i in melhores]
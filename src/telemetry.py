@@ -0,0 +1,204 @@
+# src/telemetry.py
+"""
+Telemetria estruturada de uma execução (um clique em "Revisar" ou "Criar Cadernos").
+
+Três tipos de evento, todos com atributos livres:
+  - span: trecho cronometrado (with tel.span("bo.get_aulas", curso=id): ...),
+    com aninhamento por thread (cada span conhece o span pai);
+  - contador: tel.contar("tec.filtro.falha", filtro="Banca");
+  - evento: marco pontual sem duração.
+
+Os eventos vão para "renderizadores": o arquivo JSONL da execução
+(telemetria/<run_id>.jsonl) e o log_callback de sempre, que só recebe os spans
+de primeiro nível e o resumo final, para não poluir a GUI.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+TELEMETRIA_DIR = "telemetria"
+
+
+class Span:
+    def __init__(self, nome: str, pai: Optional[str], attrs: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.nome = nome
+        self.pai = pai
+        self.attrs = attrs
+        self.inicio = time.perf_counter()
+        self.dur_ms: Optional[float] = None
+
+    def set(self, **attrs):
+        """Anexa atributos descobertos durante o span (ex.: num_questoes)."""
+        self.attrs.update(attrs)
+
+
+class RenderizadorJsonl:
+    def __init__(self, caminho: str):
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        self.caminho = caminho
+        self._arquivo = open(caminho, "a", encoding="utf-8")
+
+    def __call__(self, evento: Dict[str, Any]):
+        self._arquivo.write(json.dumps(evento, ensure_ascii=False, default=str) + "\n")
+        self._arquivo.flush()
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class RenderizadorLog:
+    """Adapta os eventos ao log_callback (texto com emoji, como o resto do app)."""
+
+    def __init__(self, log_callback: Callable[..., None]):
+        self.log = log_callback
+
+    def __call__(self, evento: Dict[str, Any]):
+        if evento["tipo"] == "span" and evento["pai"] is None:
+            status = "" if evento["attrs"].get("ok", True) else " (falhou)"
+            self.log(f"⏱️ {evento['nome']}: {_formatar_ms(evento['dur_ms'])}{status}")
+        elif evento["tipo"] == "resumo":
+            self.log("📊 Resumo de tempos da execução:")
+            for nome, r in evento["spans"].items():
+                self.log(f"   - {nome}: {r['n']}x, total {_formatar_ms(r['total_ms'])}, máx {_formatar_ms(r['max_ms'])}")
+            for nome, total in evento["contadores"].items():
+                self.log(f"   - {nome}: {total}")
+
+
+def _formatar_ms(ms: float) -> str:
+    return f"{ms / 1000:.1f}s" if ms >= 1000 else f"{ms:.0f}ms"
+
+
+class Telemetria:
+    def __init__(self, log_callback: Optional[Callable[..., None]] = None, pasta: Optional[str] = TELEMETRIA_DIR,
+                 run_id: Optional[str] = None, ativo: bool = True):
+        """
+        pasta: onde gravar o JSONL da execução (None desativa o arquivo).
+        ativo: False cria uma telemetria "nula" (spans medem nada e não emitem).
+        """
+        self.ativo = ativo
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:6]
+        self.renderizadores: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._agregado_spans: Dict[str, Dict[str, float]] = {}
+        self._contadores: Dict[str, float] = {}
+        self._finalizada = False
+        self._jsonl: Optional[RenderizadorJsonl] = None
+
+        if not ativo:
+            return
+        if pasta:
+            try:
+                self._jsonl = RenderizadorJsonl(os.path.join(pasta, f"{self.run_id}.jsonl"))
+                self.renderizadores.append(self._jsonl)
+            except OSError:
+                pass # Sem arquivo, segue só com o log
+        if log_callback:
+            self.renderizadores.append(RenderizadorLog(log_callback))
+
+    @classmethod
+    def nula(cls) -> "Telemetria":
+        return cls(ativo=False)
+
+    @property
+    def caminho_jsonl(self) -> Optional[str]:
+        return self._jsonl.caminho if self._jsonl else None
+
+    # --- API ---
+    @contextmanager
+    def span(self, nome: str, **attrs):
+        pilha = self._pilha()
+        s = Span(nome, pilha[-1].id if pilha else None, attrs)
+        pilha.append(s)
+        try:
+            yield s
+        except BaseException as e:
+            s.set(ok=False, erro=str(e)[:200])
+            raise
+        finally:
+            pilha.pop()
+            s.dur_ms = (time.perf_counter() - s.inicio) * 1000
+            if self.ativo:
+                self._registrar_span(s)
+
+    def propagar(self, funcao: Callable[..., Any]) -> Callable[..., Any]:
+        """Embrulha 'funcao' para rodar em outra thread (ex.: a do BrowserManager) como filha do span atual."""
+        pilha = self._pilha()
+        pai = pilha[-1] if pilha else None
+
+        def executar(*args, **kwargs):
+            anterior = self._pilha()
+            self._local.pilha = [pai] if pai else []
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                self._local.pilha = anterior
+        return executar
+
+    def registrar_duracao(self, nome: str, dur_ms: float, **attrs):
+        """Registra como span uma duração medida fora do Python (ex.: Navigation Timing do navegador)."""
+        if not self.ativo:
+            return
+        pilha = self._pilha()
+        s = Span(nome, pilha[-1].id if pilha else None, attrs)
+        s.dur_ms = dur_ms
+        self._registrar_span(s)
+
+    def contar(self, nome: str, n: float = 1, **attrs):
+        if not self.ativo:
+            return
+        with self._lock:
+            self._contadores[nome] = self._contadores.get(nome, 0) + n
+        self._emitir({"tipo": "contador", "nome": nome, "n": n, "attrs": attrs})
+
+    def evento(self, nome: str, **attrs):
+        if self.ativo:
+            self._emitir({"tipo": "evento", "nome": nome, "attrs": attrs})
+
+    def resumo(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "spans": {k: dict(v) for k, v in self._agregado_spans.items()},
+                "contadores": dict(self._contadores),
+            }
+
+    def finalizar(self):
+        """Emite o resumo agregado e fecha o JSONL. Idempotente."""
+        if not self.ativo or self._finalizada:
+            return
+        self._finalizada = True
+        self._emitir({"tipo": "resumo", **self.resumo()})
+        if self._jsonl:
+            self._jsonl.fechar()
+            self.renderizadores.remove(self._jsonl)
+
+    # --- Internos ---
+    def _pilha(self) -> List[Span]:
+        if not hasattr(self._local, "pilha"):
+            self._local.pilha = []
+        return self._local.pilha
+
+    def _registrar_span(self, s: Span):
+        with self._lock:
+            ag = self._agregado_spans.setdefault(s.nome, {"n": 0, "total_ms": 0.0, "max_ms": 0.0})
+            ag["n"] += 1
+            ag["total_ms"] += s.dur_ms
+            ag["max_ms"] = max(ag["max_ms"], s.dur_ms)
+        self._emitir({"tipo": "span", "nome": s.nome, "id": s.id, "pai": s.pai,
+                      "dur_ms": round(s.dur_ms, 2), "attrs": s.attrs})
+
+    def _emitir(self, evento: Dict[str, Any]):
+        evento = {"ts": time.time(), "run": self.run_id, "thread": threading.current_thread().name, **evento}
+        with self._lock:
+            for r in list(self.renderizadores):
+                try:
+                    r(evento)
+                except Exception:
+                    pass # Telemetria nunca derruba a automação
@@ -0,0 +1,42 @@
+# src/text_normalization.py
+"""
+Normalização de texto compartilhada (matcher, orquestrador e GUI).
+
+Regra única: decomposição NFD, remoção de tudo que não é ASCII (acentos)
+e minúsculas. "Licitação" e "LICITACAO" viram "licitacao".
+"""
+
+import unicodedata
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+TAMANHO_MEMO = 65536 # Cobre o catálogo inteiro (~16k assuntos) com folga para aulas e buscas
+_SEPARADOR = "\x1f" # Unit separator: ASCII, nunca aparece em nomes de assuntos/aulas
+
+
+def _normalizar_bruto(texto: str) -> str:
+    return unicodedata.normalize('NFD', texto).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+@lru_cache(maxsize=TAMANHO_MEMO)
+def _normalizar_memo(texto: str) -> str:
+    return _normalizar_bruto(texto)
+
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """Normaliza um texto, com memo limitado (chamadas repetidas para a mesma string são O(1))."""
+    return _normalizar_memo(texto) if texto else ""
+
+
+def normalizar_lista(textos: Iterable[Optional[str]]) -> List[str]:
+    """
+    Normaliza uma lista inteira em uma única passada: junta tudo com um separador,
+    aplica NFD/ASCII/lower uma vez só e divide de volta. Bem mais rápido que item a item
+    para listas grandes (catálogo, filtros da GUI). Não passa pelo memo.
+    """
+    textos = [t or "" for t in textos]
+    if not textos:
+        return []
+    if any(_SEPARADOR in t for t in textos):
+        return [normalizar_texto(t) for t in textos]
+    return _normalizar_bruto(_SEPARADOR.join(textos)).split(_SEPARADOR)
@@ -0,0 +1,106 @@
+# tests/test_catalog_diff.py
+"""
+diff_catalogos (src/catalog_diff.py) entre dois catálogos pequenos montados à mão,
+e o remapeamento dos cursos salvos que ele alimenta (CacheManager.remapear_termos).
+
+    python -m pytest tests
+"""
+
+import pytest
+
+from src.cache_manager import CacheManager
+from src.catalog_diff import diff_catalogos
+
+URL = "https://www.tecconcursos.com.br/aulas/materias/{m}/assuntos/{a}"
+
+
+def _assunto(nome, nivel=0, materia=None, id_tec=None):
+    url = URL.format(m=materia, a=id_tec) if id_tec else "N/A"
+    return {"nome": nome, "nivel": nivel, "url": url}
+
+
+CATALOGO_ANTIGO = [
+    {"nome": "Direito Administrativo", "slug": "direito-administrativo", "assuntos": [
+        _assunto("Atos administrativos", 0, 1, 101),
+        _assunto("Poderes da administração", 0),
+        _assunto("Licitações", 0),
+        _assunto("Modalidades de licitação", 1),
+        _assunto("Agentes públicos", 0),
+    ]},
+    {"nome": "Direito Constitucional", "slug": "direito-constitucional", "assuntos": [
+        _assunto("Controle de constitucionalidade", 0),
+    ]},
+]
+
+CATALOGO_NOVO = [
+    {"nome": "Direito Administrativo", "slug": "direito-administrativo", "assuntos": [
+        # Mesmo id no TEC com outro nome: renomeação
+        _assunto("Atos da administração", 0, 1, 101),
+        # Sem id, nome parecido sob o mesmo pai: renomeação
+        _assunto("Poderes da administração pública", 0),
+        _assunto("Licitações", 0),
+        _assunto("Improbidade administrativa", 0),
+    ]},
+    {"nome": "Direito Constitucional", "slug": "direito-constitucional", "assuntos": [
+        _assunto("Controle de constitucionalidade", 0),
+        # Nome único nos dois lados, em outra matéria: movido
+        _assunto("Agentes públicos", 0),
+    ]},
+]
+
+
+@pytest.fixture
+def diff():
+    return diff_catalogos(CATALOGO_ANTIGO, CATALOGO_NOVO)
+
+
+def test_classifica_adicionados_removidos_renomeados_e_movidos(diff):
+    assert diff["adicionados"] == [{"materia": "Direito Administrativo", "nome": "Improbidade administrativa"}]
+    assert diff["removidos"] == [{"materia": "Direito Administrativo", "nome": "Modalidades de licitação"}]
+    assert sorted((r["de"], r["para"]) for r in diff["renomeados"]) == [
+        ("Atos administrativos", "Atos da administração"),
+        ("Poderes da administração", "Poderes da administração pública"),
+    ]
+    assert [(m["nome"], m["de_materia"], m["para_materia"]) for m in diff["movidos"]] == [
+        ("Agentes públicos", "Direito Administrativo", "Direito Constitucional"),
+    ]
+    assert diff["inalterados"] == 2
+
+
+def test_renomeacoes_so_trazem_nomes_que_sumiram(diff):
+    assert diff["renomeacoes"] == {
+        "Atos administrativos": "Atos da administração",
+        "Poderes da administração": "Poderes da administração pública",
+    }
+    assert diff["materias"] == {"adicionadas": [], "removidas": [], "renomeadas": []}
+
+
+def test_remapeia_cursos_salvos(diff, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = CacheManager(lambda *a, **k: None)
+    cache.cache_structure["courses"] = {
+        "123": {
+            "Aula 1 - Atos e poderes": ["Atos administrativos", "Poderes da administração", "Atos da administração"],
+            "Aula 2 - Licitações": ["Licitações", "Modalidades de licitação"],
+            "Aula 3 - Agentes": ["Agentes públicos", "Direito Constitucional"],
+        }
+    }
+    termos_validos = {m["nome"] for m in CATALOGO_NOVO} | {a["nome"] for m in CATALOGO_NOVO for a in m["assuntos"]}
+
+    obsoletos = cache.remapear_termos(diff["renomeacoes"], termos_validos)
+
+    aulas = cache.cache_structure["courses"]["123"]
+    # Renomeados trocados e deduplicados, na ordem original
+    assert aulas["Aula 1 - Atos e poderes"] == ["Atos da administração", "Poderes da administração pública"]
+    # Removido é mantido para revisão manual, e sinalizado
+    assert aulas["Aula 2 - Licitações"] == ["Licitações", "Modalidades de licitação"]
+    # Movido mantém o nome: continua válido no catálogo novo
+    assert aulas["Aula 3 - Agentes"] == ["Agentes públicos", "Direito Constitucional"]
+    assert obsoletos == {"123": {"Aula 2 - Licitações": ["Modalidades de licitação"]}}
+    assert cache.cache_structure["meta"]["termos_obsoletos"] == obsoletos
+    assert cache.has_changed
+
+    # Rodar de novo sobre o cache já remapeado não muda nada
+    cache.has_changed = False
+    assert cache.remapear_termos(diff["renomeacoes"], termos_validos) == obsoletos
+    assert not cache.has_changed
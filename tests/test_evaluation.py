@@ -0,0 +1,42 @@
+# tests/test_evaluation.py
+"""
+Métricas do gold set (src/evaluation.py) em rankings pequenos, calculados à mão.
+
+    python -m pytest tests
+"""
+
+import pytest
+
+from src.evaluation import metricas_consulta, percentil
+
+
+def test_metricas_com_acerto_fora_do_topo():
+    m = metricas_consulta(["Poderes", "Atos", "Agentes"], ["Atos", "Licitações"], k=2)
+    assert m == {"precisao_k": 0.5, "recall_k": 0.5, "rr": 0.5, "acerto_k": 1.0}
+
+
+def test_metricas_ranking_curto_nao_e_premiado():
+    # Devolver menos que k candidatos não aumenta a precisão
+    m = metricas_consulta(["Atos"], ["Atos"], k=3)
+    assert m["precisao_k"] == pytest.approx(1 / 3)
+    assert m["recall_k"] == 1.0 and m["rr"] == 1.0
+
+
+def test_metricas_rr_olha_alem_do_top_k():
+    m = metricas_consulta(["A", "B", "C", "Atos"], ["Atos"], k=2)
+    assert m["acerto_k"] == 0.0 and m["precisao_k"] == 0.0
+    assert m["rr"] == 0.25
+
+
+def test_metricas_sem_esperados():
+    assert metricas_consulta(["Atos"], [], k=1) == {"precisao_k": 0.0, "recall_k": 0.0, "rr": 0.0, "acerto_k": 0.0}
+
+
+@pytest.mark.parametrize("p, esperado", [(0, 1), (10, 1), (50, 5), (90, 9), (95, 10), (100, 10)])
+def test_percentil_posto_mais_proximo(p, esperado):
+    assert percentil(list(range(10, 0, -1)), p) == esperado
+
+
+def test_percentil_lista_vazia_e_unitaria():
+    assert percentil([], 95) == 0.0
+    assert percentil([7.5], 50) == 7.5
@@ -0,0 +1,86 @@
+# tests/test_score_sweep.py
+"""
+recomputar_* contra registros montados à mão: mesmas decisões do TextMatcher
+(limiar da matéria, corte top-k, queda no fallback, deduplicação), sem modelo.
+
+    python -m pytest tests
+"""
+
+import pytest
+
+from src.score_sweep import GravacaoScores, recomputar, recomputar_filtrado, recomputar_hierarquico, varrer
+
+
+def _hierarquico(score_materia, assuntos, fallback, especial=False):
+    return {"consulta": "aula", "modo": "hierarquico", "especial": especial,
+            "score_materia": score_materia, "assuntos": assuntos, "fallback": fallback}
+
+
+def _termos(matches):
+    return [(m["termo"], m["score"], m["origem"]) for m in matches]
+
+
+def test_hierarquico_fica_na_materia_quando_algum_assunto_passa():
+    registro = _hierarquico(0.70, [["Atos", 0.82], ["Poderes", 0.65], ["Agentes", 0.50]], [["Licitações", 0.90]])
+    assert _termos(recomputar_hierarquico(registro)) == [
+        ("Atos", 0.82, "Hierárquico"), ("Poderes", 0.65, "Hierárquico"),
+    ]
+
+
+def test_hierarquico_cai_no_fallback_sem_assunto_acima_do_limiar():
+    registro = _hierarquico(0.70, [["Atos", 0.59]], [["Licitações", 0.75], ["Contratos", 0.61], ["Convênios", 0.40]])
+    assert _termos(recomputar_hierarquico(registro)) == [
+        ("Licitações", 0.75, "Fallback"), ("Contratos", 0.61, "Fallback"),
+    ]
+
+
+def test_hierarquico_materia_abaixo_do_limiar_ignora_os_assuntos():
+    registro = _hierarquico(0.54, [["Atos", 0.95]], [["Licitações", 0.70]])
+    assert _termos(recomputar_hierarquico(registro)) == [("Licitações", 0.70, "Fallback")]
+    # Limiar da matéria mais baixo: o mesmo registro passa a decidir pelos assuntos
+    assert _termos(recomputar_hierarquico(registro, threshold_materia=0.50)) == [("Atos", 0.95, "Hierárquico")]
+
+
+def test_hierarquico_respeita_top_k_e_limiares():
+    registro = _hierarquico(0.80, [["A", 0.90], ["B", 0.85], ["C", 0.80], ["D", 0.79]], [])
+    assert [m["termo"] for m in recomputar_hierarquico(registro, top_k_assuntos=2)] == ["A", "B"]
+    assert [m["termo"] for m in recomputar_hierarquico(registro, top_k_assuntos=4, threshold_assunto=0.80)] == ["A", "B", "C"]
+
+
+def test_hierarquico_deduplica_pelo_maior_score():
+    registro = _hierarquico(0.10, [], [["Atos", 0.70], ["Atos", 0.90], ["Poderes", 0.65]])
+    assert _termos(recomputar_hierarquico(registro)) == [("Atos", 0.90, "Fallback"), ("Poderes", 0.65, "Fallback")]
+
+
+def test_filtrado_junta_os_chunks_e_deduplica():
+    registro = {"consulta": "aula longa", "modo": "filtrado", "especial": False, "chunks": [
+        [["Atos", 0.70], ["Poderes", 0.62], ["Agentes", 0.61]],
+        [["Atos", 0.88], ["Licitações", 0.59]],
+    ]}
+    assert _termos(recomputar_filtrado(registro)) == [
+        ("Atos", 0.88, "Filtro IA (Multi)"), ("Poderes", 0.62, "Filtro IA (Multi)"), ("Agentes", 0.61, "Filtro IA (Multi)"),
+    ]
+    assert [m["termo"] for m in recomputar_filtrado(registro, top_k_assuntos=1)] == ["Atos"]
+
+
+def test_recomputar_despacha_pelo_modo():
+    especial = _hierarquico(0.99, [["Atos", 0.99]], [], especial=True)
+    assert recomputar(especial) == []
+    filtrado = {"consulta": "x", "modo": "filtrado", "especial": False, "chunks": [[["Atos", 0.58]]]}
+    # Limiares do hierárquico não se aplicam ao filtrado e são descartados
+    assert [m["termo"] for m in recomputar(filtrado, threshold_assunto=0.55, threshold_materia=0.99)] == ["Atos"]
+
+
+def test_varrer_conta_matches_e_metricas_por_combinacao():
+    gravacao = GravacaoScores(top_n=3)
+    gravacao.consultas = [
+        _hierarquico(0.70, [["Atos", 0.82], ["Poderes", 0.65]], []),
+        _hierarquico(0.70, [["Licitações", 0.58]], []),
+    ]
+    gravacao.consultas[1]["consulta"] = "aula 2"
+    linhas = varrer(gravacao, {"threshold_assunto": [0.60, 0.55]}, {"aula": ["Poderes"]}, k=2)
+    assert [(l["com_match"], l["total_matches"]) for l in linhas] == [(1, 2), (2, 3)]
+    assert linhas[0]["recall_k"] == 1.0 and linhas[0]["mrr"] == 0.5
+
+    with pytest.raises(ValueError):
+        varrer(gravacao, {"top_k_assuntos": [4]})
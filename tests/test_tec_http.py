@@ -0,0 +1,82 @@
+# tests/test_tec_http.py
+"""
+TecHttpClient contra o ServidorReplay, com uma gravação curta inventada
+(os endpoints reais ainda não foram conferidos: aqui vale só o contrato do cliente).
+
+    python -m pytest tests
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+
+from src.automation.tec_http import RespostaInesperada, TecHttpClient, validar_esquema
+from src.automation.tec_replay import ServidorReplay
+
+ENDPOINTS = {
+    "base_url": "https://tec.invalido",
+    "url_gerador": "https://tec.invalido/gerador",
+    "url_caderno": "https://tec.invalido/cadernos/{id}",
+    "endpoints": {
+        "buscar_filtro": {"metodo": "GET", "caminho": "/filtros/{tipo}", "esquema": {"lista": {"id": "int", "nome": "str"}}},
+        "contar": {"metodo": "POST", "caminho": "/contar", "esquema": {"quantidade": "int"}},
+        "criar": {"metodo": "POST", "caminho": "/cadernos", "esquema": {"id": "int"}},
+    },
+    "tipos_filtro": {"areas": "areas", "materias": "materias", "bancas": "bancas", "anos": "anos", "escolaridades": "escolaridades"},
+}
+
+
+def _gravacao(metodo, caminho, query, corpo, status, resposta):
+    return {"origem": "http", "metodo": metodo, "caminho": caminho, "query": query,
+            "corpo": corpo, "status": status, "resposta": resposta}
+
+
+GRAVACOES = [
+    _gravacao("GET", "/filtros/materias", {"termo": ["Atos administrativos"]}, None, 200,
+              [{"id": 10, "nome": "Direito Administrativo"}, {"id": 11, "nome": "Atos Administrativos"}]),
+    _gravacao("GET", "/filtros/materias", {"termo": ["Licitações"]}, None, 200,
+              [{"id": 20, "nome": "Licitações"}]),
+    _gravacao("GET", "/filtros/bancas", {"termo": ["Cebraspe"]}, None, 200, [{"id": 3, "nome": "CEBRASPE"}]),
+    _gravacao("POST", "/contar", {}, {"filtros": {"materias": [11], "bancas": [3]}}, 200, {"quantidade": 42}),
+    _gravacao("POST", "/cadernos", {}, {"nome": "Aula 1", "filtros": {"materias": [11], "bancas": [3]}}, 200, {"id": 987}),
+    _gravacao("POST", "/contar", {}, {"filtros": {"materias": [20]}}, 200, {"quantidade": 5}),
+    _gravacao("POST", "/cadernos", {}, {"nome": "Aula 2", "filtros": {"materias": [20]}}, 502, None),
+]
+
+
+@pytest.fixture
+def cliente(tmp_path):
+    arquivo = tmp_path / "tec.jsonl"
+    arquivo.write_text("\n".join(json.dumps(g, ensure_ascii=False) for g in GRAVACOES), encoding="utf-8")
+    with ServidorReplay(str(arquivo)) as servidor:
+        cliente = TecHttpClient(lambda *a, **k: None, endpoints=ENDPOINTS, base_url=servidor.url, timeout_s=5)
+        yield cliente
+        cliente.fechar()
+
+
+def test_cria_caderno_pelos_endpoints(cliente):
+    resultado = cliente.criar_caderno("Aula 1", ["Atos administrativos"], {"bancas": ["Cebraspe"]})
+    assert resultado["success"] is True
+    assert resultado["url"] == "https://tec.invalido/cadernos/987"
+    assert resultado["num_questoes"] == 42
+
+
+def test_filtro_desconhecido_volta_ao_navegador_antes_de_criar(cliente):
+    with pytest.raises(RespostaInesperada):
+        cliente.criar_caderno("Aula 3", ["Assunto que não existe"], {})
+
+
+def test_falha_na_criacao_nao_e_refeita(cliente):
+    resultado = cliente.criar_caderno("Aula 2", ["Licitações"], {})
+    assert resultado["success"] is False
+    assert resultado["incerto"] is True
+    assert resultado["erro"]
+    assert resultado["num_questoes"] == 5
+
+
+def test_validar_esquema():
+    assert validar_esquema({"id": 1, "extra": "x"}, {"id": "int"}) is None
+    assert validar_esquema({"id": True}, {"id": "int"}) is not None
+    assert validar_esquema("<html>", {"lista": {"id": "int"}}) is not None
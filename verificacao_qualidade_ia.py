@@ -1,115 +1,261 @@
 # Ficheiro: verificacao_qualidade_ia.py
 # (VERSÃO SEM PANDAS - Roda em qualquer ambiente Python)
 #
-# Script de AUDITORIA DE QUALIDADE.
-# Objetivo: Comparar semanticamente o título da aula vs. o assunto encontrado
-# para garantir que não estamos gerando "falsos positivos" ao baixar os thresholds.
+# Script de AVALIAÇÃO DE QUALIDADE (gate de regressão).
+# Objetivo: medir o matcher contra o gold set rotulado (data/gold_set.json)
+# com precisão@k, recall, MRR e latência por consulta, para aceitar ou rejeitar
+# mudanças (thresholds, modelo, otimizações de velocidade) com números.
+#
+# Uso:
+#   python verificacao_qualidade_ia.py avaliar [--k 3] [--modo hierarquico|filtrado] [--threshold-fallback 0.65]
+#   python verificacao_qualidade_ia.py avaliar --salvar base.json               # grava o baseline
+#   python verificacao_qualidade_ia.py avaliar --baseline base.json             # sai com código 1 se piorar
+#   python verificacao_qualidade_ia.py colher [--curso ID]                      # importa revisões do matches_cache.json
+#   python verificacao_qualidade_ia.py varrer --threshold-assunto 0.55 0.6 0.65 --top-k 1 3
+#                                              # grava os scores uma vez e varre a grade de thresholds sem o modelo
 #
 
 import sys
 import os
-import re
+import json
+import time
+import argparse
 
 # Adiciona o diretório atual ao path
 sys.path.append(os.getcwd())
 
-from src.matching import TextMatcher
 from data.data_loader import DataLoader
+from src.aula_preprocessing import PreprocessadorAulas
+from src.cache_manager import CACHE_FILE
+from src.catalog_index import assinatura_catalogo
+from src.evaluation import (
+    GOLD_SET_FILE, carregar_gold_set, salvar_gold_set, colher_do_cache,
+    mesclar_gold_set, avaliar, comparar_com_baseline
+)
+from src.score_sweep import SCORES_DIR, TOP_N_GRAVACAO, GravacaoScores, varrer
+
+_preprocessador = PreprocessadorAulas()
 
 def limpar_nome(nome):
-    """A mesma limpeza usada no Orchestrator V8"""
-    return re.sub(r'(?i)aula\s+\d+\s*[:.-]\s*', '', nome).strip()
+    """A mesma limpeza usada no Orchestrator (regras de data/regras_aulas.json)"""
+    return _preprocessador.limpar(nome)[0]
 
-def run_quality_audit():
-    print("="*80)
-    print("🧐 AUDITORIA DE QUALIDADE SEMÂNTICA DA IA")
-    print("="*80)
+def _truncar(texto, n=52):
+    return (texto[:n] + '...') if len(texto) > n else texto
 
-    # 1. Carregar Dados
-    print("Carregando estrutura de dados...")
-    # Silencia o loader para não poluir o log
-    loader = DataLoader(lambda x: None)
-    
-    # 2. Inicializar IA
+def imprimir_tabela(detalhes):
+    # Formatação manual sem Pandas
+    print(f"{'AULA ORIGINAL (LIMPA)':<55} | {'MELHOR ASSUNTO ENCONTRADO NO TEC':<55} | {'VEREDITO'}")
+    print("-" * 130)
+    for d in detalhes:
+        # 'encontrados' é uma lista de dicts {'termo', 'score'}: exibe o termo do melhor
+        match_texto = d["encontrados"][0]["termo"] if d["encontrados"] else "❌ NÃO MAPEADO"
+        if not d["encontrados"]:
+            veredito = "🔴 SEM MATCH"
+        elif d["rr"] == 1.0:
+            veredito = "🟢 ACERTO NO TOPO"
+        elif d["acerto_k"]:
+            veredito = f"🟡 ACERTO (posição {round(1 / d['rr'])})"
+        else:
+            veredito = "🔴 ERRO"
+        print(f"{_truncar(d['limpa']):<55} | {_truncar(match_texto):<55} | {veredito}")
+    print("-" * 130)
+
+def imprimir_resumo(resumo):
+    print(f"\n📊 RESUMO ({resumo['n']} aulas, k={resumo['k']}, modo={resumo['modo']}, parâmetros={resumo['parametros'] or 'padrão'})")
+    print(f"   Precisão@{resumo['k']}: {resumo['precisao_k']:.3f}")
+    print(f"   Recall@{resumo['k']}:   {resumo['recall_k']:.3f}")
+    print(f"   MRR:          {resumo['mrr']:.3f}")
+    print(f"   Acerto@{resumo['k']}:   {resumo['acerto_k']:.3f}")
+    print(f"   Sem match:    {resumo['sem_match']}")
+    print(f"   Latência:     p50 {resumo['latencia_p50_ms']:.1f}ms | p95 {resumo['latencia_p95_ms']:.1f}ms | média {resumo['latencia_media_ms']:.1f}ms")
+
+def _criar_matcher(loader, modelo=None):
+    from src.matching import TextMatcher, MODELO_PADRAO
+
+    # Silencia o matcher para não poluir o relatório
     print("Inicializando IA...")
-    matcher = TextMatcher(
-        log_callback=lambda x: None, # Silencia logs técnicos
+    return TextMatcher(
+        log_callback=lambda x: None,
         lista_materias=loader.materias,
         dict_assuntos_por_materia=loader.assuntos_por_materia,
-        lista_completa_fallback=loader.lista_completa_fallback
+        lista_completa_fallback=loader.lista_completa_fallback,
+        questoes_por_materia=loader.questoes_por_materia,
+        model_name=modelo or MODELO_PADRAO,
+        preprocessador=_preprocessador
     )
 
-    # 3. Casos Reais (Problemáticos e Normais) para Auditoria
-    casos_reais = [
-        # --- Caso 1: Introdução (Era falha) ---
-        "Aula 01: Estado, Governo e Administração Pública. Direito Administrativo: fontes, objeto, conceito.",
-        
-        # --- Caso 2: Controle (Era falha) ---
-        "Aula 17: Controle da Administração Pública.",
-        
-        # --- Caso 3: Atos (Era falha) ---
-        "Aula 04: Ato administrativo: espécies e invalidação; cassação, revogação, anulação e convalidação.",
-        
-        # --- Caso 4: Pregão (Era falha crítica) ---
-        "Aula 09: Pregão: Lei nº 10.520/02, Decreto Federal nº 5.450/05.",
-        
-        # --- Caso 5: Licitações (Teste de robustez) ---
-        "Aula 11: Licitações à luz da lei 14.133/2021 - parte I; conceito, natureza jurídica.",
-        
-        # --- Caso 6: Terceiro Setor (Termo curto) ---
-        "Aula 07: Entidades do Terceiro Setor.",
-        
-        # --- Caso 7: Improbidade (Lei específica) ---
-        "Aula 18: Improbidade administrativa; Lei nº 8.429, de 1992."
-    ]
-
-    print(f"\nAnalisando {len(casos_reais)} casos com Thresholds Ajustados (0.60 / 0.65 / 0.65)...")
-    print("-" * 130)
+def cmd_avaliar(args):
+    print("="*80)
+    print("🧐 AVALIAÇÃO DE QUALIDADE DA IA (GOLD SET)")
+    print("="*80)
 
-    # Prepara input limpo
-    inputs_limpos = [limpar_nome(c) for c in casos_reais]
+    gold = carregar_gold_set(args.gold)
+    print(f"Gold set v{gold['versao']}: {len(gold['itens'])} aulas rotuladas.")
 
-    # Roda a IA
-    resultados = matcher.find_best_matches_hierarquico_batch(
-        query_texts=inputs_limpos,
-        top_k_assuntos=1,        # Queremos ver O MELHOR match
-        threshold_materia=0.60,
-        threshold_assunto=0.65,
-        threshold_fallback=0.65  # O novo threshold crítico
-    )
+    loader = DataLoader(lambda x: None)
+    matcher = _criar_matcher(loader, args.modelo)
 
-    # 4. Exibir Relatório de Qualidade (Formatação manual sem Pandas)
-    # Header
-    print(f"{'AULA ORIGINAL (LIMPA)':<55} | {'ASSUNTO ENCONTRADO NO TEC':<55} | {'VEREDITO'}")
-    print("-" * 130)
+    # Só repassa o que foi informado: o resto usa os padrões do matcher
+    parametros = {"top_k_assuntos": args.top_k or args.k}
+    if args.threshold_assunto is not None:
+        parametros["threshold_assunto"] = args.threshold_assunto
+    if args.modo == "hierarquico":
+        if args.threshold_materia is not None:
+            parametros["threshold_materia"] = args.threshold_materia
+        if args.threshold_fallback is not None:
+            parametros["threshold_fallback"] = args.threshold_fallback
 
-    for original, limpo, match_list in zip(casos_reais, inputs_limpos, resultados):
-        match_texto = match_list[0] if match_list else "❌ NÃO MAPEADO"
-        
-        # Truncar para caber na tabela
-        titulo_aula = (limpo[:52] + '...') if len(limpo) > 52 else limpo
-        assunto_tec = (match_texto[:52] + '...') if len(match_texto) > 52 else match_texto
-        
-        # Análise visual simples (se contém palavras chave)
-        palavras_chave = set(limpo.lower().split())
-        palavras_match = set(match_texto.lower().split()) if match_list else set()
-        intersecao = palavras_chave.intersection(palavras_match)
-        
-        # Veredito automático simples
-        if not match_list:
-            veredito = "🔴 FALHA"
-        elif len(intersecao) >= 2 or match_texto.lower() in limpo.lower() or limpo.lower() in match_texto.lower():
-            veredito = "🟢 ALTA PRECISÃO"
-        else:
-            veredito = "🟡 REVISAR"
+    resultado = avaliar(matcher, gold["itens"], k=args.k, modo=args.modo, preprocessador=_preprocessador, **parametros)
+    resultado["resumo"].update({"gold_versao": gold["versao"], "modelo": matcher.model_name})
 
-        print(f"{titulo_aula:<55} | {assunto_tec:<55} | {veredito}")
+    print()
+    imprimir_tabela(resultado["detalhes"])
+    imprimir_resumo(resultado["resumo"])
 
-    print("-" * 130)
-    print("\nLEGENDA:")
-    print("🟢 ALTA PRECISÃO: O assunto encontrado compartilha várias palavras-chave com a aula.")
-    print("🟡 REVISAR: O match aconteceu, mas verifique se o contexto é o mesmo (pode ser um termo relacionado).")
-    print("🔴 FALHA: Nenhum assunto atingiu o score mínimo (0.65).")
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultado salvo em {args.salvar}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["resumo"]
+        if baseline.get("gold_versao") != gold["versao"]:
+            print(f"⚠️ Baseline medido no gold set v{baseline.get('gold_versao')}; comparação pode não ser justa.")
+        regressoes = comparar_com_baseline(resultado["resumo"], baseline, args.tolerancia)
+        if regressoes:
+            print("\n🔴 REGRESSÃO DE QUALIDADE:")
+            for r in regressoes:
+                print(f"   - {r}")
+            return 1
+        print(f"\n🟢 Sem regressão em relação ao baseline (tolerância {args.tolerancia}).")
+        print(f"   Latência p50: {baseline.get('latencia_p50_ms')}ms -> {resultado['resumo']['latencia_p50_ms']}ms")
+    return 0
+
+def cmd_colher(args):
+    loader = DataLoader(lambda x: None)
+    termos_validos = set(loader.lista_completa_fallback)
+    novos = colher_do_cache(args.cache, args.curso, termos_validos)
+    gold = carregar_gold_set(args.gold)
+    gold, adicionados = mesclar_gold_set(gold, novos)
+    if adicionados:
+        salvar_gold_set(gold, args.gold)
+    print(f"📥 {len(novos)} aulas revisadas no cache; {adicionados} novas adicionadas ao gold set (v{gold['versao']}).")
+    return 0
+
+def _obter_gravacao(args, gold, loader):
+    """Carrega a gravação de scores do gold set ou, se não existir (ou --regravar), roda o modelo uma vez."""
+    caminho = args.gravacao or os.path.join(SCORES_DIR, f"gold_v{gold['versao']}_{args.modo}.json")
+    assinatura = assinatura_catalogo(loader.materias, loader.assuntos_por_materia)
+    if os.path.exists(caminho) and not args.regravar:
+        gravacao = GravacaoScores.carregar(caminho)
+        if gravacao.assinatura != assinatura:
+            print("⚠️ O catálogo mudou desde a gravação; use --regravar para scores atualizados.")
+        print(f"📂 Scores carregados de {caminho} ({len(gravacao.consultas)} consultas, top-{gravacao.top_n}).")
+        return gravacao
+
+    matcher = _criar_matcher(loader, args.modelo)
+    matcher.iniciar_gravacao(args.top_n)
+    consultas = [limpar_nome(item["aula"]) for item in gold["itens"]]
+    # Os thresholds usados aqui não importam: a gravação guarda os candidatos antes de qualquer corte
+    if args.modo == "filtrado":
+        for item, consulta in zip(gold["itens"], consultas):
+            if item.get("materias"):
+                matcher.find_best_matches_filtered_batch([consulta], target_materia=item["materias"])
+            else:
+                matcher.find_best_matches_hierarquico_batch([consulta])
+    else:
+        matcher.find_best_matches_hierarquico_batch(consultas)
+    gravacao = matcher.parar_gravacao()
+    gravacao.salvar(caminho)
+    print(f"💾 Scores gravados em {caminho}.")
+    return gravacao
+
+def cmd_varrer(args):
+    print("="*80)
+    print("🎚️ VARREDURA DE THRESHOLDS (SEM RODAR O MODELO)")
+    print("="*80)
+
+    gold = carregar_gold_set(args.gold)
+    loader = DataLoader(lambda x: None)
+    gravacao = _obter_gravacao(args, gold, loader)
+    esperados = {limpar_nome(item["aula"]): item["esperados"] for item in gold["itens"]}
+
+    grade = {
+        "top_k_assuntos": args.top_k,
+        "threshold_assunto": args.threshold_assunto,
+    }
+    if args.modo == "hierarquico":
+        grade["threshold_materia"] = args.threshold_materia
+        grade["threshold_fallback"] = args.threshold_fallback
+
+    inicio = time.perf_counter()
+    linhas = varrer(gravacao, grade, esperados, k=args.k)
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    print(f"⚡ {len(linhas)} combinações recalculadas em {duracao_ms:.0f}ms.\n")
+
+    linhas.sort(key=lambda l: (l.get(args.ordenar, 0), l["com_match"]), reverse=True)
+    print(f"{'PARÂMETROS':<70} | {'C/ MATCH':>8} | {'MATCHES':>7} | {'P@K':>6} | {'R@K':>6} | {'MRR':>6}")
+    print("-" * 118)
+    for l in linhas[:args.mostrar]:
+        params = " ".join(f"{k.replace('threshold_', 'thr_')}={v}" for k, v in l["parametros"].items())
+        print(f"{params:<70} | {l['com_match']:>8} | {l['total_matches']:>7} | "
+              f"{l.get('precisao_k', 0):>6.3f} | {l.get('recall_k', 0):>6.3f} | {l.get('mrr', 0):>6.3f}")
+    print("-" * 118)
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump(linhas, f, ensure_ascii=False, indent=2)
+        print(f"💾 Varredura salva em {args.salvar}")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Avaliação do matcher contra o gold set rotulado.")
+    sub = parser.add_subparsers(dest="comando")
+
+    p_av = sub.add_parser("avaliar", help="Calcula precisão@k, recall, MRR e latência (padrão).")
+    p_av.add_argument("--gold", default=GOLD_SET_FILE)
+    p_av.add_argument("--k", type=int, default=3)
+    p_av.add_argument("--modo", choices=["hierarquico", "filtrado"], default="hierarquico")
+    p_av.add_argument("--modelo", help="Modelo do SentenceTransformer (padrão: o do matcher).")
+    p_av.add_argument("--top-k", type=int, help="top_k_assuntos repassado ao matcher (padrão: k).")
+    p_av.add_argument("--threshold-materia", type=float)
+    p_av.add_argument("--threshold-assunto", type=float)
+    p_av.add_argument("--threshold-fallback", type=float)
+    p_av.add_argument("--salvar", help="Grava o resultado (resumo + detalhes) em JSON.")
+    p_av.add_argument("--baseline", help="Resultado salvo anteriormente; sai com código 1 se alguma métrica cair.")
+    p_av.add_argument("--tolerancia", type=float, default=0.0, help="Queda absoluta tolerada em cada métrica.")
+
+    p_co = sub.add_parser("colher", help="Adiciona ao gold set as aulas revisadas do matches_cache.json.")
+    p_co.add_argument("--gold", default=GOLD_SET_FILE)
+    p_co.add_argument("--cache", default=CACHE_FILE)
+    p_co.add_argument("--curso", action="append", help="Restringe a um ou mais IDs de curso.")
+
+    p_va = sub.add_parser("varrer", help="Recalcula os matches para uma grade de thresholds a partir de scores gravados.")
+    p_va.add_argument("--gold", default=GOLD_SET_FILE)
+    p_va.add_argument("--k", type=int, default=3)
+    p_va.add_argument("--modo", choices=["hierarquico", "filtrado"], default="hierarquico")
+    p_va.add_argument("--modelo", help="Modelo do SentenceTransformer (só usado ao gravar).")
+    p_va.add_argument("--gravacao", help="Arquivo de scores (padrão: cache/scores/gold_v<versao>_<modo>.json).")
+    p_va.add_argument("--regravar", action="store_true", help="Ignora a gravação existente e roda o modelo de novo.")
+    p_va.add_argument("--top-n", type=int, default=TOP_N_GRAVACAO, help="Candidatos gravados por etapa.")
+    p_va.add_argument("--top-k", type=int, nargs="+", default=[1, 2, 3])
+    p_va.add_argument("--threshold-materia", type=float, nargs="+", default=[0.50, 0.55, 0.60, 0.65])
+    p_va.add_argument("--threshold-assunto", type=float, nargs="+", default=[0.55, 0.60, 0.65, 0.70])
+    p_va.add_argument("--threshold-fallback", type=float, nargs="+", default=[0.55, 0.60, 0.65, 0.70])
+    p_va.add_argument("--ordenar", choices=["mrr", "precisao_k", "recall_k", "acerto_k", "com_match"], default="mrr")
+    p_va.add_argument("--mostrar", type=int, default=20, help="Quantas combinações exibir.")
+    p_va.add_argument("--salvar", help="Grava todas as combinações em JSON.")
+
+    args = parser.parse_args()
+    if args.comando == "varrer":
+        return cmd_varrer(args)
+    if args.comando == "colher":
+        return cmd_colher(args)
+    if args.comando is None:
+        args = parser.parse_args(["avaliar"] + sys.argv[1:])
+    return cmd_avaliar(args)
 
 if __name__ == "__main__":
-    run_quality_audit()
\ No newline at end of file
+    sys.exit(main())